@@ -0,0 +1,7 @@
+"""
+Capa de caché compartida de la aplicación.
+
+Este paquete contiene las piezas que se enchufan en ``settings.CACHES``
+(serializadores para el backend Redis) y las utilidades de observabilidad
+de la caché (contadores de aciertos y fallos por espacio de nombres).
+"""
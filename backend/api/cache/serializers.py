@@ -0,0 +1,52 @@
+"""
+Serializadores para el backend Redis de la caché.
+
+Los payloads grandes, como las curvas de equity de ``run_backtest_service``
+o las matrices de agrupamiento, se comprimen con zlib antes de enviarse a
+Redis para reducir memoria y tráfico de red entre los workers.
+"""
+import pickle
+import zlib
+
+from django.conf import settings
+from django.core.cache.backends.redis import RedisSerializer
+
+# Prefijo que identifica un payload comprimido. Un pickle nunca empieza así.
+MARCA_COMPRIMIDO = b"Z1:"
+
+
+class CompressedRedisSerializer(RedisSerializer):
+    """
+    Serializador pickle que comprime los valores que superan un umbral de tamaño.
+
+    Los enteros se siguen guardando sin serializar para que ``incr``/``decr``
+    funcionen de forma atómica en Redis.
+    """
+
+    def __init__(self, protocol=None, min_bytes=None, level=None):
+        """
+        Inicializa el serializador.
+
+        Args:
+            protocol (int, optional): Protocolo de pickle. Defaults to el más alto.
+            min_bytes (int, optional): Tamaño mínimo para comprimir.
+                Defaults to ``settings.CACHE_COMPRESS_MIN_BYTES``.
+            level (int, optional): Nivel de compresión de zlib.
+                Defaults to ``settings.CACHE_COMPRESS_LEVEL``.
+        """
+        super().__init__(protocol)
+        self.min_bytes = min_bytes if min_bytes is not None else getattr(
+            settings, "CACHE_COMPRESS_MIN_BYTES", 16 * 1024
+        )
+        self.level = level if level is not None else getattr(settings, "CACHE_COMPRESS_LEVEL", 6)
+
+    def dumps(self, obj):
+        data = super().dumps(obj)
+        if isinstance(data, bytes) and len(data) >= self.min_bytes:
+            return MARCA_COMPRIMIDO + zlib.compress(data, self.level)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, bytes) and data.startswith(MARCA_COMPRIMIDO):
+            return pickle.loads(zlib.decompress(data[len(MARCA_COMPRIMIDO):]))
+        return super().loads(data)
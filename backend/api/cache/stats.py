@@ -0,0 +1,74 @@
+"""
+Contadores de aciertos y fallos de caché por espacio de nombres.
+
+Los contadores se guardan en la propia caché, de modo que con el backend
+Redis son compartidos por todos los workers de gunicorn.
+"""
+import logging
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_ESTADISTICAS = "cache_stats"
+
+
+def _clave(namespace: str, tipo: str) -> str:
+    return f"{PREFIJO_ESTADISTICAS}:{namespace}:{tipo}"
+
+
+def _incrementar(clave: str) -> None:
+    """
+    Incrementa un contador sin interrumpir la solicitud si la caché falla.
+
+    Args:
+        clave (str): Clave del contador.
+    """
+    try:
+        try:
+            cache.incr(clave)
+        except ValueError:
+            # El contador todavía no existe (o fue desalojado)
+            if not cache.add(clave, 1, timeout=None):
+                cache.incr(clave)
+    except Exception as e:
+        logger.debug(f"No se pudo actualizar el contador de caché {clave}: {e}")
+
+
+def registrar_acierto(namespace: str) -> None:
+    """Registra un acierto de caché para el espacio de nombres indicado."""
+    _incrementar(_clave(namespace, "hits"))
+
+
+def registrar_fallo(namespace: str) -> None:
+    """Registra un fallo de caché para el espacio de nombres indicado."""
+    _incrementar(_clave(namespace, "misses"))
+
+
+def obtener_estadisticas(namespaces: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Obtiene los contadores de aciertos y fallos de varios espacios de nombres.
+
+    Args:
+        namespaces (Iterable[str]): Espacios de nombres a consultar.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por espacio de nombres, aciertos, fallos y
+            tasa de aciertos.
+    """
+    namespaces = list(namespaces)
+    claves = [_clave(ns, tipo) for ns in namespaces for tipo in ("hits", "misses")]
+    valores = cache.get_many(claves)
+
+    estadisticas = {}
+    for ns in namespaces:
+        hits = int(valores.get(_clave(ns, "hits"), 0))
+        misses = int(valores.get(_clave(ns, "misses"), 0))
+        total = hits + misses
+        estadisticas[ns] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+    return estadisticas
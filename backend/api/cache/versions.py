@@ -0,0 +1,76 @@
+"""
+Versiones de datos por ticker para invalidar la caché por eventos.
+
+Cada ticker tiene un número de versión guardado en la caché compartida que
+se incrementa cuando la ingesta agrega o corrige filas de ``StockData``.
+Las claves de caché de las vistas incluyen estas versiones, por lo que un
+resultado puede guardarse sin expiración y deja de usarse exactamente cuando
+cambian los datos de alguno de sus tickers. Las consultas que no dependen
+de tickers puntuales usan la versión global, que cambia con cualquier ingesta.
+"""
+import logging
+import time
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_VERSION = "data_version"
+VERSION_GLOBAL = "__all__"
+
+
+def _clave(ticker: str) -> str:
+    return f"{PREFIJO_VERSION}:{ticker}"
+
+
+def _version_inicial() -> int:
+    # Se parte del reloj para que una versión desalojada no repita un valor anterior
+    return time.time_ns()
+
+
+def obtener_versiones(tickers: Iterable[str]) -> Dict[str, int]:
+    """
+    Obtiene la versión de datos actual de varios tickers.
+
+    Los tickers sin versión registrada se inicializan en la caché.
+
+    Args:
+        tickers (Iterable[str]): Tickers a consultar. ``VERSION_GLOBAL`` consulta
+            la versión global.
+
+    Returns:
+        Dict[str, int]: Versión de datos por ticker.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    valores = cache.get_many([_clave(t) for t in tickers])
+
+    versiones = {}
+    for ticker in tickers:
+        clave = _clave(ticker)
+        version = valores.get(clave)
+        if version is None:
+            cache.add(clave, _version_inicial(), timeout=None)
+            version = cache.get(clave, 0)
+        versiones[ticker] = int(version)
+    return versiones
+
+
+def incrementar_versiones(tickers: Iterable[str]) -> None:
+    """
+    Incrementa la versión de datos de los tickers indicados y la versión global.
+
+    Args:
+        tickers (Iterable[str]): Tickers cuyos datos cambiaron.
+    """
+    for ticker in [*dict.fromkeys(tickers), VERSION_GLOBAL]:
+        clave = _clave(ticker)
+        try:
+            try:
+                cache.incr(clave)
+            except ValueError:
+                # Sin versión previa: cualquier valor nuevo invalida las claves existentes
+                if not cache.add(clave, _version_inicial(), timeout=None):
+                    cache.incr(clave)
+        except Exception as e:
+            logger.warning(f"No se pudo incrementar la versión de datos de {ticker}: {e}")
@@ -1,4 +1,5 @@
 # cron.py
+from django.core.management import call_command
 from django_cron import CronJobBase, Schedule
 from .logica.importStock import import_stock_data  # Importa la función
 
@@ -11,4 +12,40 @@ class ImportStockDataCronJob(CronJobBase):
     def do(self):
         print("Iniciando la importación de datos de acciones...")
         import_stock_data()  # Llamar a la función directamente
-        print("Datos de acciones importados.")
\ No newline at end of file
+        print("Datos de acciones importados.")
+
+
+class RefreshFundamentalsCronJob(CronJobBase):
+    RUN_AT_TIMES = ['03:00']  # Una vez por día, fuera del horario de mercado
+
+    schedule = Schedule(run_at_times=RUN_AT_TIMES)
+    code = 'myapp.refresh_fundamentals_cron_job'
+
+    def do(self):
+        print("Actualizando snapshots de datos fundamentales...")
+        call_command('refresh_fundamentals')
+        print("Snapshots de datos fundamentales actualizados.")
+
+
+class IngestUniverseCronJob(CronJobBase):
+    RUN_AT_TIMES = ['21:30']  # Después del cierre del mercado
+
+    schedule = Schedule(run_at_times=RUN_AT_TIMES)
+    code = 'myapp.ingest_universe_cron_job'
+
+    def do(self):
+        print("Iniciando la ingesta del universo de CEDEARs...")
+        call_command('ingest_universe')
+        print("Ingesta del universo de CEDEARs terminada.")
+
+
+class ScanPivotLevelsCronJob(CronJobBase):
+    RUN_AT_TIMES = ['23:00']  # Después de la ingesta del universo
+
+    schedule = Schedule(run_at_times=RUN_AT_TIMES)
+    code = 'myapp.scan_pivot_levels_cron_job'
+
+    def do(self):
+        print("Calculando niveles de soporte y resistencia...")
+        call_command('scan_pivot_levels')
+        print("Niveles de soporte y resistencia actualizados.")
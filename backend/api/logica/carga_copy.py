@@ -0,0 +1,169 @@
+"""
+Carga masiva de precios con ``COPY`` de PostgreSQL.
+
+Para los backfills de historia completa, las descargas de Yahoo Finance se
+convierten directamente en texto CSV, sin crear instancias de ``StockData``.
+El CSV se acumula en un buffer acotado y, al llenarse, se envía con
+``COPY ... FROM STDIN`` (psycopg3) a una tabla temporal de staging y se
+fusiona con ``api_stockdata`` con un solo ``INSERT ... ON CONFLICT``. La
+memoria queda acotada por ``filas_por_lote`` y no por el tamaño del backfill.
+"""
+import io
+import logging
+import time
+from datetime import date
+from typing import Dict, Set, Tuple
+
+import pandas as pd
+from django.db import connection, transaction
+
+from api.models import StockData
+from .ingesta import CAMPOS_PRECIOS, COLUMNAS_PRECIOS, _columnas_del_ticker
+
+logger = logging.getLogger(__name__)
+
+TABLA_STAGING = 'stockdata_staging'
+COLUMNAS_COPY = ['ticker', 'date', *CAMPOS_PRECIOS]
+
+
+def _filas_copy(ticker: str, datos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Arma las filas de una descarga con las columnas de ``COLUMNAS_COPY``.
+
+    Args:
+        ticker (str): Ticker de la descarga.
+        datos (pd.DataFrame): Datos diarios del ticker.
+
+    Returns:
+        pd.DataFrame: Un registro por día completo (fecha como texto ISO).
+    """
+    datos = _columnas_del_ticker(ticker, datos)
+    if datos.empty or not set(COLUMNAS_PRECIOS).issubset(datos.columns):
+        return pd.DataFrame(columns=COLUMNAS_COPY)
+
+    datos = datos[COLUMNAS_PRECIOS].dropna()
+    return pd.DataFrame({
+        'ticker': ticker,
+        'date': datos.index.strftime('%Y-%m-%d'),
+        'open_price': datos['Open'].to_numpy(),
+        'high_price': datos['High'].to_numpy(),
+        'low_price': datos['Low'].to_numpy(),
+        'close_price': datos['Close'].to_numpy(),
+        'volume': datos['Volume'].to_numpy().astype('int64'),
+    })
+
+
+def csv_stock_data(ticker: str, datos: pd.DataFrame) -> str:
+    """
+    Convierte una descarga de ``yf.download`` en filas CSV para ``COPY``.
+
+    Args:
+        ticker (str): Ticker de la descarga.
+        datos (pd.DataFrame): Datos diarios del ticker.
+
+    Returns:
+        str: Una línea por día completo con las columnas de ``COLUMNAS_COPY``.
+    """
+    filas = _filas_copy(ticker, datos)
+    return filas.to_csv(header=False, index=False) if not filas.empty else ''
+
+
+class CargadorCopy:
+    """
+    Acumula descargas en un buffer CSV y las vuelca con ``COPY`` por lotes.
+
+    Se usa como context manager: al salir sin errores se vuelca lo pendiente.
+    """
+
+    def __init__(self, filas_por_lote: int = 100_000, chunk_bytes: int = 1 << 20):
+        """
+        Inicializa el cargador.
+
+        Args:
+            filas_por_lote (int, optional): Filas acumuladas antes de volcar.
+                Defaults to 100_000.
+            chunk_bytes (int, optional): Tamaño de cada escritura al ``COPY``.
+                Defaults to 1 MiB.
+        """
+        self.filas_por_lote = filas_por_lote
+        self.chunk_bytes = chunk_bytes
+        self.guardadas = 0
+        self.segundos = 0.0
+        self.tickers: Set[str] = set()
+        self.resumen: Dict[str, Tuple[date, int]] = {}
+        self._buffer = io.StringIO()
+        self._pendientes = 0
+
+    def __enter__(self) -> 'CargadorCopy':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.volcar()
+
+    def agregar(self, ticker: str, datos: pd.DataFrame) -> int:
+        """
+        Agrega la descarga de un ticker al buffer y vuelca si se llenó.
+
+        Args:
+            ticker (str): Ticker de la descarga.
+            datos (pd.DataFrame): Datos diarios del ticker.
+
+        Returns:
+            int: Cantidad de filas agregadas.
+        """
+        registros = _filas_copy(ticker, datos)
+        filas = len(registros)
+        if filas:
+            self._buffer.write(registros.to_csv(header=False, index=False))
+            self._pendientes += filas
+            self.tickers.add(ticker)
+            ultima = date.fromisoformat(registros['date'].max())
+            anterior, cantidad = self.resumen.get(ticker, (ultima, 0))
+            self.resumen[ticker] = (max(anterior, ultima), cantidad + filas)
+        if self._pendientes >= self.filas_por_lote:
+            self.volcar()
+        return filas
+
+    def volcar(self) -> int:
+        """
+        Envía el buffer con ``COPY`` a la tabla de staging y lo fusiona con ``StockData``.
+
+        Returns:
+            int: Cantidad de filas insertadas o actualizadas en este volcado.
+        """
+        if not self._pendientes:
+            return 0
+
+        inicio = time.perf_counter()
+        columnas = ', '.join(COLUMNAS_COPY)
+        actualizaciones = ', '.join(f'{campo} = EXCLUDED.{campo}' for campo in CAMPOS_PRECIOS)
+        self._buffer.seek(0)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE IF NOT EXISTS {TABLA_STAGING} ('
+                'ticker TEXT NOT NULL, date DATE NOT NULL, open_price FLOAT8, high_price FLOAT8, '
+                'low_price FLOAT8, close_price FLOAT8, volume BIGINT'
+                ')'
+            )
+            # Truncar explícitamente: dentro de una transacción externa no hay COMMIT entre lotes
+            cursor.execute(f'TRUNCATE {TABLA_STAGING}')
+            sql_copy = f'COPY {TABLA_STAGING} ({columnas}) FROM STDIN WITH (FORMAT csv)'
+            with cursor.copy(sql_copy) as copy:
+                while bloque := self._buffer.read(self.chunk_bytes):
+                    copy.write(bloque)
+            # DISTINCT ON evita que ON CONFLICT vea dos veces la misma clave en un lote
+            cursor.execute(
+                f'INSERT INTO {StockData._meta.db_table} ({columnas}) '
+                f'SELECT DISTINCT ON (ticker, date) {columnas} FROM {TABLA_STAGING} '
+                'ORDER BY ticker, date '
+                f'ON CONFLICT (ticker, date) DO UPDATE SET {actualizaciones}'
+            )
+            guardadas = cursor.rowcount
+
+        self._buffer = io.StringIO()
+        self._pendientes = 0
+        self.guardadas += guardadas
+        self.segundos += time.perf_counter() - inicio
+        logger.info(f"{guardadas} filas de StockData guardadas con COPY")
+        return guardadas
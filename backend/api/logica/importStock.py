@@ -1,28 +1,48 @@
 # utils.py (o cualquier archivo donde quieras definirla)
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 import yfinance as yf
-from ..models import StockData
+from ..repositories.watermark_repository import IngestionWatermarkRepository
+from .ingesta import (
+    agrupar_por_inicio,
+    extraer_acciones_corporativas,
+    filas_de_descarga,
+    finalizar_ingesta,
+    frames_por_ticker,
+    guardar_acciones_corporativas,
+    guardar_stock_data,
+    resumen_por_ticker,
+)
 
 def import_stock_data():
     tickers = ['AAL', 'ZM']
-    
-    for ticker in tickers:
-        last_date = StockData.objects.filter(ticker=ticker).order_by('-date').first()
-        start_date = last_date.date + timedelta(days=1) if last_date else datetime.strptime('2015-01-01', '%Y-%m-%d').date()
-        end_date = datetime.now().date()
+    actualizados = []
+    filas = []
 
-        if start_date < end_date:
-            stock_data = yf.download(ticker, start=start_date, end=end_date)
-            for index, row in stock_data.iterrows():
-                StockData.objects.update_or_create(
-                    ticker=ticker,
-                    date=index.date(),
-                    defaults={
-                        'open_price': row['Open'],
-                        'high_price': row['High'],
-                        'low_price': row['Low'],
-                        'close_price': row['Close'],
-                        'volume': row['Volume'],
-                    }
-                )
-    print("Importación de datos de acciones completada.")
+    # Cada ticker continúa desde su propia marca de ingesta
+    marcas = IngestionWatermarkRepository.inicializar(tickers)
+    grupos = agrupar_por_inicio(tickers, {t: m.last_date for t, m in marcas.items()})
+    end_date = datetime.now().date()
+
+    for start_date, grupo in grupos.items():
+        if start_date >= end_date:
+            continue
+        # Los tickers con la misma fecha de inicio se piden en una sola descarga
+        stock_data = yf.download(
+            grupo, start=start_date, end=end_date, group_by='ticker', actions=True
+        )
+        for ticker, datos in frames_por_ticker(grupo, stock_data):
+            guardar_acciones_corporativas(*extraer_acciones_corporativas(ticker, datos))
+        filas_grupo = filas_de_descarga(grupo, stock_data)
+        filas += filas_grupo
+        actualizados += list(dict.fromkeys(fila.ticker for fila in filas_grupo))
+
+    # Un upsert por lotes para todas las barras descargadas
+    inicio = time.perf_counter()
+    guardadas = guardar_stock_data(filas)
+    segundos = time.perf_counter() - inicio
+
+    IngestionWatermarkRepository.registrar(resumen_por_ticker(filas))
+    finalizar_ingesta(actualizados)
+    print(f"Importación de datos de acciones completada: {guardadas} filas en {segundos:.2f}s "
+          f"({guardadas / max(segundos, 1e-9):.0f} filas/s).")
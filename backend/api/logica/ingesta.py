@@ -0,0 +1,353 @@
+"""
+Utilidades compartidas por los procesos de ingesta de precios.
+
+Tanto el comando ``import_stock_data`` como el cron job de importación deben
+avisar qué tickers recibieron filas nuevas para avanzar el estado incremental
+de indicadores y para que las vistas cacheadas y el almacén de precios en
+memoria dejen de usar datos anteriores. También
+guardan los dividendos y splits que Yahoo Finance informa junto con los precios.
+
+Las barras se guardan con ``guardar_stock_data``, un upsert por lotes con
+``bulk_create(update_conflicts=True)`` compartido por ambos procesos.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from api.cache.versions import incrementar_versiones
+from api.models import Dividend, Split, StockData
+from api.repositories.agregados_repository import AgregadosRepository
+from api.repositories.price_store import price_store
+from api.services.estado_indicadores import actualizar_estados
+from api.services.senales_ticker import refrescar_senales
+
+logger = logging.getLogger(__name__)
+
+INICIO_HISTORIA = date(2015, 1, 1)
+COLUMNAS_PRECIOS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CAMPOS_PRECIOS = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+
+def notificar_ingesta(tickers: Iterable[str]) -> None:
+    """
+    Registra que los tickers indicados tienen datos nuevos en ``StockData``.
+
+    Incrementa su versión de datos en la caché compartida (lo que invalida
+    todas las claves de caché que dependen de ellos) y descarta sus series del
+    almacén de precios de este proceso.
+
+    Args:
+        tickers (Iterable[str]): Tickers con filas insertadas o actualizadas.
+    """
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    if not tickers:
+        return
+
+    incrementar_versiones(tickers)
+    for ticker in tickers:
+        price_store.invalidate(ticker)
+    logger.info(f"Versión de datos incrementada para {len(tickers)} tickers")
+
+
+def finalizar_ingesta(tickers: Iterable[str]) -> None:
+    """
+    Ejecuta las etapas posteriores a guardar barras nuevas de ``StockData``.
+
+    Avanza el estado incremental de indicadores de cada ticker, recalcula su
+    fila de señales en un solo lote, materializa los buckets de los agregados
+    continuos que tocó la ingesta y luego invalida las cachés que dependen
+    de ellos.
+
+    Args:
+        tickers (Iterable[str]): Tickers con filas insertadas o actualizadas.
+    """
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    if not tickers:
+        return
+
+    actualizados = actualizar_estados(tickers)
+    logger.info(f"Estado de indicadores actualizado para {actualizados} tickers")
+    refrescar_senales(tickers)
+    AgregadosRepository.refrescar()
+    notificar_ingesta(tickers)
+
+
+def _columnas_del_ticker(ticker: str, datos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quita el nivel del ticker de las columnas de una descarga de un solo ticker.
+
+    Args:
+        ticker (str): Ticker de la descarga.
+        datos (pd.DataFrame): Datos diarios del ticker.
+
+    Returns:
+        pd.DataFrame: Datos con columnas planas (``Open``, ``Close``, ...).
+    """
+    if isinstance(datos.columns, pd.MultiIndex) and ticker in datos.columns.get_level_values(-1):
+        # Las descargas de un solo ticker pueden traer el ticker como segundo nivel
+        datos = datos.xs(ticker, axis=1, level=-1)
+    return datos
+
+
+def frames_por_ticker(tickers: Iterable[str],
+                      datos: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Separa una descarga de ``yf.download(..., group_by='ticker')`` por ticker.
+
+    Args:
+        tickers (Iterable[str]): Tickers pedidos en la descarga.
+        datos (pd.DataFrame): Descarga con el ticker como primer nivel de
+            columnas, o columnas planas si se pidió un solo ticker.
+
+    Yields:
+        Tuple[str, pd.DataFrame]: Ticker y sus datos diarios.
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    if isinstance(datos.columns, pd.MultiIndex):
+        for ticker in tickers:
+            if ticker in datos.columns.get_level_values(0):
+                yield ticker, datos[ticker]
+    elif tickers:
+        yield tickers[0], datos
+
+
+def _descarga_larga(tickers: List[str], datos: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Pasa una descarga de ``yf.download`` a formato largo: una fila por (fecha, ticker).
+
+    Args:
+        tickers (List[str]): Tickers pedidos en la descarga.
+        datos (pd.DataFrame): Descarga con el ticker en algún nivel de las
+            columnas, o columnas planas si se pidió un solo ticker.
+
+    Returns:
+        Optional[pd.DataFrame]: Índice (fecha, ticker) y columnas OHLCV, o None
+            si la descarga no tiene precios.
+    """
+    if datos.empty:
+        return None
+    if isinstance(datos.columns, pd.MultiIndex):
+        # group_by='ticker' deja el ticker en el primer nivel; el default, en el último
+        nivel = 0 if set(tickers) & set(datos.columns.get_level_values(0)) else -1
+        largo = datos.stack(level=nivel, future_stack=True)
+    elif tickers:
+        largo = datos.set_axis(
+            pd.MultiIndex.from_arrays([datos.index, [tickers[0]] * len(datos)]), axis=0
+        )
+    else:
+        return None
+    if not set(COLUMNAS_PRECIOS).issubset(largo.columns):
+        return None
+    return largo
+
+
+def tuplas_stock_data(tickers: Iterable[str], datos: pd.DataFrame) -> List[Tuple]:
+    """
+    Convierte una descarga completa en tuplas de inserción, sin recorrerla fila por fila.
+
+    El bloque se apila a formato largo, los días con algún precio o volumen
+    faltante se descartan con una máscara sobre la matriz OHLCV y los tipos
+    se convierten una sola vez por columna.
+
+    Args:
+        tickers (Iterable[str]): Tickers pedidos en la descarga.
+        datos (pd.DataFrame): Descarga de ``yf.download``.
+
+    Returns:
+        List[Tuple]: ``(ticker, date, open, high, low, close, volume)`` por barra.
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    largo = _descarga_larga(tickers, datos)
+    if largo is None:
+        return []
+
+    valores = largo[COLUMNAS_PRECIOS].to_numpy(dtype=np.float64)
+    completos = ~np.isnan(valores).any(axis=1)
+    valores = valores[completos]
+    fechas = largo.index.get_level_values(0)[completos].to_pydatetime()
+    return list(zip(
+        largo.index.get_level_values(1)[completos].tolist(),
+        fechas.tolist(),
+        *valores[:, :4].T.tolist(),
+        valores[:, 4].astype(np.int64).tolist(),
+    ))
+
+
+def filas_de_descarga(tickers: Iterable[str], datos: pd.DataFrame) -> List[StockData]:
+    """
+    Convierte una descarga de ``yf.download`` de uno o varios tickers en filas de ``StockData``.
+
+    Args:
+        tickers (Iterable[str]): Tickers pedidos en la descarga.
+        datos (pd.DataFrame): Descarga de ``yf.download``.
+
+    Returns:
+        List[StockData]: Instancias sin guardar, sin los días incompletos.
+    """
+    return [
+        StockData(
+            ticker=ticker,
+            date=fecha,
+            open_price=apertura,
+            high_price=maximo,
+            low_price=minimo,
+            close_price=cierre,
+            volume=volumen,
+        )
+        for ticker, fecha, apertura, maximo, minimo, cierre, volumen
+        in tuplas_stock_data(tickers, datos)
+    ]
+
+
+def filas_stock_data(ticker: str, datos: pd.DataFrame) -> List[StockData]:
+    """
+    Convierte la descarga de un ticker en filas de ``StockData``.
+
+    Los días con algún precio o volumen faltante se descartan.
+
+    Args:
+        ticker (str): Ticker de la descarga.
+        datos (pd.DataFrame): Datos diarios del ticker.
+
+    Returns:
+        List[StockData]: Instancias sin guardar.
+    """
+    return filas_de_descarga([ticker], datos)
+
+
+def guardar_stock_data(filas: List[StockData], chunk_size: int = 500) -> int:
+    """
+    Inserta o actualiza barras de ``StockData`` por ``(ticker, date)`` en lotes.
+
+    Cada lote es un solo ``INSERT ... ON CONFLICT DO UPDATE`` dentro de su
+    propia transacción, en lugar de una consulta y una escritura por barra.
+
+    Args:
+        filas (List[StockData]): Barras a guardar.
+        chunk_size (int, optional): Filas por lote. Defaults to 500.
+
+    Returns:
+        int: Cantidad de filas insertadas o actualizadas.
+    """
+    inicio = time.perf_counter()
+    guardadas = 0
+    for i in range(0, len(filas), chunk_size):
+        with transaction.atomic():
+            guardadas += len(StockData.objects.bulk_create(
+                filas[i:i + chunk_size],
+                update_conflicts=True,
+                update_fields=CAMPOS_PRECIOS,
+                unique_fields=['ticker', 'date'],
+            ))
+
+    segundos = time.perf_counter() - inicio
+    if guardadas:
+        logger.info(
+            f"{guardadas} filas de StockData guardadas en {segundos:.2f}s "
+            f"({guardadas / max(segundos, 1e-9):.0f} filas/s)"
+        )
+    return guardadas
+
+
+def resumen_por_ticker(filas: Iterable[StockData]) -> Dict[str, Tuple[date, int]]:
+    """
+    Resume las barras guardadas por ticker para avanzar sus marcas de ingesta.
+
+    Args:
+        filas (Iterable[StockData]): Barras guardadas.
+
+    Returns:
+        Dict[str, Tuple[date, int]]: Por ticker, la última fecha y la cantidad de filas.
+    """
+    resumen: Dict[str, Tuple[date, int]] = {}
+    for fila in filas:
+        dia = fila.date.date() if hasattr(fila.date, 'date') else fila.date
+        ultima, cantidad = resumen.get(fila.ticker, (dia, 0))
+        resumen[fila.ticker] = (max(ultima, dia), cantidad + 1)
+    return resumen
+
+
+def agrupar_por_inicio(tickers: Iterable[str], ultimas_fechas: Dict[str, Optional[date]],
+                       inicio_por_defecto: date = INICIO_HISTORIA) -> Dict[date, List[str]]:
+    """
+    Agrupa los tickers por la fecha desde la que hay que descargarlos.
+
+    Cada ticker continúa desde el día siguiente a su última fecha guardada;
+    los que no tienen datos empiezan en ``inicio_por_defecto``. Los tickers de
+    un mismo grupo se pueden pedir juntos en una sola llamada a ``yf.download``.
+
+    Args:
+        tickers (Iterable[str]): Tickers a descargar.
+        ultimas_fechas (Dict[str, Optional[date]]): Última fecha guardada por ticker.
+        inicio_por_defecto (date, optional): Inicio para tickers sin datos.
+            Defaults to ``INICIO_HISTORIA``.
+
+    Returns:
+        Dict[date, List[str]]: Tickers por fecha de inicio, en orden de fecha.
+    """
+    grupos: Dict[date, List[str]] = defaultdict(list)
+    for ticker in dict.fromkeys(tickers):
+        ultima = ultimas_fechas.get(ticker)
+        grupos[ultima + timedelta(days=1) if ultima else inicio_por_defecto].append(ticker)
+    return dict(sorted(grupos.items()))
+
+
+def extraer_acciones_corporativas(ticker: str,
+                                  datos: pd.DataFrame) -> Tuple[List[Dividend], List[Split]]:
+    """
+    Extrae dividendos y splits de una descarga de ``yf.download(..., actions=True)``.
+
+    Args:
+        ticker (str): Ticker de la descarga.
+        datos (pd.DataFrame): Datos diarios del ticker con las columnas
+            ``Dividends`` y ``Stock Splits``.
+
+    Returns:
+        Tuple[List[Dividend], List[Split]]: Instancias sin guardar de los días
+            con dividendo o split.
+    """
+    datos = _columnas_del_ticker(ticker, datos)
+
+    dividendos, splits = [], []
+    if 'Dividends' in datos.columns:
+        pagos = datos['Dividends'].fillna(0)
+        dividendos = [
+            Dividend(ticker=ticker, date=fecha.date(), amount=float(monto))
+            for fecha, monto in pagos[pagos > 0].items()
+        ]
+    if 'Stock Splits' in datos.columns:
+        ratios = datos['Stock Splits'].fillna(0)
+        splits = [
+            Split(ticker=ticker, date=fecha.date(), ratio=float(ratio))
+            for fecha, ratio in ratios[ratios > 0].items()
+        ]
+    return dividendos, splits
+
+
+def guardar_acciones_corporativas(dividendos: List[Dividend], splits: List[Split]) -> int:
+    """
+    Inserta o actualiza dividendos y splits por ``(ticker, date)``.
+
+    Args:
+        dividendos (List[Dividend]): Dividendos a guardar.
+        splits (List[Split]): Splits a guardar.
+
+    Returns:
+        int: Cantidad de registros guardados.
+    """
+    with transaction.atomic():
+        guardados = Dividend.objects.bulk_create(
+            dividendos, update_conflicts=True,
+            update_fields=['amount'], unique_fields=['ticker', 'date'],
+        )
+        guardados += Split.objects.bulk_create(
+            splits, update_conflicts=True,
+            update_fields=['ratio'], unique_fields=['ticker', 'date'],
+        )
+    return len(guardados)
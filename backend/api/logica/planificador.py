@@ -0,0 +1,323 @@
+"""
+Planificador de ingesta reanudable para el universo de CEDEARs.
+
+Un trabajo (``IngestionJob``) divide los tickers en bloques
+(``IngestionBlock``) agrupados por su fecha de inicio, según las marcas de
+ingesta de cada ticker. Los bloques se procesan en un pool de hilos, cada uno
+con reintentos y espera exponencial, y su estado queda en la base de datos:
+si la ejecución se interrumpe, la siguiente retoma el trabajo pendiente y
+solo procesa los bloques que no terminaron. Los intentos de cada bloque se
+acumulan entre ejecuciones: un bloque que agota ``INGESTION_MAX_ATTEMPTS``
+queda abandonado, de modo que un ticker que falla siempre (por ejemplo, uno
+deslistado) no mantiene abierto el trabajo y las siguientes ejecuciones
+planifican trabajos nuevos.
+
+Las descargas pasan por el transporte de Yahoo Finance con el limitador de
+tasa propio de la ingesta (un turno por ticker, separado del de las
+solicitudes) y hacen las llamadas a ``yf.download`` de a una; el pool superpone la descarga de un
+bloque con la conversión y el guardado de los demás. Los tests usan un descargador falso
+con el mismo método ``download``.
+"""
+import logging
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import IngestionBlock, IngestionJob
+from api.repositories.watermark_repository import IngestionWatermarkRepository
+from api.utils.yahoo_fetcher import YFinanceTransport, ingesta_rate_limiter
+from .carga_copy import CargadorCopy
+from .ingesta import (
+    agrupar_por_inicio,
+    extraer_acciones_corporativas,
+    filas_de_descarga,
+    finalizar_ingesta,
+    frames_por_ticker,
+    guardar_acciones_corporativas,
+    guardar_stock_data,
+    resumen_por_ticker,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lock de una sola ejecución: advisory lock de sesión en PostgreSQL, que se libera
+# solo si el proceso muere; en otras bases (desarrollo) se usa la caché
+LOCK_KEY = 'ingestion:scheduler:lock'
+LOCK_ID = zlib.crc32(LOCK_KEY.encode())
+LOCK_TIMEOUT = 6 * 60 * 60
+
+# Rango mínimo en días para considerar sospechosa una descarga vacía
+# (fines de semana y feriados devuelven descargas vacías legítimas)
+DIAS_DESCARGA_VACIA = 5
+
+
+def _tomar_lock() -> bool:
+    """
+    Intenta tomar el lock de ejecución única del planificador sin esperar.
+
+    Returns:
+        bool: True si el lock quedó tomado por esta ejecución.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [LOCK_ID])
+            return bool(cursor.fetchone()[0])
+    return cache.add(LOCK_KEY, True, LOCK_TIMEOUT)
+
+
+def _liberar_lock() -> None:
+    """
+    Libera el lock tomado con ``_tomar_lock``.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [LOCK_ID])
+    else:
+        cache.delete(LOCK_KEY)
+
+
+class PlanificadorIngesta:
+    """
+    Ejecuta la ingesta de precios en bloques paralelos, con reintentos y reanudación.
+    """
+
+    def __init__(self, transport: Optional[Any] = None, workers: Optional[int] = None,
+                 retries: Optional[int] = None, backoff: Optional[float] = None,
+                 block_size: Optional[int] = None, usar_copy: bool = False,
+                 max_attempts: Optional[int] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Inicializa el planificador.
+
+        Args:
+            transport (Optional[Any], optional): Objeto con un método
+                ``download(tickers, start, end)``. Defaults to un ``YFinanceTransport``
+                con ``ingesta_rate_limiter``.
+            workers (Optional[int], optional): Bloques simultáneos.
+                Defaults to ``settings.INGESTION_WORKERS``.
+            retries (Optional[int], optional): Reintentos por bloque.
+                Defaults to ``settings.INGESTION_RETRIES``.
+            backoff (Optional[float], optional): Espera inicial entre reintentos,
+                que se duplica en cada intento. Defaults to ``settings.INGESTION_BACKOFF``.
+            block_size (Optional[int], optional): Tickers por bloque.
+                Defaults to ``settings.INGESTION_BLOCK_SIZE``.
+            usar_copy (bool, optional): Guardar con ``COPY`` en lugar del upsert
+                por lotes. Defaults to False.
+            max_attempts (Optional[int], optional): Intentos de un bloque sumando
+                todas las ejecuciones antes de abandonarlo.
+                Defaults to ``settings.INGESTION_MAX_ATTEMPTS``.
+            sleep (Callable[[float], None], optional): Función de espera.
+                Defaults to ``time.sleep``.
+        """
+        self.transport = transport or YFinanceTransport(rate_limiter=ingesta_rate_limiter)
+        self.workers = workers or getattr(settings, 'INGESTION_WORKERS', 4)
+        self.retries = retries if retries is not None else getattr(settings, 'INGESTION_RETRIES', 3)
+        self.backoff = backoff if backoff is not None else getattr(settings, 'INGESTION_BACKOFF', 5)
+        self.block_size = block_size or getattr(settings, 'INGESTION_BLOCK_SIZE', 50)
+        self.usar_copy = usar_copy
+        self.max_attempts = max_attempts or getattr(settings, 'INGESTION_MAX_ATTEMPTS', 12)
+        self._sleep = sleep
+
+    def planificar(self, tickers: Iterable[str], end_date: Optional[date] = None) -> IngestionJob:
+        """
+        Crea un trabajo con un bloque por grupo de tickers con la misma fecha de inicio.
+
+        Args:
+            tickers (Iterable[str]): Tickers a ingerir.
+            end_date (Optional[date], optional): Fin exclusivo de las descargas.
+                Defaults to hoy.
+
+        Returns:
+            IngestionJob: El trabajo creado, con sus bloques pendientes.
+        """
+        tickers = [t for t in dict.fromkeys(tickers) if t]
+        end_date = end_date or timezone.now().date()
+        marcas = IngestionWatermarkRepository.inicializar(tickers)
+        grupos = agrupar_por_inicio(tickers, {t: m.last_date for t, m in marcas.items()})
+
+        job = IngestionJob.objects.create(end_date=end_date)
+        IngestionBlock.objects.bulk_create([
+            IngestionBlock(job=job, tickers=grupo[i:i + self.block_size], start_date=start_date)
+            for start_date, grupo in grupos.items() if start_date < end_date
+            for i in range(0, len(grupo), self.block_size)
+        ])
+        logger.info(f"Ingesta {job.id} planificada con {job.blocks.count()} bloques")
+        return job
+
+    @staticmethod
+    def trabajo_pendiente() -> Optional[IngestionJob]:
+        """
+        Obtiene el último trabajo que no terminó completo, si existe.
+
+        Returns:
+            Optional[IngestionJob]: El trabajo a reanudar o None.
+        """
+        return IngestionJob.objects.exclude(status='done').order_by('-started_at').first()
+
+    def run(self, tickers: Iterable[str], nuevo: bool = False,
+            end_date: Optional[date] = None) -> Optional[IngestionJob]:
+        """
+        Reanuda el trabajo pendiente o planifica uno nuevo, y lo ejecuta.
+
+        Solo una ejecución a la vez entre procesos: si otra tiene el lock, no hace nada.
+
+        Args:
+            tickers (Iterable[str]): Tickers para un trabajo nuevo (se ignoran al reanudar).
+            nuevo (bool, optional): Descartar el trabajo pendiente y planificar
+                uno nuevo. Defaults to False.
+            end_date (Optional[date], optional): Fin exclusivo de las descargas
+                de un trabajo nuevo. Defaults to hoy.
+
+        Returns:
+            Optional[IngestionJob]: El trabajo ejecutado, o None si había otra ejecución en curso.
+        """
+        if not _tomar_lock():
+            logger.warning("Ya hay una ingesta en curso; se omite esta ejecución")
+            return None
+        try:
+            job = None if nuevo else self.trabajo_pendiente()
+            if job is None:
+                job = self.planificar(tickers, end_date)
+            else:
+                logger.info(f"Reanudando la ingesta {job.id}")
+            return self.ejecutar(job)
+        finally:
+            _liberar_lock()
+
+    def ejecutar(self, job: IngestionJob) -> IngestionJob:
+        """
+        Procesa en paralelo los bloques del trabajo que no están completos.
+
+        Args:
+            job (IngestionJob): Trabajo a ejecutar.
+
+        Returns:
+            IngestionJob: El trabajo con su estado final.
+        """
+        IngestionJob.objects.filter(id=job.id).update(status='running', finished_at=None)
+        bloques = list(job.blocks.exclude(status='done').order_by('id'))
+
+        if self.workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='ingesta'
+            ) as executor:
+                list(executor.map(
+                    lambda bloque: self._procesar_en_hilo(bloque, job.end_date), bloques
+                ))
+        else:
+            for bloque in bloques:
+                self._procesar_bloque(bloque, job.end_date)
+
+        # Etapas posteriores una sola vez, para todos los tickers con filas nuevas del trabajo
+        actualizados: List[str] = []
+        hechos = job.blocks.filter(status='done', rows__gt=0)
+        for tickers in hechos.values_list('tickers', flat=True):
+            actualizados += tickers
+        finalizar_ingesta(actualizados)
+
+        fallidos = job.blocks.filter(status='failed').count()
+        abandonados = job.blocks.filter(status='abandoned').count()
+        # Los bloques abandonados no se reintentan: el trabajo se cierra igual
+        IngestionJob.objects.filter(id=job.id).update(
+            status='failed' if fallidos else 'done', finished_at=timezone.now()
+        )
+        job.refresh_from_db()
+        logger.info(
+            f"Ingesta {job.id} terminada: {job.status} "
+            f"({fallidos} bloques fallidos, {abandonados} abandonados)"
+        )
+        return job
+
+    def _procesar_en_hilo(self, bloque: IngestionBlock, end_date: date) -> int:
+        try:
+            return self._procesar_bloque(bloque, end_date)
+        finally:
+            # Cada hilo del pool abre su propia conexión a la base de datos
+            connection.close()
+
+    def _procesar_bloque(self, bloque: IngestionBlock, end_date: date) -> int:
+        """
+        Ingiere un bloque reintentando con espera exponencial.
+
+        Args:
+            bloque (IngestionBlock): Bloque a procesar.
+            end_date (date): Fin exclusivo de la descarga.
+
+        Returns:
+            int: Filas guardadas (0 si el bloque falló o quedó abandonado).
+        """
+        bloques = IngestionBlock.objects.filter(id=bloque.id)
+        # Los intentos de ejecuciones anteriores cuentan para el máximo del bloque
+        intentos = min(self.retries + 1, self.max_attempts - bloque.attempts)
+        if intentos <= 0:
+            bloques.update(status='abandoned')
+            return 0
+
+        for intento in range(intentos):
+            bloques.update(status='running', attempts=F('attempts') + 1)
+            try:
+                filas = self._ingestar(bloque.tickers, bloque.start_date, end_date)
+            except Exception as e:
+                logger.warning(
+                    f"Bloque {bloque.id} falló (intento {bloque.attempts + intento + 1}): {e}"
+                )
+                if intento < intentos - 1:
+                    self._sleep(self.backoff * (2 ** intento))
+                    continue
+                agotado = bloque.attempts + intentos >= self.max_attempts
+                if agotado:
+                    logger.error(
+                        f"Bloque {bloque.id} abandonado tras {self.max_attempts} intentos: "
+                        f"{bloque.tickers}"
+                    )
+                bloques.update(status='abandoned' if agotado else 'failed', error=str(e))
+                return 0
+            bloques.update(status='done', rows=filas, error='')
+            return filas
+        return 0
+
+    def _ingestar(self, tickers: List[str], start_date: date, end_date: date) -> int:
+        """
+        Descarga y guarda un bloque, y avanza las marcas de sus tickers.
+
+        Args:
+            tickers (List[str]): Tickers del bloque.
+            start_date (date): Fecha de inicio de la descarga.
+            end_date (date): Fin exclusivo de la descarga.
+
+        Returns:
+            int: Filas guardadas.
+        """
+        datos = self.transport.download(tickers, start=start_date, end=end_date)
+        if datos.empty and (end_date - start_date).days >= DIAS_DESCARGA_VACIA:
+            raise ValueError(f"Descarga vacía para {len(tickers)} tickers desde {start_date}")
+
+        dividendos, splits = [], []
+        if self.usar_copy:
+            with CargadorCopy() as cargador:
+                for ticker, frame in frames_por_ticker(tickers, datos):
+                    acciones = extraer_acciones_corporativas(ticker, frame)
+                    dividendos += acciones[0]
+                    splits += acciones[1]
+                    cargador.agregar(ticker, frame)
+            guardadas, resumen = cargador.guardadas, cargador.resumen
+        else:
+            for ticker, frame in frames_por_ticker(tickers, datos):
+                acciones = extraer_acciones_corporativas(ticker, frame)
+                dividendos += acciones[0]
+                splits += acciones[1]
+            filas = filas_de_descarga(tickers, datos)
+            guardadas, resumen = guardar_stock_data(filas), resumen_por_ticker(filas)
+
+        if dividendos or splits:
+            guardar_acciones_corporativas(dividendos, splits)
+        IngestionWatermarkRepository.registrar(resumen)
+        return guardadas
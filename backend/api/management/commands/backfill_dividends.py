@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from api.models import StockData
+from api.services.acciones_corporativas import backfill_dividendos
+
+
+class Command(BaseCommand):
+    help = 'Load the full dividend history of each ticker from Yahoo Finance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tickers', nargs='*', help='Tickers a cargar (por defecto, todos los de StockData)'
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=50, help='Tickers por bloque de descarga'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=300, help='Plazo en segundos por bloque'
+        )
+
+    def handle(self, *args, **options):
+        tickers = options['tickers'] or list(
+            StockData.objects.values_list('ticker', flat=True).distinct().order_by('ticker')
+        )
+        block_size = options['block_size']
+
+        ok = 0
+        for i in range(0, len(tickers), block_size):
+            block = tickers[i:i + block_size]
+            self.stdout.write(f'Cargando dividendos de: {", ".join(block)}...')
+            for ticker, estado in backfill_dividendos(block, timeout=options['timeout']).items():
+                if estado == 'ok':
+                    ok += 1
+                else:
+                    self.stdout.write(self.style.WARNING(f'{ticker}: {estado}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Dividendos cargados: {ok}/{len(tickers)} tickers'))
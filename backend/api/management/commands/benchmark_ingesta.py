@@ -0,0 +1,148 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.logica.carga_copy import CargadorCopy
+from api.logica.ingesta import filas_de_descarga, guardar_stock_data, tuplas_stock_data
+from api.models import StockData
+
+
+def descarga_sintetica(fechas, semilla):
+    """Generar un DataFrame con el formato de yf.download para un ticker."""
+    rng = np.random.default_rng(semilla)
+    cierre = 100 * np.cumprod(1 + rng.normal(0, 0.02, len(fechas)))
+    return pd.DataFrame({
+        'Open': cierre * (1 + rng.normal(0, 0.005, len(fechas))),
+        'High': cierre * 1.01,
+        'Low': cierre * 0.99,
+        'Close': cierre,
+        'Volume': rng.integers(1_000, 1_000_000, len(fechas)),
+    }, index=fechas)
+
+
+def filas_iterrows(tickers, stock_data):
+    """Conversión anterior del comando import_stock_data, fila por fila (referencia)."""
+    updates = []
+    for ticker in tickers:
+        ticker_data = stock_data[ticker]
+        for index, row in ticker_data.iterrows():
+            if not row[['Open', 'High', 'Low', 'Close', 'Volume']].isnull().any():
+                updates.append(
+                    StockData(
+                        ticker=ticker,
+                        date=index.to_pydatetime(),
+                        open_price=row['Open'],
+                        high_price=row['High'],
+                        low_price=row['Low'],
+                        close_price=row['Close'],
+                        volume=int(row['Volume']),
+                    )
+                )
+    return updates
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark StockData ingestion: frame-to-rows conversion and bulk upsert vs COPY '
+        '(DB changes are rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickers', type=int, default=500,
+                            help='Cantidad de tickers sintéticos')
+        parser.add_argument('--years', type=int, default=10,
+                            help='Años de historia diaria por ticker')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Filas por lote del upsert')
+        parser.add_argument('--copy-batch', type=int, default=100_000, help='Filas por COPY')
+        parser.add_argument('--conversion-only', action='store_true',
+                            help='Medir solo la conversión de DataFrame a filas '
+                                 '(no usa la base de datos)')
+        parser.add_argument('--skip-iterrows', action='store_true',
+                            help='No medir la conversión anterior con iterrows '
+                                 '(lenta con muchos tickers)')
+
+    def handle(self, *args, **options):
+        fechas = pd.bdate_range(
+            end=pd.Timestamp.today().normalize(), periods=252 * options['years']
+        )
+        tickers = [f'ZZB{i:04d}' for i in range(options['tickers'])]
+        self.stdout.write(
+            f'{len(tickers)} tickers x {len(fechas)} días = {len(tickers) * len(fechas)} filas'
+        )
+
+        self.benchmark_conversion(tickers, fechas, options['skip_iterrows'])
+        if options['conversion_only']:
+            return
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark de guardado requiere PostgreSQL (COPY).')
+        self.benchmark_guardado(tickers, fechas, options)
+
+    def benchmark_conversion(self, tickers, fechas, skip_iterrows):
+        """Comparar la conversión fila por fila con la vectorizada sobre un bloque por ticker."""
+        bloque = pd.concat(
+            {t: descarga_sintetica(fechas, i) for i, t in enumerate(tickers)}, axis=1
+        )
+        bloque.iloc[::97, 3::5] = np.nan  # Algunos días incompletos, como en las descargas reales
+
+        conversiones = [
+            ('tuplas vectorizadas', lambda: tuplas_stock_data(tickers, bloque)),
+            ('StockData vectorizado', lambda: filas_de_descarga(tickers, bloque)),
+        ]
+        if not skip_iterrows:
+            conversiones.insert(0, ('StockData iterrows', lambda: filas_iterrows(tickers, bloque)))
+
+        for nombre, conversion in conversiones:
+            inicio = time.perf_counter()
+            filas = len(conversion())
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(
+                f'{nombre:>22}: {filas} filas en {segundos:.2f}s '
+                f'({filas / max(segundos, 1e-9):.0f} filas/s)'
+            )
+
+    def benchmark_guardado(self, tickers, fechas, options):
+        """Comparar el upsert por lotes con COPY en streaming."""
+        def descargas():
+            # Las descargas se generan de a una, como llegan de yf.download por bloque
+            for i, ticker in enumerate(tickers):
+                yield ticker, descarga_sintetica(fechas, i)
+
+        def bulk_upsert():
+            filas = []
+            for ticker, datos in descargas():
+                filas += filas_de_descarga([ticker], datos)
+            return guardar_stock_data(filas, chunk_size=options['chunk_size'])
+
+        def copy_streaming():
+            with CargadorCopy(filas_por_lote=options['copy_batch']) as cargador:
+                for ticker, datos in descargas():
+                    cargador.agregar(ticker, datos)
+            return cargador.guardadas
+
+        cargas = (('bulk_create upsert', bulk_upsert), ('COPY streaming', copy_streaming))
+        for nombre, carga in cargas:
+            filas, segundos, pico = self.medir(carga)
+            self.stdout.write(
+                f'{nombre:>22}: {filas} filas en {segundos:.2f}s '
+                f'({filas / max(segundos, 1e-9):.0f} filas/s), '
+                f'pico de memoria {pico / 2**20:.1f} MiB'
+            )
+
+    def medir(self, carga):
+        """Ejecutar una carga dentro de una transacción que se revierte."""
+        with transaction.atomic():
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            try:
+                filas = carga()
+                segundos = time.perf_counter() - inicio
+                pico = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                transaction.set_rollback(True)
+        return filas, segundos, pico
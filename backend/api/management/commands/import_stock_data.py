@@ -1,10 +1,21 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import time
 import yfinance as yf
-from django.core.management.base import BaseCommand
-from django.db import transaction
-import pandas as pd
-from api.models import StockData
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from api.logica.carga_copy import CargadorCopy
+from api.logica.ingesta import (
+    agrupar_por_inicio,
+    extraer_acciones_corporativas,
+    filas_de_descarga,
+    finalizar_ingesta,
+    frames_por_ticker,
+    guardar_acciones_corporativas,
+    guardar_stock_data,
+    resumen_por_ticker,
+)
+from api.repositories.watermark_repository import IngestionWatermarkRepository
 from api.utils.cedear_scraper import obtener_tickers_cedears
 
 
@@ -25,77 +36,106 @@ def save_last_execution():
 class Command(BaseCommand):
     help = 'Import daily stock data from Yahoo Finance'
 
-    def fetch_and_save_stock_data(self, tickers, start_date, end_date, full_download=False):
-        """Descargar y guardar datos del stock."""
-        self.stdout.write(f'Descargando datos desde {start_date} hasta {end_date} para: {", ".join(tickers)}...')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Cargar con COPY de PostgreSQL en streaming (para historias completas)',
+        )
+        parser.add_argument(
+            '--copy-batch',
+            type=int,
+            default=100_000,
+            help='Filas acumuladas antes de cada COPY en modo --backfill',
+        )
 
-        stock_data = yf.download(
+    def download(self, tickers, start_date, end_date):
+        """Descargar datos diarios de Yahoo Finance."""
+        self.stdout.write(
+            f'Descargando datos desde {start_date} hasta {end_date} para: {", ".join(tickers)}...'
+        )
+        return yf.download(
             tickers=tickers,
             start=start_date,
             end=end_date,
             threads=True,
             group_by='ticker',
-            auto_adjust=False
+            auto_adjust=False,
+            actions=True,
         )
 
+    def fetch_and_save_stock_data(self, tickers, start_date, end_date, full_download=False):
+        """Descargar y guardar datos del stock."""
+        if self.backfill:
+            return self.stream_stock_data(tickers, start_date, end_date)
+
+        stock_data = self.download(tickers, start_date, end_date)
+
         updates = []
-        
-        if isinstance(stock_data.columns, pd.MultiIndex):
-            for ticker in tickers:
-                if ticker in stock_data.columns.get_level_values(0):
-                    ticker_data = stock_data[ticker]
-                    for index, row in ticker_data.iterrows():
-                        if not row[['Open', 'High', 'Low', 'Close', 'Volume']].isnull().any():
-                            updates.append(
-                                StockData(
-                                    ticker=ticker,
-                                    date=index.to_pydatetime(),
-                                    open_price=row['Open'],
-                                    high_price=row['High'],
-                                    low_price=row['Low'],
-                                    close_price=row['Close'],
-                                    volume=int(row['Volume']),
-                                )
-                            )
-        else:
-            ticker = tickers[0] if isinstance(tickers, list) else tickers
-            for index, row in stock_data.iterrows():
-                if not row[['Open', 'High', 'Low', 'Close', 'Volume']].isnull().any():
-                    updates.append(
-                        StockData(
-                            ticker=ticker,
-                            date=index.to_pydatetime(),
-                            open_price=row['Open'],
-                            high_price=row['High'],
-                            low_price=row['Low'],
-                            close_price=row['Close'],
-                            volume=int(row['Volume']),
-                        )
-                    )
-        
+        dividends, splits = [], []
+        for ticker, ticker_data in frames_por_ticker(tickers, stock_data):
+            ticker_dividends, ticker_splits = extraer_acciones_corporativas(ticker, ticker_data)
+            dividends += ticker_dividends
+            splits += ticker_splits
+
+        # Conversión vectorizada de todo el bloque a filas de StockData
+        updates = filas_de_descarga(tickers, stock_data)
+
+        if dividends or splits:
+            saved = guardar_acciones_corporativas(dividends, splits)
+            self.stdout.write(f'Se han guardado {saved} dividendos/splits.')
         self.save_to_db(updates)
         self.stdout.write(self.style.SUCCESS(f'Datos actualizados para: {", ".join(tickers)}'))
 
+    def stream_stock_data(self, tickers, start_date, end_date):
+        """Descargar y guardar con COPY sin crear instancias de StockData."""
+        stock_data = self.download(tickers, start_date, end_date)
+
+        dividends, splits = [], []
+        with CargadorCopy(filas_por_lote=self.copy_batch) as cargador:
+            for ticker, ticker_data in frames_por_ticker(tickers, stock_data):
+                ticker_dividends, ticker_splits = extraer_acciones_corporativas(ticker, ticker_data)
+                dividends += ticker_dividends
+                splits += ticker_splits
+                cargador.agregar(ticker, ticker_data)
+        del stock_data
+
+        if dividends or splits:
+            saved = guardar_acciones_corporativas(dividends, splits)
+            self.stdout.write(f'Se han guardado {saved} dividendos/splits.')
+        self.stdout.write(
+            f'Se han insertado/actualizado {cargador.guardadas} registros con COPY '
+            f'en {cargador.segundos:.2f}s '
+            f'({cargador.guardadas / max(cargador.segundos, 1e-9):.0f} filas/s).'
+        )
+        IngestionWatermarkRepository.registrar(cargador.resumen)
+        finalizar_ingesta(sorted(cargador.tickers))
+        self.stdout.write(self.style.SUCCESS(f'Datos actualizados para: {", ".join(tickers)}'))
+
     def save_to_db(self, updates, chunk_size=500):
         """Guardar datos en la base de datos por chunks."""
         if not updates:
             self.stdout.write('No hay datos nuevos para guardar.')
             return
 
-        total_inserted = 0
-        for i in range(0, len(updates), chunk_size):
-            chunk = updates[i:i+chunk_size]
-            with transaction.atomic():
-                inserted = StockData.objects.bulk_create(
-                    chunk,
-                    update_conflicts=True,
-                    update_fields=['open_price', 'high_price', 'low_price', 'close_price', 'volume'],
-                    unique_fields=['ticker', 'date'],
-                )
-                total_inserted += len(inserted)
-        self.stdout.write(f'Se han insertado/actualizado {total_inserted} registros.')
+        start = time.perf_counter()
+        total_inserted = guardar_stock_data(updates, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Se han insertado/actualizado {total_inserted} registros '
+            f'en {elapsed:.2f}s ({total_inserted / max(elapsed, 1e-9):.0f} filas/s).'
+        )
+
+        # Avanzar las marcas e indicadores e invalidar las cachés de los tickers actualizados
+        IngestionWatermarkRepository.registrar(resumen_por_ticker(updates))
+        finalizar_ingesta(update.ticker for update in updates)
 
     def handle(self, *args, **kwargs):
+        self.backfill = kwargs.get('backfill', False)
+        self.copy_batch = kwargs.get('copy_batch', 100_000)
+        if self.backfill and connection.vendor != 'postgresql':
+            raise CommandError('El modo --backfill requiere PostgreSQL (COPY).')
+
         self.stdout.write(f'Última ejecución: {get_last_execution()}')
 
         tickers = obtener_tickers_cedears()
@@ -105,30 +145,16 @@ class Command(BaseCommand):
         tickers = list(set(tickers))  # quitar duplicados
         tickers =  ["AAPL", "MSFT", "TSLA",'^GSPC']
 
-        ticker_blocks = [tickers[i:i + 50] for i in range(0, len(tickers), 50)]
-
-        # Obtener los tickers ya almacenados en la base de datos
-        stored_tickers = StockData.objects.values_list('ticker', flat=True).distinct()
-
-        # Filtrar los nuevos tickers
-        new_tickers = [ticker for ticker in tickers if ticker not in stored_tickers]
-
-        # Para los tickers nuevos, descargamos toda la información desde el primer día
-        if new_tickers:
-            for ticker in new_tickers:
-                self.stdout.write(f'Descargando datos completos para el nuevo ticker: {ticker}...')
-                self.fetch_and_save_stock_data([ticker], datetime(2015, 1, 1).date(), datetime.now().date(), full_download=True)
-
-        # Descargamos los datos faltantes para los tickers existentes
-        last_record = StockData.objects.order_by('-date').first()
-        if last_record:
-            start_date = last_record.date + timedelta(days=1)
-        else:
-            start_date = datetime.strptime('2015-01-01', '%Y-%m-%d').date()
-
+        # Cada ticker continúa desde su propia marca; los nuevos, desde el inicio de la historia
+        watermarks = IngestionWatermarkRepository.inicializar(tickers)
+        groups = agrupar_por_inicio(tickers, {t: w.last_date for t, w in watermarks.items()})
         end_date = datetime.now().date()
 
-        for block in ticker_blocks:
-            self.fetch_and_save_stock_data(block, start_date, end_date)
+        # Los tickers con la misma fecha de inicio se descargan juntos, de a 50
+        for start_date, group in groups.items():
+            if start_date >= end_date:
+                continue
+            for i in range(0, len(group), 50):
+                self.fetch_and_save_stock_data(group[i:i + 50], start_date, end_date)
 
         save_last_execution()
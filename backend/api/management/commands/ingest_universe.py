@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.logica.planificador import PlanificadorIngesta
+from api.utils.cedear_scraper import obtener_tickers_cedears
+
+
+EXTRA_TICKERS = ['^GSPC', 'QQQ']
+
+
+class Command(BaseCommand):
+    help = 'Ingest the CEDEAR universe in parallel blocks, resuming the last unfinished job'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tickers', nargs='*', help='Tickers a ingerir (por defecto, los CEDEARs y los índices)'
+        )
+        parser.add_argument('--workers', type=int, help='Bloques descargados en paralelo')
+        parser.add_argument('--block-size', type=int, help='Tickers por bloque')
+        parser.add_argument('--retries', type=int, help='Reintentos por bloque')
+        parser.add_argument(
+            '--new', action='store_true',
+            help='Planificar un trabajo nuevo aunque haya uno pendiente',
+        )
+        parser.add_argument('--copy', action='store_true', help='Guardar con COPY de PostgreSQL')
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('La opción --copy requiere PostgreSQL (COPY).')
+
+        tickers = options['tickers']
+        if not tickers:
+            tickers = EXTRA_TICKERS + [t for t in obtener_tickers_cedears() if t]
+
+        planificador = PlanificadorIngesta(
+            workers=options['workers'],
+            retries=options['retries'],
+            block_size=options['block_size'],
+            usar_copy=options['copy'],
+        )
+        job = planificador.run(tickers, nuevo=options['new'])
+        if job is None:
+            self.stdout.write(self.style.WARNING('Ya hay una ingesta en curso.'))
+            return
+
+        bloques = job.blocks.all()
+        filas = sum(bloque.rows for bloque in bloques)
+        fallidos = [bloque for bloque in bloques if bloque.status == 'failed']
+        for bloque in fallidos:
+            self.stdout.write(self.style.WARNING(
+                f'Bloque {bloque.id} ({", ".join(bloque.tickers)}): {bloque.error}'
+            ))
+
+        mensaje = (
+            f'Ingesta {job.id}: {len(bloques)} bloques, {filas} filas, '
+            f'{len(fallidos)} fallidos.'
+        )
+        if fallidos:
+            self.stdout.write(self.style.WARNING(mensaje + ' Volver a ejecutar para reanudar.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(mensaje))
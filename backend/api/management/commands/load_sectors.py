@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.sectores import URL_SP500, cargar_sectores, leer_constituyentes
+
+
+class Command(BaseCommand):
+    help = 'Load the S&P 500 GICS sector of each ticker into SectorMembership'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            help='CSV con columnas Symbol/ticker, GICS Sector/sector y opcionalmente '
+                 'GICS Sub-Industry/sub_industry (por defecto, la lista de Wikipedia)',
+        )
+
+    def handle(self, *args, **options):
+        origen = options['file']
+        self.stdout.write(f'Leyendo constituyentes desde {origen or URL_SP500}...')
+        try:
+            constituyentes = leer_constituyentes(origen)
+        except Exception as e:
+            raise CommandError(f'No se pudo leer la composición sectorial: {e}')
+
+        if constituyentes.empty:
+            raise CommandError('La composición sectorial está vacía; no se reemplaza la tabla.')
+
+        guardados = cargar_sectores(constituyentes)
+        sectores = constituyentes['sector'].nunique()
+        self.stdout.write(self.style.SUCCESS(
+            f'Sectores cargados: {guardados} tickers en {sectores} sectores.'
+        ))
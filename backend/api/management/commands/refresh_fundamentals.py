@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from api.models import StockData
+from api.services.fundamental import actualizar_fundamentales
+
+
+class Command(BaseCommand):
+    help = 'Refresh the fundamentals snapshot of each ticker from Yahoo Finance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tickers', nargs='*', help='Tickers a actualizar (por defecto, todos los de StockData)'
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=50, help='Tickers por bloque de descarga'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=300, help='Plazo en segundos por bloque'
+        )
+
+    def handle(self, *args, **options):
+        tickers = options['tickers'] or list(
+            StockData.objects.values_list('ticker', flat=True).distinct().order_by('ticker')
+        )
+        block_size = options['block_size']
+
+        ok = 0
+        for i in range(0, len(tickers), block_size):
+            block = tickers[i:i + block_size]
+            self.stdout.write(f'Actualizando fundamentales de: {", ".join(block)}...')
+            estados = actualizar_fundamentales(block, timeout=options['timeout'])
+            for ticker, estado in estados.items():
+                if estado == 'ok':
+                    ok += 1
+                else:
+                    self.stdout.write(self.style.WARNING(f'{ticker}: {estado}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Snapshots actualizados: {ok}/{len(tickers)}'))
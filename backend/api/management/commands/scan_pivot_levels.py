@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from api.services.pivot import LOOKBACK_DEFAULT, N1_DEFAULT, N2_DEFAULT
+from api.services.screener_pivotes import escanear_niveles
+
+
+class Command(BaseCommand):
+    help = 'Compute support/resistance levels of every ticker into PivotLevel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tickers', nargs='*', help='Tickers a escanear (por defecto, todos los de StockData)'
+        )
+        parser.add_argument(
+            '--n1', type=int, default=N1_DEFAULT, help='Velas a la izquierda de un pivote'
+        )
+        parser.add_argument(
+            '--n2', type=int, default=N2_DEFAULT, help='Velas a la derecha de un pivote'
+        )
+        parser.add_argument(
+            '--lookback', type=int, default=LOOKBACK_DEFAULT, help='Velas analizadas por ticker'
+        )
+        parser.add_argument('--workers', type=int, help='Procesos del pool (1 = sin pool)')
+
+    def handle(self, *args, **options):
+        resumen = escanear_niveles(
+            options['tickers'] or None,
+            n1=options['n1'],
+            n2=options['n2'],
+            lookback=options['lookback'],
+            workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Niveles guardados: {resumen['niveles']} de {resumen['tickers']} tickers "
+            f"en {resumen['segundos']:.1f}s"
+        ))
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Split",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("ratio", models.FloatField()),
+            ],
+            options={
+                "unique_together": {("ticker", "date")},
+            },
+        ),
+        migrations.CreateModel(
+            name="Dividend",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("amount", models.FloatField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["date", "ticker"], name="api_dividen_date_4c0fd7_idx")
+                ],
+                "unique_together": {("ticker", "date")},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_dividend_split"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FundamentalSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10)),
+                ("fetched_at", models.DateTimeField()),
+                ("cash_flow", models.TextField(blank=True, null=True)),
+                ("balance", models.TextField(blank=True, null=True)),
+                ("income", models.TextField(blank=True, null=True)),
+                ("long_term_debt", models.FloatField(default=0)),
+                ("current_debt", models.FloatField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["ticker", "-fetched_at"], name="api_fundame_ticker_92b4b0_idx"
+                    )
+                ],
+                "unique_together": {("ticker", "fetched_at")},
+            },
+        ),
+    ]
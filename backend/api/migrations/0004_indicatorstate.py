@@ -0,0 +1,34 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_fundamentalsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndicatorState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10, unique=True)),
+                ("last_date", models.DateTimeField()),
+                ("last_close", models.FloatField()),
+                ("bars", models.IntegerField(default=0)),
+                ("ema", models.JSONField(default=dict)),
+                ("ema_recent", models.JSONField(default=dict)),
+                ("rsi_avg_gain", models.FloatField(null=True)),
+                ("rsi_avg_loss", models.FloatField(null=True)),
+                ("rsi_weight", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
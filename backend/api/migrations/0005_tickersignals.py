@@ -0,0 +1,40 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_indicatorstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerSignals",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10, unique=True)),
+                ("date", models.DateTimeField()),
+                ("precio", models.FloatField()),
+                ("resultado_triple", models.SmallIntegerField(default=0)),
+                ("rsi", models.FloatField(null=True)),
+                ("score_ema", models.FloatField()),
+                ("ema_rapida_semaforo", models.SmallIntegerField(default=0)),
+                ("ema_media_semaforo", models.SmallIntegerField(default=0)),
+                ("ema_lenta_semaforo", models.SmallIntegerField(default=0)),
+                ("tendencia219", models.SmallIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["resultado_triple"], name="api_tickers_resulta_053746_idx")
+                ],
+            },
+        ),
+    ]
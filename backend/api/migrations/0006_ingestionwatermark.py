@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_tickersignals"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10, unique=True)),
+                ("last_date", models.DateField(null=True)),
+                ("last_success", models.DateTimeField(null=True)),
+                ("row_count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["last_date"], name="api_ingesti_last_da_a69b56_idx")
+                ],
+            },
+        ),
+    ]
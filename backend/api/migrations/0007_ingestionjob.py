@@ -0,0 +1,83 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_ingestionwatermark"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "En curso"),
+                            ("done", "Completo"),
+                            ("failed", "Con bloques fallidos"),
+                        ],
+                        default="running",
+                        max_length=10,
+                    ),
+                ),
+                ("end_date", models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="IngestionBlock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("tickers", models.JSONField()),
+                ("start_date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("running", "En curso"),
+                            ("done", "Completo"),
+                            ("failed", "Fallido"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                ("rows", models.IntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="blocks",
+                        to="api.ingestionjob",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["job", "status"], name="api_ingesti_job_id_fe4942_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,146 @@
+"""
+Convierte api_stockdata en una hypertable de TimescaleDB.
+
+La tabla la crea postgres-init/00_schema.sql (el modelo StockData no es
+administrado por Django), así que esta migración solo actúa si la tabla
+existe y la extensión timescaledb está disponible; en cualquier otra base
+(por ejemplo, la base de tests) no hace nada.
+
+- Hypertable particionada por ``date`` en chunks de un año. La clave
+  primaria sobre ``id`` se elimina porque toda restricción única debe
+  incluir la columna de partición; la unicidad queda en (ticker, date).
+- Compresión segmentada por ticker para los chunks de más de 180 días.
+- Agregados continuos semanales y mensuales (apertura, máximo, mínimo,
+  cierre, volumen y barras por ticker), con agregación en tiempo real y una
+  política que materializa lo invalidado cada hora.
+
+No es atómica: los agregados continuos no pueden crearse ni refrescarse
+dentro de una transacción.
+"""
+from django.db import migrations
+
+AGREGADOS = {
+    "stockdata_weekly": "1 week",
+    "stockdata_monthly": "1 month",
+}
+
+
+def _fetch_one(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return cursor.fetchone()
+
+
+def _timescale_disponible(cursor):
+    if _fetch_one(cursor, "SELECT to_regclass('public.api_stockdata')")[0] is None:
+        return False
+    return (
+        _fetch_one(cursor, "SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'")
+        is not None
+    )
+
+
+def crear_hypertable(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        if not _timescale_disponible(cursor):
+            return
+
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+        es_hypertable = _fetch_one(
+            cursor,
+            "SELECT compression_enabled FROM timescaledb_information.hypertables "
+            "WHERE hypertable_name = 'api_stockdata'",
+        )
+
+        if es_hypertable is None:
+            cursor.execute("ALTER TABLE api_stockdata DROP CONSTRAINT IF EXISTS api_stockdata_pkey")
+            cursor.execute(
+                """
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM pg_constraint
+                        WHERE conname = 'unique_ticker_date'
+                          AND conrelid = 'api_stockdata'::regclass
+                    ) THEN
+                        ALTER TABLE api_stockdata
+                        ADD CONSTRAINT unique_ticker_date UNIQUE (ticker, date);
+                    END IF;
+                END$$;
+                """
+            )
+            # El índice de la restricción única ya cubre (ticker, date)
+            cursor.execute("DROP INDEX IF EXISTS idx_ticker_date")
+            cursor.execute(
+                "SELECT create_hypertable('api_stockdata', 'date', "
+                "chunk_time_interval => INTERVAL '1 year', migrate_data => TRUE)"
+            )
+
+        if not (es_hypertable and es_hypertable[0]):
+            cursor.execute(
+                "ALTER TABLE api_stockdata SET ("
+                "timescaledb.compress, "
+                "timescaledb.compress_segmentby = 'ticker', "
+                "timescaledb.compress_orderby = 'date DESC')"
+            )
+        cursor.execute(
+            "SELECT add_compression_policy('api_stockdata', INTERVAL '180 days', if_not_exists => TRUE)"
+        )
+
+        for vista, intervalo in AGREGADOS.items():
+            cursor.execute(
+                f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {vista}
+                WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                SELECT ticker,
+                       time_bucket(INTERVAL '{intervalo}', date) AS bucket,
+                       first(open_price, date) AS open_price,
+                       max(high_price) AS high_price,
+                       min(low_price) AS low_price,
+                       last(close_price, date) AS close_price,
+                       sum(volume) AS volume,
+                       count(*) AS bars
+                FROM api_stockdata
+                GROUP BY ticker, bucket
+                WITH NO DATA
+                """
+            )
+            # start_offset NULL: cada corrida materializa solo los buckets invalidados,
+            # incluidos los de backfills históricos
+            cursor.execute(
+                f"SELECT add_continuous_aggregate_policy('{vista}', "
+                "start_offset => NULL, end_offset => INTERVAL '1 day', "
+                "schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE)"
+            )
+            cursor.execute(f"CALL refresh_continuous_aggregate('{vista}', NULL, NULL)")
+
+
+def eliminar_agregados(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        if _fetch_one(cursor, "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'") is None:
+            return
+        for vista in AGREGADOS:
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {vista}")
+        if _fetch_one(cursor, "SELECT to_regclass('public.api_stockdata')")[0] is not None:
+            cursor.execute("SELECT remove_compression_policy('api_stockdata', if_exists => TRUE)")
+        # La hypertable se conserva: volver a una tabla común requiere copiar los datos
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("api", "0007_ingestionjob"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_hypertable, eliminar_agregados),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_stockdata_timescale"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SectorMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(max_length=10, unique=True)),
+                ("sector", models.CharField(max_length=100)),
+                ("sub_industry", models.CharField(blank=True, default="", max_length=200)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["sector"], name="api_sectorm_sector_fd8bfd_idx")],
+            },
+        ),
+    ]
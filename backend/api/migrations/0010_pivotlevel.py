@@ -0,0 +1,43 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_sectormembership"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PivotLevel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ticker", models.CharField(db_index=True, max_length=10)),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("high", "Resistencia"), ("low", "Soporte")], max_length=4
+                    ),
+                ),
+                ("price", models.FloatField()),
+                ("touches", models.IntegerField()),
+                ("first_touch", models.DateField()),
+                ("last_touch", models.DateField()),
+                ("last_close", models.FloatField()),
+                ("distance_pct", models.FloatField()),
+                ("computed_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["distance_pct"], name="api_pivotle_distanc_cc42c4_idx")
+                ],
+            },
+        ),
+    ]
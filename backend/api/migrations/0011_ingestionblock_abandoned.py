@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_pivotlevel"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ingestionblock",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pendiente"),
+                    ("running", "En curso"),
+                    ("done", "Completo"),
+                    ("failed", "Fallido"),
+                    ("abandoned", "Abandonado"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
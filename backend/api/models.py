@@ -32,4 +32,167 @@ class StockData(models.Model):
         managed = False  # Django no manejará las migraciones para esta tabla
 
     def __str__(self):
-        return f"{self.ticker} - {self.date}"
\ No newline at end of file
+        return f"{self.ticker} - {self.date}"
+
+
+class Dividend(models.Model):
+    ticker = models.CharField(max_length=10)
+    date = models.DateField()  # Fecha ex-dividendo informada por Yahoo Finance
+    amount = models.FloatField()
+
+    class Meta:
+        unique_together = (('ticker', 'date'),)
+        indexes = [models.Index(fields=['date', 'ticker'])]
+
+    def __str__(self):
+        return f"{self.ticker} - {self.date}: {self.amount}"
+
+
+class Split(models.Model):
+    ticker = models.CharField(max_length=10)
+    date = models.DateField()
+    ratio = models.FloatField()  # Acciones nuevas por acción anterior (2.0 = split 2:1)
+
+    class Meta:
+        unique_together = (('ticker', 'date'),)
+
+    def __str__(self):
+        return f"{self.ticker} - {self.date}: {self.ratio}"
+
+
+class FundamentalSnapshot(models.Model):
+    ticker = models.CharField(max_length=10)
+    fetched_at = models.DateTimeField()
+    # Estados financieros ya serializados con DataFrame.to_json(date_format='iso')
+    cash_flow = models.TextField(null=True, blank=True)
+    balance = models.TextField(null=True, blank=True)
+    income = models.TextField(null=True, blank=True)
+    long_term_debt = models.FloatField(default=0)
+    current_debt = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = (('ticker', 'fetched_at'),)
+        indexes = [models.Index(fields=['ticker', '-fetched_at'])]
+
+    def __str__(self):
+        return f"{self.ticker} - {self.fetched_at}"
+
+
+class IndicatorState(models.Model):
+    ticker = models.CharField(max_length=10, unique=True)
+    last_date = models.DateTimeField()
+    last_close = models.FloatField()
+    bars = models.IntegerField(default=0)  # Barras procesadas desde el inicio de la serie
+    ema = models.JSONField(default=dict)  # Último valor por período: {"9": 123.4, ...}
+    ema_recent = models.JSONField(default=dict)  # Últimos valores por período, para detectar cruces
+    rsi_avg_gain = models.FloatField(null=True)
+    rsi_avg_loss = models.FloatField(null=True)
+    rsi_weight = models.FloatField(default=0)  # Suma de pesos de las medias del RSI
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.ticker} - {self.last_date}"
+
+
+class TickerSignals(models.Model):
+    ticker = models.CharField(max_length=10, unique=True)
+    date = models.DateTimeField()  # Última barra usada para calcular las señales
+    precio = models.FloatField()
+    resultado_triple = models.SmallIntegerField(default=0)  # 0 sin señal, 1 compra, 2 venta
+    rsi = models.FloatField(null=True)
+    score_ema = models.FloatField()
+    ema_rapida_semaforo = models.SmallIntegerField(default=0)
+    ema_media_semaforo = models.SmallIntegerField(default=0)
+    ema_lenta_semaforo = models.SmallIntegerField(default=0)
+    tendencia219 = models.SmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['resultado_triple'])]
+
+    def __str__(self):
+        return f"{self.ticker} - {self.date}"
+
+
+class IngestionWatermark(models.Model):
+    ticker = models.CharField(max_length=10, unique=True)
+    # Última barra guardada; la próxima descarga empieza al día siguiente
+    last_date = models.DateField(null=True)
+    last_success = models.DateTimeField(null=True)  # Última descarga que guardó filas
+    row_count = models.BigIntegerField(default=0)  # Filas guardadas para el ticker
+
+    class Meta:
+        indexes = [models.Index(fields=['last_date'])]
+
+    def __str__(self):
+        return f"{self.ticker} - {self.last_date}"
+
+
+class IngestionJob(models.Model):
+    ESTADOS = [('running', 'En curso'), ('done', 'Completo'), ('failed', 'Con bloques fallidos')]
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True)
+    status = models.CharField(max_length=10, choices=ESTADOS, default='running')
+    end_date = models.DateField()  # Fin (exclusivo) de las descargas del trabajo
+
+    def __str__(self):
+        return f"Ingesta {self.id} ({self.status})"
+
+
+class IngestionBlock(models.Model):
+    ESTADOS = [
+        ('pending', 'Pendiente'),
+        ('running', 'En curso'),
+        ('done', 'Completo'),
+        ('failed', 'Fallido'),
+        ('abandoned', 'Abandonado'),  # Agotó los intentos entre ejecuciones; no se reanuda
+    ]
+
+    job = models.ForeignKey(IngestionJob, on_delete=models.CASCADE, related_name='blocks')
+    tickers = models.JSONField()
+    start_date = models.DateField()
+    status = models.CharField(max_length=10, choices=ESTADOS, default='pending')
+    attempts = models.IntegerField(default=0)
+    rows = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['job', 'status'])]
+
+    def __str__(self):
+        return f"Bloque {self.id} de la ingesta {self.job_id} ({self.status})"
+
+
+class SectorMembership(models.Model):
+    ticker = models.CharField(max_length=10, unique=True)
+    sector = models.CharField(max_length=100)  # Sector GICS, por ejemplo "Information Technology"
+    sub_industry = models.CharField(max_length=200, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['sector'])]
+
+    def __str__(self):
+        return f"{self.ticker} - {self.sector}"
+
+
+class PivotLevel(models.Model):
+    TIPOS = [('high', 'Resistencia'), ('low', 'Soporte')]
+
+    ticker = models.CharField(max_length=10, db_index=True)
+    type = models.CharField(max_length=4, choices=TIPOS)
+    price = models.FloatField()
+    touches = models.IntegerField()
+    first_touch = models.DateField()
+    last_touch = models.DateField()
+    last_close = models.FloatField()
+    distance_pct = models.FloatField()  # |último cierre - nivel| / último cierre, en %
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['distance_pct'])]
+
+    def __str__(self):
+        return f"{self.ticker} {self.type} {self.price:.2f}"
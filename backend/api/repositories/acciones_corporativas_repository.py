@@ -0,0 +1,80 @@
+"""
+Repositorio para dividendos y splits.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+las acciones corporativas guardadas por la ingesta de precios.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth
+
+from api.models import Dividend, Split
+
+
+class DividendRepository:
+    """
+    Repositorio para operaciones de acceso a datos de Dividend.
+    """
+
+    @staticmethod
+    def get_monthly_totals(tickers: List[str], year: int) -> List[Dict]:
+        """
+        Suma los dividendos de un año por mes y ticker con una sola consulta agrupada.
+
+        Args:
+            tickers (List[str]): Tickers a consultar.
+            year (int): Año calendario de la fecha del dividendo.
+
+        Returns:
+            List[Dict]: Filas ``{'mes': 1..12, 'ticker': str, 'monto': float}``
+                ordenadas por mes y ticker.
+        """
+        return list(
+            Dividend.objects.filter(ticker__in=tickers, date__year=year)
+            .annotate(mes=ExtractMonth('date'))
+            .values('mes', 'ticker')
+            .annotate(monto=Sum('amount'))
+            .order_by('mes', 'ticker')
+        )
+
+    @staticmethod
+    def upsert(dividendos: List[Dividend]) -> int:
+        """
+        Inserta o actualiza dividendos por ``(ticker, date)``.
+
+        Args:
+            dividendos (List[Dividend]): Dividendos a guardar.
+
+        Returns:
+            int: Cantidad de dividendos guardados.
+        """
+        return len(Dividend.objects.bulk_create(
+            dividendos, update_conflicts=True,
+            update_fields=['amount'], unique_fields=['ticker', 'date'], batch_size=1000,
+        ))
+
+
+class SplitRepository:
+    """
+    Repositorio para operaciones de acceso a datos de Split.
+    """
+
+    @staticmethod
+    def get_splits(ticker: str, since: Optional[date] = None) -> List[tuple]:
+        """
+        Obtiene los splits de un ticker como tuplas ``(date, ratio)``.
+
+        Args:
+            ticker (str): Ticker del activo.
+            since (Optional[date], optional): Si se indica, solo splits posteriores.
+                Defaults to None.
+
+        Returns:
+            List[tuple]: Splits ordenados por fecha.
+        """
+        query = Split.objects.filter(ticker=ticker)
+        if since is not None:
+            query = query.filter(date__gt=since)
+        return list(query.order_by('date').values_list('date', 'ratio'))
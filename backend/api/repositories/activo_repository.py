@@ -6,7 +6,9 @@ toda la lógica de acceso a datos relacionada con los activos financieros.
 """
 from typing import List, Optional, Dict, Any, Union
 from datetime import date, datetime
+from itertools import islice
 
+import pandas as pd
 from django.db.models import QuerySet, Q, F, Sum, Avg
 from django.db.models.functions import TruncMonth
 
@@ -124,6 +126,10 @@ class StockDataRepository:
     con el modelo StockData, siguiendo el patrón Repository.
     """
     
+    # A partir de esta cantidad de tickers se lee con un cursor del lado del servidor
+    SERVER_CURSOR_MIN_TICKERS = 50
+    SERVER_CURSOR_CHUNK_SIZE = 20000
+    
     @staticmethod
     def get_data_by_ticker(ticker: str, start_date: Optional[Union[date, datetime]] = None, 
                           end_date: Optional[Union[date, datetime]] = None) -> QuerySet:
@@ -201,3 +207,136 @@ class StockDataRepository:
         """
         objects = [StockData(**data) for data in stock_data_list]
         return StockData.objects.bulk_create(objects)
+
+    @staticmethod
+    def get_price_rows(ticker: str, since: Optional[Union[date, datetime]] = None,
+                       fields: Optional[List[str]] = None) -> QuerySet:
+        """
+        Obtiene las filas de precios de un ticker como tuplas, sin instanciar modelos.
+        
+        Args:
+            ticker (str): Ticker del activo.
+            since (Optional[Union[date, datetime]], optional): Si se indica, solo se
+                devuelven las filas estrictamente posteriores a esta fecha. Defaults to None.
+            fields (Optional[List[str]], optional): Columnas a devolver además de la fecha.
+                Defaults to OHLCV.
+            
+        Returns:
+            QuerySet: QuerySet de tuplas ``(date, *fields)`` ordenadas por fecha.
+        """
+        fields = fields or ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+        query = StockData.objects.filter(ticker=ticker)
+        
+        if since is not None:
+            query = query.filter(date__gt=since)
+        
+        return query.order_by('date').values_list('date', *fields)
+
+    @staticmethod
+    def get_recent_price_rows(ticker: str, bars: int, fields: Optional[List[str]] = None,
+                              skip_zero_volume: bool = False) -> List[tuple]:
+        """
+        Obtiene las últimas filas de precios de un ticker, sin leer el resto del historial.
+        
+        La consulta recorre el índice único ``(ticker, date)`` en orden descendente
+        y se corta en ``bars`` filas.
+        
+        Args:
+            ticker (str): Ticker del activo.
+            bars (int): Cantidad máxima de filas.
+            fields (Optional[List[str]], optional): Columnas a devolver además de la fecha.
+                Defaults to OHLCV.
+            skip_zero_volume (bool, optional): Si es True, omite las filas con volumen 0.
+                Defaults to False.
+            
+        Returns:
+            List[tuple]: Tuplas ``(date, *fields)`` en orden cronológico.
+        """
+        fields = fields or ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+        query = StockData.objects.filter(ticker=ticker)
+        
+        if skip_zero_volume:
+            query = query.exclude(volume=0)
+        
+        rows = list(query.order_by('-date').values_list('date', *fields)[:bars])
+        rows.reverse()
+        return rows
+
+    @classmethod
+    def load_price_matrix(cls, tickers: List[str],
+                          start: Optional[Union[date, datetime, str]] = None,
+                          end: Optional[Union[date, datetime, str]] = None,
+                          fields: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Carga los precios de varios tickers con una sola consulta y los alinea por fecha.
+        
+        Se emite una única consulta ``ticker__in`` con ``values_list`` (sin instanciar
+        modelos). Para universos grandes se itera con un cursor del lado del servidor
+        y cada bloque de filas se pivotea al llegar, de modo que nunca se tienen todas
+        las filas en formato largo a la vez.
+        
+        Args:
+            tickers (List[str]): Tickers a cargar.
+            start (Optional[Union[date, datetime, str]], optional): Fecha de inicio
+                inclusiva. Defaults to None.
+            end (Optional[Union[date, datetime, str]], optional): Fecha de fin
+                inclusiva. Defaults to None.
+            fields (Optional[List[str]], optional): Columnas a cargar.
+                Defaults to ``['close_price']``.
+            
+        Returns:
+            pd.DataFrame: Matriz fecha x ticker (índice ``date``) en float64. Con un
+                solo campo las columnas son los tickers; con varios, las columnas
+                son un MultiIndex ``(campo, ticker)``. Los tickers sin datos no aparecen.
+        """
+        fields = list(fields or ['close_price'])
+        tickers = list(dict.fromkeys(tickers))
+        
+        query = StockData.objects.filter(ticker__in=tickers)
+        if start:
+            query = query.filter(date__gte=start)
+        if end:
+            query = query.filter(date__lte=end)
+        rows = query.order_by('date').values_list('ticker', 'date', *fields)
+        
+        if len(tickers) >= cls.SERVER_CURSOR_MIN_TICKERS:
+            rows = rows.iterator(chunk_size=cls.SERVER_CURSOR_CHUNK_SIZE)
+        
+        rows = iter(rows)
+        parts = []
+        while True:
+            chunk = list(islice(rows, cls.SERVER_CURSOR_CHUNK_SIZE))
+            if not chunk:
+                break
+            parts.append(cls._pivot_chunk(chunk, fields))
+        if not parts:
+            return pd.DataFrame(dtype='float64')
+        
+        matrix = parts[0]
+        if len(parts) > 1:
+            # Una fecha puede quedar partida entre dos bloques: se unen sus columnas
+            matrix = pd.concat(parts).groupby(level=0).first()
+        
+        present = [t for t in tickers if t in matrix.columns.get_level_values(1)]
+        matrix = matrix.reindex(columns=pd.MultiIndex.from_product([fields, present]))
+        matrix.columns.names = [None, 'ticker']
+        if len(fields) == 1:
+            matrix = matrix[fields[0]]
+        return matrix
+    
+    @staticmethod
+    def _pivot_chunk(chunk: List[tuple], fields: List[str]) -> pd.DataFrame:
+        """
+        Pivotea un bloque de filas ``(ticker, date, *fields)`` a formato fecha x ticker.
+        
+        Args:
+            chunk (List[tuple]): Filas del bloque.
+            fields (List[str]): Columnas de precios de las filas.
+            
+        Returns:
+            pd.DataFrame: Matriz del bloque con columnas ``(campo, ticker)``.
+        """
+        df = pd.DataFrame.from_records(chunk, columns=['ticker', 'date', *fields])
+        df['date'] = pd.to_datetime(df['date'], utc=True)
+        df[fields] = df[fields].astype('float64')
+        return df.pivot(index='date', columns='ticker', values=fields)
@@ -0,0 +1,121 @@
+"""
+Repositorio para los agregados continuos de precios de TimescaleDB.
+
+Este módulo implementa el patrón Repository para leer los cierres semanales y
+mensuales que materializan las vistas ``stockdata_weekly`` y
+``stockdata_monthly`` (migración ``0008_stockdata_timescale``). Si las vistas
+no existen (otra base de datos o TimescaleDB no disponible), los métodos
+devuelven None para que el llamador calcule desde ``StockData``.
+
+La política de TimescaleDB materializa los buckets invalidados cada hora; la
+ingesta llama a ``refrescar`` al terminar para que los buckets reescritos por
+un backfill no queden con cierres viejos hasta la próxima corrida.
+"""
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+import pandas as pd
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+
+class AgregadosRepository:
+    """
+    Repositorio para operaciones de lectura de los agregados continuos.
+    """
+
+    VISTAS = {
+        'weekly': 'stockdata_weekly',
+        'monthly': 'stockdata_monthly',
+    }
+
+    # Existencia de cada vista, consultada una vez por proceso
+    _disponibles: Dict[str, bool] = {}
+
+    @classmethod
+    def disponible(cls, vista: str) -> bool:
+        """
+        Indica si una vista de agregados existe en la base de datos.
+
+        Args:
+            vista (str): Nombre de la vista.
+
+        Returns:
+            bool: True si la vista se puede consultar.
+        """
+        if connection.vendor != 'postgresql':
+            return False
+        if vista not in cls._disponibles:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s)", [vista])
+                cls._disponibles[vista] = cursor.fetchone()[0] is not None
+        return cls._disponibles[vista]
+
+    @classmethod
+    def refrescar(cls) -> List[str]:
+        """
+        Materializa los buckets invalidados de los agregados disponibles.
+
+        La ventana es completa (``NULL, NULL``): TimescaleDB solo recalcula los
+        rangos registrados como invalidados, es decir, los que tocó la ingesta.
+
+        Returns:
+            List[str]: Vistas refrescadas.
+        """
+        if connection.in_atomic_block:
+            # refresh_continuous_aggregate no puede ejecutarse dentro de una transacción
+            logger.warning("Agregados continuos sin refrescar: hay una transacción abierta")
+            return []
+
+        refrescadas = []
+        for vista in cls.VISTAS.values():
+            if not cls.disponible(vista):
+                continue
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("CALL refresh_continuous_aggregate(%s, NULL, NULL)", [vista])
+            except DatabaseError as e:
+                logger.warning(f"No se pudo refrescar el agregado {vista}: {e}")
+                continue
+            refrescadas.append(vista)
+        return refrescadas
+
+    @classmethod
+    def load_closes(cls, tickers: List[str], frecuencia: str = 'monthly',
+                    start: Optional[date] = None) -> Optional[pd.DataFrame]:
+        """
+        Carga el último cierre de cada período para varios tickers con una sola consulta.
+
+        Args:
+            tickers (List[str]): Tickers a cargar.
+            frecuencia (str, optional): ``'weekly'`` o ``'monthly'``. Defaults to ``'monthly'``.
+            start (Optional[date], optional): Primer período a incluir (inclusive).
+                Defaults to None.
+
+        Returns:
+            Optional[pd.DataFrame]: Matriz período x ticker (índice con el inicio
+                de cada período) o None si el agregado no está disponible. Los
+                tickers sin datos no aparecen.
+        """
+        vista = cls.VISTAS[frecuencia]
+        if not cls.disponible(vista):
+            return None
+
+        sql = f"SELECT ticker, bucket, close_price FROM {vista} WHERE ticker = ANY(%s)"
+        params: list = [list(dict.fromkeys(tickers))]
+        if start:
+            sql += " AND bucket >= %s"
+            params.append(start)
+        with connection.cursor() as cursor:
+            cursor.execute(sql + " ORDER BY bucket", params)
+            rows = cursor.fetchall()
+
+        df = pd.DataFrame.from_records(rows, columns=['ticker', 'bucket', 'close_price'])
+        if df.empty:
+            return pd.DataFrame(dtype='float64')
+        df['bucket'] = pd.to_datetime(df['bucket'])
+        if df['bucket'].dt.tz is not None:
+            df['bucket'] = df['bucket'].dt.tz_convert(None)
+        return df.pivot(index='bucket', columns='ticker', values='close_price').astype('float64')
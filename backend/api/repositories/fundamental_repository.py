@@ -0,0 +1,52 @@
+"""
+Repositorio para los snapshots de datos fundamentales.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+los estados financieros persistidos por el job de actualización.
+"""
+from typing import Any, Dict, Optional
+
+from django.utils import timezone
+
+from api.models import FundamentalSnapshot
+
+
+class FundamentalSnapshotRepository:
+    """
+    Repositorio para operaciones de acceso a datos de FundamentalSnapshot.
+    """
+
+    @staticmethod
+    def get_latest(ticker: str) -> Optional[FundamentalSnapshot]:
+        """
+        Obtiene el snapshot más reciente de un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+
+        Returns:
+            Optional[FundamentalSnapshot]: El snapshot o None si no hay ninguno.
+        """
+        return FundamentalSnapshot.objects.filter(ticker=ticker).order_by('-fetched_at').first()
+
+    @staticmethod
+    def create(ticker: str, data: Dict[str, Any]) -> FundamentalSnapshot:
+        """
+        Guarda un nuevo snapshot con la fecha actual.
+
+        Args:
+            ticker (str): Ticker del activo.
+            data (Dict[str, Any]): Datos con las claves de ``get_fundamental_data``.
+
+        Returns:
+            FundamentalSnapshot: El snapshot creado.
+        """
+        return FundamentalSnapshot.objects.create(
+            ticker=ticker,
+            fetched_at=timezone.now(),
+            cash_flow=data['cash_flow'],
+            balance=data['balance'],
+            income=data['income'],
+            long_term_debt=data['long_term_debt'],
+            current_debt=data['current_debt'],
+        )
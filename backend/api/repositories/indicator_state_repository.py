@@ -0,0 +1,76 @@
+"""
+Repositorio para el estado incremental de indicadores.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+los valores de EMA y RSI persistidos por ticker.
+"""
+from typing import Any, Dict, Iterable, Optional
+
+from api.models import IndicatorState
+
+
+def _a_dict(estado: IndicatorState) -> Dict[str, Any]:
+    return {
+        'ticker': estado.ticker,
+        'last_date': estado.last_date,
+        'last_close': estado.last_close,
+        'bars': estado.bars,
+        'ema': estado.ema,
+        'ema_recent': estado.ema_recent,
+        'rsi_avg_gain': estado.rsi_avg_gain,
+        'rsi_avg_loss': estado.rsi_avg_loss,
+        'rsi_weight': estado.rsi_weight,
+    }
+
+
+class IndicatorStateRepository:
+    """
+    Repositorio para operaciones de acceso a datos de IndicatorState.
+    """
+
+    CAMPOS = ('last_date', 'last_close', 'bars', 'ema', 'ema_recent',
+              'rsi_avg_gain', 'rsi_avg_loss', 'rsi_weight')
+
+    @staticmethod
+    def get(ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estado de un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+
+        Returns:
+            Optional[Dict[str, Any]]: El estado o None si todavía no se calculó.
+        """
+        estado = IndicatorState.objects.filter(ticker=ticker).first()
+        return _a_dict(estado) if estado else None
+
+    @staticmethod
+    def get_many(tickers: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene el estado de varios tickers con una sola consulta.
+
+        Args:
+            tickers (Optional[Iterable[str]], optional): Tickers a consultar.
+                Defaults to todos los tickers con estado.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Estado por ticker (solo los existentes).
+        """
+        query = IndicatorState.objects.all()
+        if tickers is not None:
+            query = query.filter(ticker__in=list(tickers))
+        return {e.ticker: _a_dict(e) for e in query}
+
+    @classmethod
+    def save(cls, estado: Dict[str, Any]) -> None:
+        """
+        Inserta o actualiza el estado de un ticker.
+
+        Args:
+            estado (Dict[str, Any]): Estado con la clave ``ticker`` y los campos del modelo.
+        """
+        IndicatorState.objects.update_or_create(
+            ticker=estado['ticker'],
+            defaults={campo: estado[campo] for campo in cls.CAMPOS},
+        )
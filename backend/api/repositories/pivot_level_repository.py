@@ -0,0 +1,58 @@
+"""
+Repositorio para los niveles de soporte y resistencia del screener.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+los niveles por ticker que calcula cada noche el comando ``scan_pivot_levels``.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+
+from api.models import PivotLevel
+
+
+class PivotLevelRepository:
+    """
+    Repositorio para operaciones de acceso a datos de PivotLevel.
+    """
+
+    CAMPOS = ('ticker', 'type', 'price', 'touches', 'first_touch', 'last_touch',
+              'last_close', 'distance_pct', 'computed_at')
+
+    @staticmethod
+    def replace(levels: List[PivotLevel], tickers: Optional[Iterable[str]] = None) -> int:
+        """
+        Reemplaza los niveles de los tickers escaneados en una sola transacción.
+
+        Args:
+            levels (List[PivotLevel]): Niveles nuevos.
+            tickers (Optional[Iterable[str]], optional): Tickers escaneados; los
+                que quedaron sin niveles también se limpian. Defaults to todos.
+
+        Returns:
+            int: Cantidad de niveles guardados.
+        """
+        with transaction.atomic():
+            anteriores = PivotLevel.objects.all()
+            if tickers is not None:
+                anteriores = anteriores.filter(ticker__in=list(tickers))
+            anteriores.delete()
+            return len(PivotLevel.objects.bulk_create(levels, batch_size=1000))
+
+    @classmethod
+    def near(cls, max_distance_pct: float, type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los niveles cuyo último cierre está a menos de una distancia dada.
+
+        Args:
+            max_distance_pct (float): Distancia máxima en porcentaje del cierre.
+            type (Optional[str], optional): 'high' (resistencias) o 'low' (soportes).
+                Defaults to ambos.
+
+        Returns:
+            List[Dict[str, Any]]: Niveles ordenados del más cercano al más lejano.
+        """
+        query = PivotLevel.objects.filter(distance_pct__lte=max_distance_pct)
+        if type:
+            query = query.filter(type=type)
+        return list(query.order_by('distance_pct', 'ticker').values(*cls.CAMPOS))
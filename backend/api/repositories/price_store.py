@@ -0,0 +1,281 @@
+"""
+Almacén columnar en memoria de precios OHLCV por ticker.
+
+Este módulo mantiene, por proceso, las series históricas de cada ticker como
+arrays ``float64`` de NumPy para evitar releer ``StockData`` a través del ORM
+en cada solicitud. Las series se refrescan de forma incremental (solo filas
+posteriores a la última fecha en memoria) y se descartan con política LRU
+cuando se supera el presupuesto de memoria configurado.
+
+Cada serie recuerda la versión de datos del ticker (``api.cache.versions``)
+con la que se cargó. Como la versión vive en la caché compartida, una ingesta
+hecha en otro proceso también obliga a recargar la serie en la siguiente
+lectura, sin esperar al intervalo de refresco.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from api.cache.versions import obtener_versiones
+from api.repositories.activo_repository import StockDataRepository
+
+CAMPOS_OHLCV = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+FechaLike = Union[str, date, datetime, pd.Timestamp]
+
+
+def _a_nanosegundos(valor: FechaLike) -> int:
+    """
+    Convierte una fecha a nanosegundos UTC desde epoch.
+
+    Las fechas sin zona horaria se interpretan en UTC, igual que el ORM
+    con ``TIME_ZONE = "UTC"``.
+
+    Args:
+        valor (FechaLike): Fecha a convertir.
+
+    Returns:
+        int: Nanosegundos UTC desde epoch.
+    """
+    ts = pd.Timestamp(valor)
+    ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+    return ts.value
+
+
+class _SerieTicker:
+    """
+    Serie histórica de un ticker almacenada en formato columnar.
+    """
+
+    __slots__ = ('fechas', 'columnas', 'verificado', 'version')
+
+    def __init__(self, fechas: np.ndarray, columnas: Dict[str, np.ndarray]):
+        self.fechas = fechas
+        self.columnas = columnas
+        self.verificado = time.monotonic()
+        self.version: Optional[int] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arrays de la serie."""
+        return self.fechas.nbytes + sum(col.nbytes for col in self.columnas.values())
+
+    @property
+    def ultima_fecha(self) -> Optional[pd.Timestamp]:
+        """Última fecha almacenada o None si la serie está vacía."""
+        if not len(self.fechas):
+            return None
+        return pd.Timestamp(int(self.fechas[-1]), tz='UTC')
+
+
+def _filas_a_arrays(filas: Iterable[Sequence]) -> _SerieTicker:
+    """
+    Convierte tuplas ``(date, *OHLCV)`` en arrays columnares de solo lectura.
+
+    Args:
+        filas (Iterable[Sequence]): Filas devueltas por el repositorio.
+
+    Returns:
+        _SerieTicker: Serie con fechas en nanosegundos UTC y columnas float64.
+    """
+    filas = list(filas)
+    if filas:
+        fechas_raw, *valores = zip(*filas)
+    else:
+        fechas_raw, valores = (), [()] * len(CAMPOS_OHLCV)
+
+    fechas = pd.to_datetime(list(fechas_raw), utc=True).asi8.astype(np.int64)
+    columnas = {
+        campo: np.array([np.nan if v is None else v for v in col], dtype=np.float64)
+        for campo, col in zip(CAMPOS_OHLCV, valores)
+    }
+    return _SerieTicker(fechas, columnas)
+
+
+class PriceStore:
+    """
+    Caché columnar de precios OHLCV por ticker con refresco incremental.
+
+    Cada ticker se carga completo la primera vez que se solicita. Las lecturas
+    posteriores solo consultan la base de datos (por filas nuevas) cuando pasó
+    ``refresh_interval`` segundos desde la última verificación, y recargan la
+    serie completa cuando cambió la versión de datos del ticker.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, refresh_interval: Optional[float] = None,
+                 fetch_rows: Optional[Callable[..., Iterable[Sequence]]] = None,
+                 get_versions: Callable[[Iterable[str]], Dict[str, int]] = obtener_versiones):
+        """
+        Inicializa el almacén.
+
+        Args:
+            max_bytes (Optional[int], optional): Presupuesto de memoria en bytes.
+                Defaults to ``settings.PRICE_STORE_MAX_BYTES``.
+            refresh_interval (Optional[float], optional): Segundos entre verificaciones
+                de filas nuevas. Defaults to ``settings.PRICE_STORE_REFRESH_SECONDS``.
+            fetch_rows (Optional[Callable], optional): Función ``(ticker, since, fields)``
+                que devuelve filas ordenadas por fecha. Defaults to
+                ``StockDataRepository.get_price_rows``.
+            get_versions (Callable, optional): Función que devuelve la versión de
+                datos de cada ticker. Defaults to ``obtener_versiones``.
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'PRICE_STORE_MAX_BYTES', 256 * 1024 * 1024
+        )
+        self.refresh_interval = refresh_interval if refresh_interval is not None else getattr(
+            settings, 'PRICE_STORE_REFRESH_SECONDS', 60
+        )
+        self._fetch_rows = fetch_rows or StockDataRepository.get_price_rows
+        self._get_versions = get_versions
+        self._series: "OrderedDict[str, _SerieTicker]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria total ocupada por las series en caché."""
+        return self._nbytes
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._series
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """
+        Descarta la serie de un ticker, o todas si no se indica ninguno.
+
+        Args:
+            ticker (Optional[str], optional): Ticker a descartar. Defaults to None.
+        """
+        with self._lock:
+            if ticker is None:
+                self._series.clear()
+                self._nbytes = 0
+            elif ticker in self._series:
+                self._nbytes -= self._series.pop(ticker).nbytes
+
+    def get_frame(self, ticker: str, start: Optional[FechaLike] = None,
+                  end: Optional[FechaLike] = None,
+                  fields: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Obtiene un DataFrame con la ventana solicitada de un ticker.
+
+        El resultado tiene las mismas columnas que
+        ``StockData.objects.values('date', *fields)``, por lo que reemplaza
+        directamente a las lecturas vía ORM. Ambos extremos son inclusivos.
+
+        Args:
+            ticker (str): Ticker del activo.
+            start (Optional[FechaLike], optional): Fecha de inicio. Defaults to None.
+            end (Optional[FechaLike], optional): Fecha de fin. Defaults to None.
+            fields (Optional[List[str]], optional): Columnas OHLCV a incluir.
+                Defaults to todas.
+
+        Returns:
+            pd.DataFrame: DataFrame con columna ``date`` y las columnas pedidas.
+                Vacío si no hay datos.
+        """
+        fields = list(fields or CAMPOS_OHLCV)
+        serie = self._obtener_serie(ticker)
+
+        desde = (
+            0 if start is None
+            else np.searchsorted(serie.fechas, _a_nanosegundos(start), 'left')
+        )
+        hasta = (
+            len(serie.fechas) if end is None
+            else np.searchsorted(serie.fechas, _a_nanosegundos(end), 'right')
+        )
+        if desde >= hasta:
+            return pd.DataFrame(columns=['date', *fields])
+
+        data = {'date': pd.to_datetime(serie.fechas[desde:hasta], utc=True)}
+        for campo in fields:
+            data[campo] = serie.columnas[campo][desde:hasta]
+        return pd.DataFrame(data, copy=True)
+
+    def _obtener_serie(self, ticker: str) -> _SerieTicker:
+        """
+        Devuelve la serie del ticker, cargándola o refrescándola si hace falta.
+
+        Args:
+            ticker (str): Ticker del activo.
+
+        Returns:
+            _SerieTicker: Serie actualizada.
+        """
+        # La versión se lee antes que las filas: si una ingesta escribe en el medio,
+        # la serie queda con una versión vieja y se recarga en la siguiente lectura
+        version = self._get_versions([ticker])[ticker]
+        with self._lock:
+            serie = self._series.get(ticker)
+            if serie is not None and serie.version != version:
+                # Otro proceso ingirió datos (incluidas filas reescritas): recarga completa
+                self._nbytes -= self._series.pop(ticker).nbytes
+                serie = None
+            if serie is None:
+                serie = _filas_a_arrays(self._fetch_rows(ticker, None, list(CAMPOS_OHLCV)))
+                serie.version = version
+                self._guardar(ticker, serie)
+            elif time.monotonic() - serie.verificado >= self.refresh_interval:
+                self._refrescar(ticker, serie)
+            self._series.move_to_end(ticker)
+            return self._series[ticker]
+
+    def _refrescar(self, ticker: str, serie: _SerieTicker) -> None:
+        """
+        Agrega a la serie solo las filas posteriores a su última fecha.
+
+        Args:
+            ticker (str): Ticker del activo.
+            serie (_SerieTicker): Serie actualmente en caché.
+        """
+        nuevas = _filas_a_arrays(self._fetch_rows(ticker, serie.ultima_fecha, list(CAMPOS_OHLCV)))
+        if not len(nuevas.fechas):
+            serie.verificado = time.monotonic()
+            return
+
+        combinada = _SerieTicker(
+            np.concatenate([serie.fechas, nuevas.fechas]),
+            {
+                campo: np.concatenate([serie.columnas[campo], nuevas.columnas[campo]])
+                for campo in CAMPOS_OHLCV
+            },
+        )
+        combinada.version = serie.version
+        self._nbytes -= serie.nbytes
+        del self._series[ticker]
+        self._guardar(ticker, combinada)
+
+    def _guardar(self, ticker: str, serie: _SerieTicker) -> None:
+        """
+        Almacena una serie y descarta las menos usadas si se supera el presupuesto.
+
+        Args:
+            ticker (str): Ticker del activo.
+            serie (_SerieTicker): Serie a almacenar.
+        """
+        serie.fechas.flags.writeable = False
+        for columna in serie.columnas.values():
+            columna.flags.writeable = False
+
+        self._series[ticker] = serie
+        self._nbytes += serie.nbytes
+
+        # La serie recién guardada nunca se descarta, aunque exceda el presupuesto por sí sola
+        while self._nbytes > self.max_bytes and len(self._series) > 1:
+            antiguo, descartada = next(iter(self._series.items()))
+            if antiguo == ticker:
+                self._series.move_to_end(ticker)
+                continue
+            del self._series[antiguo]
+            self._nbytes -= descartada.nbytes
+
+
+# Instancia compartida por proceso
+price_store = PriceStore()
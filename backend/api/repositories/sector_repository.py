@@ -0,0 +1,42 @@
+"""
+Repositorio para la composición sectorial del S&P 500.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+la tabla de sectores GICS por ticker que carga el comando ``load_sectors``.
+"""
+from typing import List, Tuple
+
+from django.db import transaction
+
+from api.models import SectorMembership
+
+
+class SectorMembershipRepository:
+    """
+    Repositorio para operaciones de acceso a datos de SectorMembership.
+    """
+
+    @staticmethod
+    def get_all() -> List[Tuple[str, str]]:
+        """
+        Obtiene el sector de todos los tickers con una sola consulta.
+
+        Returns:
+            List[Tuple[str, str]]: Pares ``(ticker, sector)`` ordenados por ticker.
+        """
+        return list(SectorMembership.objects.order_by('ticker').values_list('ticker', 'sector'))
+
+    @staticmethod
+    def replace_all(memberships: List[SectorMembership]) -> int:
+        """
+        Reemplaza la composición completa en una sola transacción.
+
+        Args:
+            memberships (List[SectorMembership]): Nueva composición.
+
+        Returns:
+            int: Cantidad de tickers guardados.
+        """
+        with transaction.atomic():
+            SectorMembership.objects.all().delete()
+            return len(SectorMembership.objects.bulk_create(memberships))
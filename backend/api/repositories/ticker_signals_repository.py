@@ -0,0 +1,51 @@
+"""
+Repositorio para la tabla materializada de señales por ticker.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a
+las señales recalculadas después de cada ingesta.
+"""
+from typing import Dict, Iterable, List
+
+from api.models import TickerSignals
+
+
+class TickerSignalsRepository:
+    """
+    Repositorio para operaciones de acceso a datos de TickerSignals.
+    """
+
+    CAMPOS_ACTUALIZABLES = [
+        'date', 'precio', 'resultado_triple', 'rsi', 'score_ema', 'ema_rapida_semaforo',
+        'ema_media_semaforo', 'ema_lenta_semaforo', 'tendencia219', 'updated_at',
+    ]
+
+    @staticmethod
+    def get_many(tickers: Iterable[str]) -> Dict[str, TickerSignals]:
+        """
+        Obtiene las señales de varios tickers con una sola consulta.
+
+        Args:
+            tickers (Iterable[str]): Tickers a consultar.
+
+        Returns:
+            Dict[str, TickerSignals]: Señales por ticker (solo los existentes).
+        """
+        return {s.ticker: s for s in TickerSignals.objects.filter(ticker__in=list(tickers))}
+
+    @classmethod
+    def upsert(cls, signals: List[TickerSignals]) -> int:
+        """
+        Inserta o actualiza las señales por ticker en una sola operación.
+
+        Args:
+            signals (List[TickerSignals]): Señales a guardar.
+
+        Returns:
+            int: Cantidad de filas guardadas.
+        """
+        return len(TickerSignals.objects.bulk_create(
+            signals,
+            update_conflicts=True,
+            update_fields=cls.CAMPOS_ACTUALIZABLES,
+            unique_fields=['ticker'],
+        ))
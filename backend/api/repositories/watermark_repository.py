@@ -0,0 +1,107 @@
+"""
+Repositorio para las marcas de ingesta por ticker.
+
+Este módulo implementa el patrón Repository para encapsular el acceso a la
+última fecha guardada de cada ticker, desde la cual continúa la próxima
+descarga incremental.
+"""
+from datetime import date
+from typing import Dict, Iterable, Tuple
+
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from api.models import IngestionWatermark, StockData
+
+
+class IngestionWatermarkRepository:
+    """
+    Repositorio para operaciones de acceso a datos de IngestionWatermark.
+    """
+
+    @staticmethod
+    def get_many(tickers: Iterable[str]) -> Dict[str, IngestionWatermark]:
+        """
+        Obtiene las marcas de varios tickers con una sola consulta.
+
+        Args:
+            tickers (Iterable[str]): Tickers a consultar.
+
+        Returns:
+            Dict[str, IngestionWatermark]: Marca por ticker (solo las existentes).
+        """
+        return {m.ticker: m for m in IngestionWatermark.objects.filter(ticker__in=list(tickers))}
+
+    @classmethod
+    def inicializar(cls, tickers: Iterable[str]) -> Dict[str, IngestionWatermark]:
+        """
+        Obtiene las marcas de los tickers, creando las faltantes desde ``StockData``.
+
+        Los tickers sin marca toman su última fecha y cantidad de filas de los
+        datos ya guardados (una sola consulta agregada); los que no tienen
+        datos quedan sin fecha y se descargan desde el inicio de la historia.
+
+        Args:
+            tickers (Iterable[str]): Tickers a consultar.
+
+        Returns:
+            Dict[str, IngestionWatermark]: Marca por ticker.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        marcas = cls.get_many(tickers)
+        faltantes = [t for t in tickers if t not in marcas]
+        if not faltantes:
+            return marcas
+
+        existentes = {
+            fila['ticker']: fila
+            for fila in StockData.objects.filter(ticker__in=faltantes)
+            .values('ticker')
+            .annotate(ultima=Max('date'), filas=Count('ticker'))
+        }
+        nuevas = []
+        for ticker in faltantes:
+            fila = existentes.get(ticker)
+            ultima = fila['ultima'] if fila else None
+            nuevas.append(IngestionWatermark(
+                ticker=ticker,
+                last_date=ultima.date() if hasattr(ultima, 'date') else ultima,
+                row_count=fila['filas'] if fila else 0,
+            ))
+        IngestionWatermark.objects.bulk_create(nuevas, ignore_conflicts=True)
+        return cls.get_many(tickers)
+
+    @staticmethod
+    def registrar(resumen: Dict[str, Tuple[date, int]]) -> None:
+        """
+        Avanza las marcas de los tickers que guardaron filas.
+
+        La fecha solo avanza (una descarga que reescribe días viejos no la
+        retrocede) y la cantidad de filas se recalcula desde ``StockData``, ya
+        que las filas guardadas incluyen días reescritos que no son nuevos.
+
+        Args:
+            resumen (Dict[str, Tuple[date, int]]): Por ticker, la última fecha
+                guardada y la cantidad de filas guardadas.
+        """
+        ahora = timezone.now()
+        for ticker, (ultima, _) in resumen.items():
+            filas = Subquery(
+                StockData.objects.filter(ticker=OuterRef('ticker'))
+                .values('ticker')
+                .annotate(total=Count('ticker'))
+                .values('total')
+            )
+            actualizadas = IngestionWatermark.objects.filter(ticker=ticker).update(
+                last_date=Coalesce(Greatest('last_date', Value(ultima)), Value(ultima)),
+                last_success=ahora,
+                row_count=Coalesce(filas, Value(0)),
+            )
+            if not actualizadas:
+                IngestionWatermark.objects.create(
+                    ticker=ticker,
+                    last_date=ultima,
+                    last_success=ahora,
+                    row_count=StockData.objects.filter(ticker=ticker).count(),
+                )
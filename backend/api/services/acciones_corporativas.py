@@ -0,0 +1,71 @@
+"""
+Servicios sobre dividendos almacenados localmente.
+
+Incluye la agregación mensual de dividendos que consume el calendario de
+dividendos y la carga inicial del historial de dividendos desde Yahoo
+Finance. La ingesta de precios solo descarga desde la marca de cada ticker,
+así que los dividendos anteriores a la primera ingesta con ``actions=True``
+se cargan una vez con ``backfill_dividendos`` (comando ``backfill_dividends``).
+
+Los precios de ``StockData`` no se ajustan por splits localmente: Yahoo
+Finance ya devuelve el OHLC ajustado por splits, incluso con
+``auto_adjust=False``.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from api.cache.versions import incrementar_versiones
+from api.models import Dividend
+from api.repositories.acciones_corporativas_repository import DividendRepository
+from api.utils.yahoo_fetcher import YahooFetcher, yahoo_fetcher
+
+
+def obtener_dividendos_por_mes(tickers: List[str], year: int) -> Dict[int, Dict]:
+    """
+    Agrupa los dividendos de un año por mes.
+
+    Args:
+        tickers (List[str]): Tickers a consultar.
+        year (int): Año calendario.
+
+    Returns:
+        Dict[int, Dict]: Por mes (0-11), el ``total`` y los ``detalles``
+            ``{"empresa", "monto"}`` de cada ticker que pagó en ese mes.
+    """
+    dividendos_por_mes = {i: {"total": 0, "detalles": []} for i in range(12)}
+    for fila in DividendRepository.get_monthly_totals(tickers, year):
+        mes = dividendos_por_mes[fila['mes'] - 1]
+        mes["total"] += fila['monto']
+        mes["detalles"].append({"empresa": fila['ticker'], "monto": fila['monto']})
+    return dividendos_por_mes
+
+
+def backfill_dividendos(tickers: Iterable[str], fetcher: Optional[YahooFetcher] = None,
+                        timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    Carga el historial completo de dividendos de los tickers desde Yahoo Finance.
+
+    Args:
+        tickers (Iterable[str]): Tickers a cargar.
+        fetcher (Optional[YahooFetcher], optional): Fetcher de Yahoo Finance.
+            Defaults to ``yahoo_fetcher``.
+        timeout (Optional[float], optional): Plazo de la descarga. Defaults to None.
+
+    Returns:
+        Dict[str, str]: Estado por ticker: ``'ok'`` o el error de la descarga.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    resultado = (fetcher or yahoo_fetcher).dividends(tickers, timeout=timeout)
+
+    dividendos = [
+        Dividend(ticker=ticker, date=fecha.date(), amount=float(monto))
+        for ticker, serie in resultado.data.items()
+        for fecha, monto in serie.items() if monto > 0
+    ]
+    DividendRepository.upsert(dividendos)
+    if resultado.data:
+        # El calendario de dividendos se cachea por versión de los tickers
+        incrementar_versiones(resultado.data)
+
+    estados = {ticker: 'ok' for ticker in resultado.data}
+    estados.update({ticker: str(error) for ticker, error in resultado.errors.items()})
+    return {ticker: estados.get(ticker, 'sin respuesta') for ticker in tickers}
@@ -14,7 +14,11 @@ import logging
 
 from ..models import StockData, Activo
 from ..repositories.activo_repository import ActivoRepository, StockDataRepository
+from ..repositories.price_store import price_store
+from ..repositories.ticker_signals_repository import TickerSignalsRepository
 from .indicators import calculate_triple_ema, calculate_rsi
+from .estado_indicadores import obtener_indicadores_actuales
+from .senales_ticker import recomendacion_desde_senales
 from .utils import evaluar_cruce, dataframe_from_historical_data, calculate_percentage_change
 
 logger = logging.getLogger(__name__)
@@ -53,25 +57,27 @@ class ActivoService:
                 'recomendacion': cached_data['recomendacion']
             }
         
-        # Obtener datos históricos
-        historical_data = StockData.objects.filter(
-            ticker=activo.ticker,
-            date__gte=timezone.now() - timedelta(days=365)
-        ).order_by('date')
+        # Leer los valores actuales del estado incremental de indicadores
+        resumen = obtener_indicadores_actuales(activo.ticker)
+        if resumen is not None:
+            precio_actual = float(resumen['precio'])
+            resultadoTriple = resumen['resultadoTriple']
+            rsi = resumen['rsi']
+        else:
+            # Sin estado todavía: calcular sobre el último año desde el almacén en memoria
+            df = price_store.get_frame(activo.ticker, start=timezone.now() - timedelta(days=365))
 
-        df = dataframe_from_historical_data(historical_data)
+            if df.empty:
+                return None
 
-        if df.empty:
-            return None
-
-        # Cálculos
-        triple = calculate_triple_ema(df)
-        resultadoTriple = evaluar_cruce(triple)
-        rsi_series = calculate_rsi(df, period=14)
-        rsi = rsi_series.iloc[-1] if not rsi_series.empty else None
+            # Cálculos
+            triple = calculate_triple_ema(df)
+            resultadoTriple = evaluar_cruce(triple)
+            rsi_series = calculate_rsi(df, period=14)
+            rsi = rsi_series.iloc[-1] if not rsi_series.empty else None
+            precio_actual = float(df['close_price'].iloc[-1])
 
         # Datos procesados
-        precio_actual = float(df['close_price'].iloc[-1])
         recomendacion_dict = {
             "resultadoTriple": resultadoTriple.tolist() if isinstance(resultadoTriple, pd.Series) else resultadoTriple,
             "rsi": float(rsi) if rsi is not None else None
@@ -90,6 +96,30 @@ class ActivoService:
             'recomendacion': recomendacion
         }
         
+    def process_activos(self, activos) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Procesa varios activos leyendo sus señales con una sola consulta.
+        
+        Los activos cuyo ticker todavía no figura en la tabla de señales se
+        procesan individualmente con ``process_activo``.
+        
+        Args:
+            activos (Iterable[Activo]): Los activos a procesar.
+            
+        Returns:
+            Dict[int, Optional[Dict[str, Any]]]: Datos procesados por ID de activo.
+        """
+        activos = list(activos)
+        signals = TickerSignalsRepository.get_many({activo.ticker for activo in activos})
+        
+        resultado = {}
+        for activo in activos:
+            if activo.ticker in signals:
+                resultado[activo.id] = recomendacion_desde_senales(signals[activo.ticker])
+            else:
+                resultado[activo.id] = self.process_activo(activo)
+        return resultado
+        
     def get_all_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los activos con información enriquecida.
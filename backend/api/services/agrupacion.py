@@ -1,42 +1,23 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import silhouette_score
-from api.models import StockData
-from django.db.models import Q
+from api.repositories.activo_repository import StockDataRepository
+from .seleccion_k import seleccionar_k
 
 def obtener_datos_acciones(tickers, start_date=None, end_date=None):
-    datos = {}
-
     # Asegúrate de que los tickers están en el formato correcto
     tickers = [ticker.replace('.', '-') for ticker in tickers]
-    for ticker in tickers:
-        try:
-            # Filtrar los datos desde la base de datos
-            stock_data = StockData.objects.filter(
-                Q(ticker=ticker) &
-                Q(date__gte=start_date) &
-                Q(date__lte=end_date)
-            ).values('date', 'close_price').order_by('date')
 
-            # Convertir los datos a un DataFrame
-            df = pd.DataFrame(list(stock_data))
-            df['close_price'] = df['close_price'].astype(float)  # 🔧 Convertir Decimal a flo
-            
-            if df.empty:
-                print(f"{ticker}: No data found, symbol may be delisted")
-                continue
+    # Una sola consulta para todo el universo, alineada por fecha
+    precios = StockDataRepository.load_price_matrix(tickers, start_date, end_date)
 
-            # Calcular los retornos
-            df.set_index('date', inplace=True)
-            datos[ticker] = df['close_price'].pct_change().dropna()
-        
-        except Exception as e:
-            print(f"Error al obtener datos para {ticker}: {e}")
-            continue
-    
-    return pd.DataFrame(datos)
+    for ticker in tickers:
+        if ticker not in precios.columns:
+            print(f"{ticker}: No data found, symbol may be delisted")
+
+    # Calcular los retornos de cada ticker sobre sus propias fechas
+    retornos = precios.apply(lambda serie: serie.dropna().pct_change())
+    return retornos.dropna(how='all')
 
 
 def calcular_parametros(datos, parametros_seleccionados):
@@ -52,32 +33,35 @@ def calcular_parametros(datos, parametros_seleccionados):
 def encontrar_k_optimo(datos, max_k=10):
     escalador = StandardScaler()
     datos_escalados = escalador.fit_transform(datos)
+    return seleccionar_k(datos_escalados, max_k)['k']
 
-    max_k = min(max_k, datos.shape[0] - 1)  # Limitar el número de clusters si las muestras son pocas
-
-    inercia = []
-    silhouette_scores = []
 
-    for k in range(2, max_k + 1):
-        kmeans = KMeans(n_clusters=k, random_state=42)
-        kmeans.fit(datos_escalados)
-        inercia.append(kmeans.inertia_)
-        score = silhouette_score(datos_escalados, kmeans.labels_)
-        silhouette_scores.append(score)
+def agrupar_acciones_con_curva(tickers, parametros_seleccionados, start_date=None, end_date=None):
+    """
+    Agrupa los tickers por sus parámetros e informa cómo se eligió la cantidad de clusters.
 
-    k_optimo = np.argmax(silhouette_scores) + 2
-    return k_optimo
+    Args:
+        tickers (List[str]): Tickers a agrupar.
+        parametros_seleccionados (List[str]): Parámetros de ``calcular_parametros``.
+        start_date (Optional[str], optional): Fecha de inicio. Defaults to None.
+        end_date (Optional[str], optional): Fecha de fin. Defaults to None.
 
-def agrupar_acciones(tickers, parametros_seleccionados, start_date=None, end_date=None):
+    Returns:
+        Dict[str, Any]: ``parametros`` (DataFrame por ticker con la columna
+            ``Cluster``), ``k`` y ``curva`` de ``seleccionar_k``.
+    """
     datos = obtener_datos_acciones(tickers, start_date, end_date)
     parametros = calcular_parametros(datos, parametros_seleccionados)
-    k_optimo = encontrar_k_optimo(parametros)
 
     escalador = StandardScaler()
     parametros_escalados = escalador.fit_transform(parametros)
 
-    kmeans = KMeans(n_clusters=k_optimo, random_state=42)
-    clusters = kmeans.fit_predict(parametros_escalados)
+    # Las etiquetas salen del mismo ajuste que eligió k, sin volver a entrenar
+    seleccion = seleccionar_k(parametros_escalados)
+    parametros['Cluster'] = seleccion['etiquetas']
+    return {'parametros': parametros, 'k': seleccion['k'], 'curva': seleccion['curva']}
 
-    parametros['Cluster'] = clusters
-    return parametros
+
+def agrupar_acciones(tickers, parametros_seleccionados, start_date=None, end_date=None):
+    resultado = agrupar_acciones_con_curva(tickers, parametros_seleccionados, start_date, end_date)
+    return resultado['parametros']
@@ -1,7 +1,7 @@
 import json
 import pandas as pd
 from datetime import datetime
-from ..models import StockData
+from ..repositories.price_store import price_store
 from .estrategias.custom_strategy import CustomStrategy
 from backtesting import Backtest
 import traceback
@@ -35,18 +35,12 @@ def run_backtest_service(data):
     except ValueError:
         return {'error': 'Invalid date format. Use YYYY-MM-DD.'}
 
-    # Obtener datos de la base de datos
-    queryset = StockData.objects.filter(
-        ticker=ticker,
-        date__range=[inicio, fin]
-    ).order_by('date')
+    # Obtener la ventana de precios desde el almacén en memoria
+    data_df = price_store.get_frame(ticker, inicio, fin)
 
-    if not queryset.exists():
+    if data_df.empty:
         return {'error': 'No data found for the given ticker and date range.'}
 
-    # Convertir los resultados del queryset a un DataFrame de pandas
-    data_df = pd.DataFrame.from_records(queryset.values('date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume'))
-
     # Convertir la columna 'date' a datetime
     data_df['date'] = pd.to_datetime(data_df['date'], errors='coerce')
 
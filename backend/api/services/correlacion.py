@@ -0,0 +1,124 @@
+"""
+Matriz de correlación de retornos a partir de los precios almacenados.
+
+Los cierres se leen de ``StockData`` con una sola consulta para todos los
+tickers; solo los que no existen localmente se descargan de Yahoo Finance.
+La correlación se calcula con ``np.corrcoef`` sobre los retornos diarios de
+las fechas que todos los tickers tienen en común.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.repositories.activo_repository import StockDataRepository
+from api.utils.yahoo_fetcher import YahooFetcher, yahoo_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+def _a_fechas(indice: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """
+    Normaliza un índice de fechas a días sin zona horaria para alinear fuentes.
+
+    Args:
+        indice (pd.DatetimeIndex): Índice de la base de datos (UTC) o de Yahoo
+            (hora local del mercado).
+
+    Returns:
+        pd.DatetimeIndex: Índice de días calendario.
+    """
+    if indice.tz is not None:
+        indice = indice.tz_localize(None)
+    return indice.normalize()
+
+
+def obtener_cierres(tickers: List[str], start_date: Any, end_date: Any,
+                    fetcher: Optional[YahooFetcher] = None) -> Dict[str, Any]:
+    """
+    Obtiene los cierres de los tickers, descargando solo los que faltan localmente.
+
+    Args:
+        tickers (List[str]): Tickers solicitados.
+        start_date (Any): Fecha de inicio.
+        end_date (Any): Fecha de fin.
+        fetcher (Optional[YahooFetcher], optional): Fetcher para los tickers
+            faltantes. Defaults to ``yahoo_fetcher``.
+
+    Returns:
+        Dict[str, Any]: ``cierres`` (DataFrame fecha x ticker en el orden pedido),
+            ``remotos`` (tickers obtenidos de Yahoo) y ``faltantes`` (tickers sin datos).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    cierres = StockDataRepository.load_price_matrix(tickers, start_date, end_date)
+    if not cierres.empty:
+        cierres.index = _a_fechas(cierres.index)
+
+    sin_datos = [t for t in tickers if t not in cierres.columns]
+    remotos = []
+    if sin_datos:
+        resultado = (fetcher or yahoo_fetcher).history(sin_datos, start=start_date, end=end_date)
+        series = {
+            ticker: historial['Close'].set_axis(_a_fechas(historial.index))
+            for ticker, historial in resultado.data.items() if not historial.empty
+        }
+        if series:
+            cierres = pd.concat([cierres, pd.DataFrame(series)], axis=1)
+            remotos = list(series)
+            logger.info(f"Cierres descargados de Yahoo Finance para: {remotos}")
+
+    presentes = [t for t in tickers if t in cierres.columns]
+    return {
+        'cierres': cierres.reindex(columns=presentes),
+        'remotos': remotos,
+        'faltantes': [t for t in tickers if t not in presentes],
+    }
+
+
+def matriz_correlacion(cierres: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula la correlación de los retornos diarios en las fechas comunes.
+
+    Args:
+        cierres (pd.DataFrame): Cierres fecha x ticker.
+
+    Returns:
+        pd.DataFrame: Matriz ticker x ticker. NaN si no hay fechas suficientes
+            o algún ticker no varía.
+    """
+    precios = cierres.dropna().to_numpy(dtype=np.float64)
+    tickers = list(cierres.columns)
+    if precios.shape[0] < 3 or not tickers:
+        return pd.DataFrame(np.nan, index=tickers, columns=tickers)
+
+    retornos = precios[1:] / precios[:-1] - 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlacion = np.atleast_2d(np.corrcoef(retornos, rowvar=False))
+    return pd.DataFrame(correlacion, index=tickers, columns=tickers)
+
+
+def calcular_correlacion(tickers: List[str], start_date: Any, end_date: Any,
+                         fetcher: Optional[YahooFetcher] = None) -> Dict[str, Any]:
+    """
+    Calcula la matriz de correlación de retornos de los tickers.
+
+    Args:
+        tickers (List[str]): Tickers solicitados.
+        start_date (Any): Fecha de inicio.
+        end_date (Any): Fecha de fin.
+        fetcher (Optional[YahooFetcher], optional): Fetcher para los tickers
+            faltantes. Defaults to ``yahoo_fetcher``.
+
+    Returns:
+        Dict[str, Any]: ``correlation_matrix`` (dict de dicts, None donde no está
+            definida), ``remotos`` y ``faltantes``.
+    """
+    datos = obtener_cierres(tickers, start_date, end_date, fetcher)
+    correlacion = matriz_correlacion(datos['cierres'])
+    correlacion = correlacion.astype(object).where(correlacion.notna(), None)
+    return {
+        'correlation_matrix': correlacion.to_dict(),
+        'remotos': datos['remotos'],
+        'faltantes': datos['faltantes'],
+    }
@@ -0,0 +1,139 @@
+"""
+Detección vectorizada de cruces entre medias móviles exponenciales.
+
+Este módulo reemplaza la evaluación fila por fila de ``detectar_cruce``
+por operaciones sobre arrays completos de NumPy, manteniendo exactamente
+los mismos códigos de salida:
+
+    0 -> sin cruce
+    1 -> cruce al alza
+    2 -> cruce a la baja
+
+Las funciones aceptan arrays de una dimensión (una serie temporal) o de dos
+dimensiones (tiempo x tickers); el eje 0 siempre es el temporal.
+"""
+from typing import Sequence
+
+import numpy as np
+
+SIN_CRUCE = 0
+CRUCE_ALZA = 1
+CRUCE_BAJA = 2
+
+
+def _previo(valores: np.ndarray) -> np.ndarray:
+    """
+    Desplaza un array una posición en el eje temporal (equivalente a ``shift(1)``).
+
+    Args:
+        valores (np.ndarray): Array con el tiempo en el eje 0.
+
+    Returns:
+        np.ndarray: Array del mismo tamaño con NaN en la primera posición.
+    """
+    previo = np.empty_like(valores)
+    previo[:1] = np.nan
+    previo[1:] = valores[:-1]
+    return previo
+
+
+def _codificar(alza: np.ndarray, baja: np.ndarray) -> np.ndarray:
+    """
+    Combina las máscaras de cruce en un único array de códigos.
+
+    Args:
+        alza (np.ndarray): Máscara booleana de cruces al alza.
+        baja (np.ndarray): Máscara booleana de cruces a la baja.
+
+    Returns:
+        np.ndarray: Array de enteros con los códigos de cruce.
+    """
+    return np.where(alza, CRUCE_ALZA, np.where(baja, CRUCE_BAJA, SIN_CRUCE)).astype(np.int8)
+
+
+def detectar_cruces_doble(ema_corta, ema_larga) -> np.ndarray:
+    """
+    Detecta cruces entre dos EMAs sobre la serie completa en una sola pasada.
+
+    Args:
+        ema_corta (array-like): Valores de la EMA rápida.
+        ema_larga (array-like): Valores de la EMA lenta.
+
+    Returns:
+        np.ndarray: Códigos de cruce por posición (0, 1 o 2).
+    """
+    corta = np.asarray(ema_corta, dtype=np.float64)
+    larga = np.asarray(ema_larga, dtype=np.float64)
+    corta_prev, larga_prev = _previo(corta), _previo(larga)
+
+    # Las comparaciones con NaN son falsas, igual que en la versión escalar
+    with np.errstate(invalid="ignore"):
+        alza = (corta_prev <= larga_prev) & (corta > larga)
+        baja = (corta_prev >= larga_prev) & (corta < larga)
+    return _codificar(alza, baja)
+
+
+def detectar_cruces_triple(ema4, ema9, ema18) -> np.ndarray:
+    """
+    Detecta cruces de la EMA rápida contra las otras dos EMAs en una sola pasada.
+
+    Args:
+        ema4 (array-like): Valores de la EMA rápida.
+        ema9 (array-like): Valores de la EMA media.
+        ema18 (array-like): Valores de la EMA lenta.
+
+    Returns:
+        np.ndarray: Códigos de cruce por posición (0, 1 o 2).
+    """
+    rapida = np.asarray(ema4, dtype=np.float64)
+    media = np.asarray(ema9, dtype=np.float64)
+    lenta = np.asarray(ema18, dtype=np.float64)
+    rapida_prev, media_prev, lenta_prev = _previo(rapida), _previo(media), _previo(lenta)
+
+    with np.errstate(invalid="ignore"):
+        alza = (
+            (rapida_prev <= media_prev)
+            & (rapida_prev <= lenta_prev)
+            & (rapida > media)
+            & (rapida > lenta)
+        )
+        baja = (rapida_prev >= media_prev) & (rapida_prev >= lenta_prev) & (rapida < media)
+    return _codificar(alza, baja)
+
+
+def detectar_cruces(emas: Sequence) -> np.ndarray:
+    """
+    Detecta cruces para dos o tres EMAs según la cantidad recibida.
+
+    Args:
+        emas (Sequence): Secuencia con dos o tres series de EMAs, de la más
+            rápida a la más lenta.
+
+    Returns:
+        np.ndarray: Códigos de cruce por posición (0, 1 o 2).
+
+    Raises:
+        ValueError: Si no se reciben dos o tres series.
+    """
+    if len(emas) == 2:
+        return detectar_cruces_doble(*emas)
+    if len(emas) == 3:
+        return detectar_cruces_triple(*emas)
+    raise ValueError("Se requieren dos o tres EMAs para detectar cruces.")
+
+
+def detectar_cruce_puntual(ema_prev: Sequence[float], ema_curr: Sequence[float]) -> int:
+    """
+    Evalúa un único par de observaciones (anterior y actual).
+
+    Args:
+        ema_prev (Sequence[float]): Valores previos de las EMAs.
+        ema_curr (Sequence[float]): Valores actuales de las EMAs.
+
+    Returns:
+        int: Código de cruce de la observación actual.
+    """
+    emas = [
+        np.array([previo, actual], dtype=np.float64) for previo, actual in zip(ema_prev, ema_curr)
+    ]
+    return int(detectar_cruces(emas)[-1])
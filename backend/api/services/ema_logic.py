@@ -1,29 +1,15 @@
 import pandas as pd
 import pandas_ta as ta  # TA-Lib para análisis técnico
-from api.models import StockData  # Ajusta esto a tu aplicación
+from api.repositories.activo_repository import StockDataRepository
+from api.repositories.ticker_signals_repository import TickerSignalsRepository
 from typing import List
+from .cruces import detectar_cruce_puntual, detectar_cruces_doble, detectar_cruces_triple
 
 # Función unificada para detectar cruces
 def detectar_cruce(ema_prev, ema_curr, num_emas):
-    if num_emas == 2:
-        ema_short_prev, ema_long_prev = ema_prev
-        ema_short_curr, ema_long_curr = ema_curr
-
-        if ema_short_prev <= ema_long_prev and ema_short_curr > ema_long_curr:
-            return 1  # Cruce al alza
-        elif ema_short_prev >= ema_long_prev and ema_short_curr < ema_long_curr:
-            return 2  # Cruce a la baja
-
-    elif num_emas == 3:
-        ema4_prev, ema9_prev, ema18_prev = ema_prev
-        ema4_curr, ema9_curr, ema18_curr = ema_curr
-
-        if ema4_prev <= ema9_prev and ema4_prev <= ema18_prev and ema4_curr > ema9_curr and ema4_curr > ema18_curr:
-            return 1  # Cruce al alza
-        elif ema4_prev >= ema9_prev and ema4_prev >= ema18_prev and ema4_curr < ema9_curr:
-            return 2  # Cruce a la baja
-
-    return 0  # No hay cruce
+    if num_emas not in (2, 3):
+        return 0  # No hay cruce
+    return detectar_cruce_puntual(ema_prev[:num_emas], ema_curr[:num_emas])
 
 # Función para calcular las EMAs y detectar cruces
 def calculate_ema(data, ema_periods, use_triple):
@@ -34,28 +20,16 @@ def calculate_ema(data, ema_periods, use_triple):
         data['EMA_9'] = ta.ema(data['Close'], length=ema9)
         data['EMA_18'] = ta.ema(data['Close'], length=ema18)
 
-        # Detectar cruces con triple EMA
-        data['Cruce'] = data.apply(
-            lambda row: detectar_cruce(
-                (data['EMA_4'].shift(1)[row.name], data['EMA_9'].shift(1)[row.name], data['EMA_18'].shift(1)[row.name]),
-                (row['EMA_4'], row['EMA_9'], row['EMA_18']),
-                num_emas=3
-            ), axis=1
-        )
+        # Detectar cruces con triple EMA sobre la serie completa
+        data['Cruce'] = detectar_cruces_triple(data['EMA_4'], data['EMA_9'], data['EMA_18'])
     else:
         # Calcular dos EMAs
         ema_short, ema_long = ema_periods
         data['EMA_short'] = ta.ema(data['Close'], length=ema_short)
         data['EMA_long'] = ta.ema(data['Close'], length=ema_long)
 
-        # Detectar cruces con doble EMA
-        data['Cruce'] = data.apply(
-            lambda row: detectar_cruce(
-                (data['EMA_short'].shift(1)[row.name], data['EMA_long'].shift(1)[row.name]),
-                (row['EMA_short'], row['EMA_long']),
-                num_emas=2
-            ), axis=1
-        )
+        # Detectar cruces con doble EMA sobre la serie completa
+        data['Cruce'] = detectar_cruces_doble(data['EMA_short'], data['EMA_long'])
 
     # Devolver los últimos 5 registros para análisis
     return data[['Cruce']].tail(5).to_dict(orient='records')
@@ -71,16 +45,37 @@ def evaluar_cruce(triple):
         return 1  # Señal de compra
     return 0  # No hay señal
 
+# Períodos de la triple EMA materializada en la tabla de señales
+PERIODOS_TRIPLE_MATERIALIZADOS = (4, 9, 18)
+
+# Leer de la tabla de señales los resultados de la triple EMA por defecto
+def resultados_materializados(tickers, ema_periods, use_triple):
+    if not use_triple or tuple(ema_periods) != PERIODOS_TRIPLE_MATERIALIZADOS:
+        return None
+    senales = TickerSignalsRepository.get_many(tickers)
+    if any(ticker not in senales for ticker in tickers):
+        return None  # Tabla incompleta: calcular sobre la serie completa
+    return {ticker: senales[ticker].resultado_triple for ticker in tickers}
+
 def obtener_ema_signals(tickers, ema_periods, use_triple):
     signals = []  # Almacenar las señales generadas
+    tickers = tickers[:50]
+
+    # Con los períodos por defecto, solo se cargan los precios de los tickers con señal
+    resultados = resultados_materializados(tickers, ema_periods, use_triple)
+    if resultados is not None:
+        tickers = [ticker for ticker in tickers if resultados[ticker]]
+        if not tickers:
+            return signals
 
-    for ticker in tickers[:50]:
-        # Obtener los datos históricos del modelo StockData
-        historical_data = StockData.objects.filter(ticker=ticker).order_by('date')
+    # Cargar todos los tickers con una sola consulta
+    precios = StockDataRepository.load_price_matrix(
+        tickers, fields=['open_price', 'high_price', 'low_price', 'close_price', 'volume'])
 
-        # Convertir el queryset en un DataFrame de Pandas
-        df = pd.DataFrame.from_records(historical_data.values(
-            'date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume'))
+    for ticker in tickers:
+        if precios.empty or ticker not in precios.columns.get_level_values('ticker'):
+            continue
+        df = precios.xs(ticker, axis=1, level='ticker').reset_index()
 
         # Cambiar los nombres de las columnas para adaptarse a la librería pandas_ta
         df.rename(columns={
@@ -97,7 +92,10 @@ def obtener_ema_signals(tickers, ema_periods, use_triple):
 
         # Calcular las EMAs y detectar cruces
         cruces_detectados = calculate_ema(df, ema_periods, use_triple)
-        resultado_cruce = evaluar_cruce(cruces_detectados)
+        if resultados is not None:
+            resultado_cruce = resultados[ticker]
+        else:
+            resultado_cruce = evaluar_cruce(cruces_detectados)
 
         # Definir la señal con base en el cruce detectado
         signal_text = "COMPRA" if resultado_cruce == 1 else "VENTA" if resultado_cruce == 2 else ""
@@ -13,7 +13,7 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
 import pandas_ta as ta
-from ..models import StockData
+from ..repositories.price_store import price_store
 
 
 def calcular_indicadores(df, indicadores):
@@ -86,8 +86,7 @@ def entrenar_modelo_service(data):
         if not (1 <= dias_prediccion <= 10):
             return {"error": "La cantidad de días a predecir debe estar entre 1 y 10."}
 
-        data = StockData.objects.filter(ticker=ticker, date__range=(inicio, fin)).order_by('date').values()
-        df = pd.DataFrame(data)
+        df = price_store.get_frame(ticker, inicio, fin)
 
         if df.empty:
             return {"error": f"No se encontraron datos para {ticker}"}
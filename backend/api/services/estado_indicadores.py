@@ -0,0 +1,334 @@
+"""
+Estado incremental de EMA y RSI por ticker.
+
+En lugar de recalcular las medias sobre toda la historia en cada solicitud,
+se persiste por ticker el último valor de cada EMA y las medias de
+ganancias y pérdidas del RSI. La ingesta avanza el estado con cada barra
+nueva en O(1) y los servicios de análisis leen los valores actuales.
+
+Las recurrencias reproducen exactamente a pandas:
+
+- EMA: ``close.ewm(span=n, adjust=False).mean()``, la misma que usan
+  ``trends.calculate_score`` y ``signals.calculate_signal``.
+- RSI: medias de Wilder ``ewm(alpha=1/n, adjust=True)`` de ganancias y
+  pérdidas, como ``pandas_ta.rsi``. Con ``adjust=True`` la media es un
+  cociente de sumas ponderadas, por lo que también se guarda la suma de pesos.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from api.repositories.activo_repository import StockDataRepository
+from api.repositories.indicator_state_repository import IndicatorStateRepository
+from .cruces import detectar_cruces_triple
+
+logger = logging.getLogger(__name__)
+
+PERIODOS_EMA = (4, 9, 12, 18, 21, 26, 50, 100, 200)
+PERIODO_RSI = 14
+VALORES_RECIENTES = 10  # Alcanza para el semáforo lento (9 días más la barra previa)
+
+# (período corto, período largo, días a considerar), como en calculate_analytics
+SEMAFOROS = {
+    'emaRapidaSemaforo': (9, 21, 3),
+    'emaMediaSemaforo': (50, 100, 5),
+    'emaLentaSemaforo': (50, 200, 9),
+}
+
+
+def _alpha_ema(periodo: int) -> float:
+    return 2.0 / (periodo + 1.0)
+
+
+def construir_estado(ticker: str, fechas: Sequence,
+                     cierres: Sequence[float]) -> Optional[Dict[str, Any]]:
+    """
+    Calcula el estado a partir de la historia completa, de forma vectorizada.
+
+    Args:
+        ticker (str): Ticker del activo.
+        fechas (Sequence): Fechas de las barras, en orden.
+        cierres (Sequence[float]): Precios de cierre de las barras.
+
+    Returns:
+        Optional[Dict[str, Any]]: El estado, o None si no hay cierres válidos.
+    """
+    serie = pd.Series(np.asarray(cierres, dtype=np.float64), index=pd.Index(fechas))
+    serie = serie.dropna()
+    if serie.empty:
+        return None
+
+    ema, ema_recent = {}, {}
+    for periodo in PERIODOS_EMA:
+        valores = serie.ewm(span=periodo, adjust=False).mean().to_numpy()
+        ema[str(periodo)] = float(valores[-1])
+        ema_recent[str(periodo)] = valores[-VALORES_RECIENTES:].tolist()
+
+    estado = {
+        'ticker': ticker,
+        'last_date': serie.index[-1],
+        'last_close': float(serie.iloc[-1]),
+        'bars': int(len(serie)),
+        'ema': ema,
+        'ema_recent': ema_recent,
+        'rsi_avg_gain': None,
+        'rsi_avg_loss': None,
+        'rsi_weight': 0.0,
+    }
+
+    cambios = serie.diff().iloc[1:]
+    if not cambios.empty:
+        alpha = 1.0 / PERIODO_RSI
+        ganancias, perdidas = cambios.clip(lower=0), -cambios.clip(upper=0)
+        estado['rsi_avg_gain'] = float(ganancias.ewm(alpha=alpha, adjust=True).mean().iloc[-1])
+        estado['rsi_avg_loss'] = float(perdidas.ewm(alpha=alpha, adjust=True).mean().iloc[-1])
+        estado['rsi_weight'] = float((1 - (1 - alpha) ** len(cambios)) / alpha)
+    return estado
+
+
+def avanzar_estado(estado: Dict[str, Any], fecha: Any, cierre: float) -> Dict[str, Any]:
+    """
+    Avanza el estado con una barra nueva en O(1).
+
+    Args:
+        estado (Dict[str, Any]): Estado actual (se modifica en el lugar).
+        fecha (Any): Fecha de la barra nueva.
+        cierre (float): Precio de cierre de la barra nueva.
+
+    Returns:
+        Dict[str, Any]: El mismo estado actualizado.
+    """
+    if cierre is None or np.isnan(cierre):
+        return estado
+
+    for periodo in PERIODOS_EMA:
+        clave = str(periodo)
+        alpha = _alpha_ema(periodo)
+        valor = (1 - alpha) * estado['ema'][clave] + alpha * cierre
+        estado['ema'][clave] = valor
+        estado['ema_recent'][clave] = (estado['ema_recent'][clave] + [valor])[-VALORES_RECIENTES:]
+
+    cambio = cierre - estado['last_close']
+    ganancia, perdida = max(cambio, 0.0), max(-cambio, 0.0)
+    if estado['rsi_avg_gain'] is None:
+        estado['rsi_avg_gain'], estado['rsi_avg_loss'] = ganancia, perdida
+        estado['rsi_weight'] = 1.0
+    else:
+        # Media ponderada con adjust=True: los pesos previos decaen y la barra nueva pesa 1
+        peso = estado['rsi_weight'] * (1 - 1.0 / PERIODO_RSI)
+        estado['rsi_avg_gain'] = (peso * estado['rsi_avg_gain'] + ganancia) / (peso + 1)
+        estado['rsi_avg_loss'] = (peso * estado['rsi_avg_loss'] + perdida) / (peso + 1)
+        estado['rsi_weight'] = peso + 1
+
+    estado['last_date'] = fecha
+    estado['last_close'] = float(cierre)
+    estado['bars'] += 1
+    return estado
+
+
+def _rsi(avg_gain: np.ndarray, avg_loss: np.ndarray, bars: np.ndarray) -> np.ndarray:
+    """RSI por ticker; NaN con menos de ``PERIODO_RSI`` variaciones (como ``pandas_ta.rsi``)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 * avg_gain / (avg_gain + avg_loss)
+    return np.where(bars - 1 >= PERIODO_RSI, rsi, np.nan)
+
+
+def calcular_rsi(estado: Dict[str, Any]) -> Optional[float]:
+    """
+    Obtiene el RSI actual del estado.
+
+    Args:
+        estado (Dict[str, Any]): Estado del ticker.
+
+    Returns:
+        Optional[float]: RSI entre 0 y 100, o None si hay menos de
+            ``PERIODO_RSI`` variaciones (igual que ``pandas_ta.rsi``).
+    """
+    if estado['rsi_avg_gain'] is None:
+        return None
+    rsi = _rsi(
+        np.float64(estado['rsi_avg_gain']),
+        np.float64(estado['rsi_avg_loss']),
+        np.int64(estado['bars']),
+    )
+    return None if np.isnan(rsi) else float(rsi)
+
+
+def _matriz_recientes(estados: List[Dict[str, Any]], periodo: int) -> np.ndarray:
+    """
+    Apila los valores recientes de una EMA en una matriz tiempo x tickers.
+
+    Las series más cortas que ``VALORES_RECIENTES`` se completan repitiendo su
+    primer valor, lo que no introduce cruces.
+    """
+    matriz = np.empty((VALORES_RECIENTES, len(estados)), dtype=np.float64)
+    for j, estado in enumerate(estados):
+        valores = estado['ema_recent'][str(periodo)]
+        matriz[:, j] = valores[0]
+        matriz[VALORES_RECIENTES - len(valores):, j] = valores
+    return matriz
+
+
+def _semaforos(corta: np.ndarray, larga: np.ndarray, dias: int) -> np.ndarray:
+    """Equivalente vectorizado de ``signals.calculate_signal`` sobre los valores recientes."""
+    cruce = np.where(corta > larga, 1, -1)
+    senales = np.diff(cruce, axis=0)[-dias:]
+    alza, baja = (senales == 2).any(axis=0), (senales == -2).any(axis=0)
+    return np.select([alza & baja, alza, baja], [0, 1, -1], default=0)
+
+
+def _tendencias(ema9: np.ndarray, ema21: np.ndarray) -> np.ndarray:
+    """Equivalente vectorizado de ``trends.check_ema_trend`` sobre los valores recientes."""
+    ema9, ema21 = ema9[-3:], ema21[-3:]
+    return np.select([(ema9 < ema21).all(axis=0), (ema9 > ema21).all(axis=0)], [1, 2], default=0)
+
+
+def _scores(ema: Dict[int, np.ndarray]) -> np.ndarray:
+    """Equivalente vectorizado de ``trends.calculate_score`` con los valores actuales."""
+    golden_death = np.sign(ema[50] - ema[200])
+    cruce_9_21 = np.where(ema[9] > ema[21], 1, -1)
+    cruce_12_26 = np.where(ema[12] > ema[26], 1, -1)
+    score = 0.5 * golden_death + 0.25 * cruce_9_21 + 0.25 * cruce_12_26
+    return (score + 1) / 2 * 100
+
+
+def resumir_estados(estados: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Deriva las métricas de análisis de varios tickers a la vez, sin recorrer la historia.
+
+    Args:
+        estados (List[Dict[str, Any]]): Estados de los tickers.
+
+    Returns:
+        Dict[str, np.ndarray]: Un array por métrica, alineado con ``estados``:
+            ``precio``, ``rsi`` (NaN si no está definido), ``scoreEma``,
+            ``tendencia219``, los tres semáforos, ``cruces`` (matriz 5 x tickers
+            con los últimos cruces de la triple EMA) y ``resultadoTriple``.
+    """
+    recientes = {p: _matriz_recientes(estados, p) for p in PERIODOS_EMA}
+    actuales = {p: matriz[-1] for p, matriz in recientes.items()}
+
+    cruces = detectar_cruces_triple(recientes[4], recientes[9], recientes[18])[-5:]
+    tiene_alza, tiene_baja = (cruces == 1).any(axis=0), (cruces == 2).any(axis=0)
+
+    avg_gain = np.array([
+        np.nan if e['rsi_avg_gain'] is None else e['rsi_avg_gain'] for e in estados
+    ])
+    avg_loss = np.array([
+        np.nan if e['rsi_avg_loss'] is None else e['rsi_avg_loss'] for e in estados
+    ])
+    bars = np.array([e['bars'] for e in estados])
+
+    resumen = {
+        'precio': np.array([e['last_close'] for e in estados], dtype=np.float64),
+        'rsi': _rsi(avg_gain, avg_loss, bars),
+        'scoreEma': _scores(actuales),
+        'tendencia219': _tendencias(recientes[9], recientes[21]),
+        'cruces': cruces,
+        'resultadoTriple': np.select([tiene_alza, tiene_baja], [1, 2], default=0),
+    }
+    for nombre, (corto, largo, dias) in SEMAFOROS.items():
+        resumen[nombre] = _semaforos(recientes[corto], recientes[largo], dias)
+    return resumen
+
+
+def resumen_indicadores(estado: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Deriva las métricas de análisis de un ticker a partir de su estado.
+
+    Args:
+        estado (Dict[str, Any]): Estado del ticker.
+
+    Returns:
+        Dict[str, Any]: ``last_date``, ``precio``, ``rsi``, ``scoreEma``,
+            ``tendencia219``, los tres semáforos, ``tripleEma`` (últimos cinco
+            cruces) y ``resultadoTriple``.
+    """
+    metricas = resumir_estados([estado])
+    resumen = {
+        'last_date': estado['last_date'],
+        'precio': estado['last_close'],
+        'rsi': calcular_rsi(estado),
+        'scoreEma': float(metricas['scoreEma'][0]),
+        'tripleEma': [{'Cruce': int(c)} for c in metricas['cruces'][:, 0]],
+    }
+    for nombre in ('tendencia219', 'resultadoTriple', *SEMAFOROS):
+        resumen[nombre] = int(metricas[nombre][0])
+    return resumen
+
+
+def actualizar_estado(ticker: str, reconstruir: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Avanza el estado persistido de un ticker con las barras nuevas de ``StockData``.
+
+    Si el ticker no tiene estado (o se pide reconstruir) se calcula desde toda
+    la historia; en otro caso solo se leen las barras posteriores a la última
+    procesada.
+
+    Args:
+        ticker (str): Ticker del activo.
+        reconstruir (bool, optional): Recalcular desde cero. Defaults to False.
+
+    Returns:
+        Optional[Dict[str, Any]]: El estado actualizado o None si no hay datos.
+    """
+    estado = None if reconstruir else IndicatorStateRepository.get(ticker)
+
+    if estado is None:
+        filas = list(StockDataRepository.get_price_rows(ticker, fields=['close_price']))
+        if not filas:
+            return None
+        fechas, cierres = zip(*filas)
+        estado = construir_estado(ticker, fechas, [np.nan if c is None else c for c in cierres])
+        if estado is None:
+            return None
+    else:
+        filas = StockDataRepository.get_price_rows(
+            ticker, since=estado['last_date'], fields=['close_price']
+        )
+        nuevas = 0
+        for fecha, cierre in filas:
+            avanzar_estado(estado, fecha, np.nan if cierre is None else float(cierre))
+            nuevas += 1
+        if not nuevas:
+            return estado
+
+    IndicatorStateRepository.save(estado)
+    return estado
+
+
+def actualizar_estados(tickers: Iterable[str]) -> int:
+    """
+    Avanza el estado de indicadores de varios tickers tras una ingesta.
+
+    Args:
+        tickers (Iterable[str]): Tickers con barras nuevas.
+
+    Returns:
+        int: Cantidad de tickers con estado actualizado.
+    """
+    actualizados = 0
+    for ticker in dict.fromkeys(tickers):
+        try:
+            if actualizar_estado(ticker) is not None:
+                actualizados += 1
+        except Exception:
+            logger.exception(f"No se pudo actualizar el estado de indicadores de {ticker}")
+    return actualizados
+
+
+def obtener_indicadores_actuales(ticker: str) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene las métricas actuales de un ticker desde el estado persistido.
+
+    Args:
+        ticker (str): Ticker del activo.
+
+    Returns:
+        Optional[Dict[str, Any]]: El resultado de ``resumen_indicadores`` o None
+            si el ticker todavía no tiene estado.
+    """
+    estado = IndicatorStateRepository.get(ticker)
+    return resumen_indicadores(estado) if estado else None
@@ -1,63 +1,140 @@
-import yfinance as yf
-from django.core.cache import cache
+import logging
+
+import pandas as pd
+
+from api.repositories.fundamental_repository import FundamentalSnapshotRepository
+from api.utils.yahoo_fetcher import ESTADOS_FINANCIEROS, yahoo_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+def _serializar_fundamentales(cashflows, balance, income):
+    """
+    Convierte los estados financieros descargados en el formato de la respuesta.
+
+    Args:
+        cashflows (pd.DataFrame): Estado de flujo de efectivo.
+        balance (pd.DataFrame): Balance.
+        income (pd.DataFrame): Estado de resultados.
+
+    Returns:
+        dict: Estados serializados a JSON y deuda de largo y corto plazo.
+    """
+    # Función para eliminar columnas con más de 10 NaNs
+    def drop_columns_with_many_nans(df):
+        if not df.empty:
+            return df.dropna(axis=1, thresh=len(df) - 10)
+        return df
+
+    # Eliminar columnas con más de 10 NaNs
+    cashflows = drop_columns_with_many_nans(cashflows)
+    balance = drop_columns_with_many_nans(balance)
+    income = drop_columns_with_many_nans(income)
+
+    # Convertir DataFrames a JSON
+    cashflows_json = cashflows.to_json(date_format='iso') if not cashflows.empty else None
+    balance_json = balance.to_json(date_format='iso') if not balance.empty else None
+    income_json = income.to_json(date_format='iso') if not income.empty else None
+
+    def ultimo_valor(concepto):
+        if concepto in balance.index and len(balance.columns):
+            valor = balance.loc[concepto, balance.columns[0]]
+            return float(valor) if pd.notna(valor) else 0
+        return 0
+
+    # Datos fundamentales para incluir en la respuesta
+    return {
+        'cash_flow': cashflows_json,
+        'balance': balance_json,
+        'income': income_json,
+        'long_term_debt': ultimo_valor('LongTermDebt'),
+        'current_debt': ultimo_valor('CurrentDebt'),
+    }
+
+
+def _snapshot_a_dict(snapshot):
+    return {
+        'cash_flow': snapshot.cash_flow,
+        'balance': snapshot.balance,
+        'income': snapshot.income,
+        'long_term_debt': snapshot.long_term_debt,
+        'current_debt': snapshot.current_debt,
+    }
+
+
+def actualizar_fundamentales(tickers, timeout=300):
+    """
+    Descarga los estados financieros de varios tickers y guarda un snapshot por ticker.
+
+    Todas las descargas (tres por ticker) se lanzan juntas en el fetcher concurrente.
+
+    Args:
+        tickers (list): Tickers a actualizar.
+        timeout (float, optional): Plazo total en segundos. Defaults to 300.
+
+    Returns:
+        dict: Por ticker, ``"ok"`` o el motivo del fallo.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    resultado = yahoo_fetcher.fetch(
+        {
+            (ticker, kind): (lambda tr, ticker=ticker, kind=kind: tr.statement(ticker, kind))
+            for ticker in tickers for kind in ESTADOS_FINANCIEROS
+        },
+        timeout=timeout,
+    )
+
+    estados = {}
+    for ticker in tickers:
+        claves = [(ticker, kind) for kind in ESTADOS_FINANCIEROS]
+        faltantes = [k for _, k in claves if (ticker, k) not in resultado.data]
+        if faltantes:
+            estados[ticker] = f'estados financieros no disponibles: {faltantes}'
+            continue
+        try:
+            datos = _serializar_fundamentales(*(resultado.data[clave] for clave in claves))
+            FundamentalSnapshotRepository.create(ticker, datos)
+            estados[ticker] = 'ok'
+        except Exception as e:
+            logger.exception(f'No se pudo guardar el snapshot fundamental de {ticker}')
+            estados[ticker] = str(e)
+    return estados
+
 
 def get_fundamental_data(ticker):
-    # Usar cache para obtener datos si están disponibles
-    cache_key = f'fundamental_info_{ticker}'
-    cached_data = cache.get(cache_key)
+    """
+    Obtiene los datos fundamentales de un ticker desde el último snapshot guardado.
+
+    Si el ticker todavía no tiene snapshot, se descarga en el momento y se guarda
+    para las próximas solicitudes.
 
-    if cached_data:
-        return cached_data
+    Args:
+        ticker (str): Ticker del activo.
+
+    Returns:
+        dict: Estados financieros serializados y deuda de largo y corto plazo.
+
+    Raises:
+        ValueError: Si no hay snapshot y la descarga falla.
+    """
+    snapshot = FundamentalSnapshotRepository.get_latest(ticker)
+    if snapshot is not None:
+        return _snapshot_a_dict(snapshot)
 
     try:
-        # Crear objeto Ticker usando yfinance
-        ticker_obj = yf.Ticker(ticker)
-        
-        # Obtener datos financieros
-        cashflows = ticker_obj.get_cashflow()
-        balance = ticker_obj.get_balance_sheet()
-        income = ticker_obj.get_income_stmt()
-
-        # Función para eliminar columnas con más de 10 NaNs
-        def drop_columns_with_many_nans(df):
-            if not df.empty:
-                return df.dropna(axis=1, thresh=len(df) - 10)
-            return df
-
-        # Eliminar columnas con más de 10 NaNs
-        cashflows = drop_columns_with_many_nans(cashflows)
-        balance = drop_columns_with_many_nans(balance)
-        income = drop_columns_with_many_nans(income)
-
-        # Convertir DataFrames a JSON
-        cashflows_json = cashflows.to_json(date_format='iso') if not cashflows.empty else None
-        balance_json = balance.to_json(date_format='iso') if not balance.empty else None
-        income_json = income.to_json(date_format='iso') if not income.empty else None
-
-        if 'LongTermDebt' in balance.index:
-            long_term_debt = balance.loc['LongTermDebt', balance.columns[0]]
-        else:
-            long_term_debt = 0
-
-        if 'CurrentDebt' in balance.index:
-            current_debt = balance.loc['CurrentDebt', balance.columns[0]]
-        else:
-            current_debt = 0
-        
-        # Datos fundamentales para incluir en la respuesta
-        fundamental_data = {
-            'cash_flow': cashflows_json,
-            'balance': balance_json,
-            'income': income_json,
-            'long_term_debt': long_term_debt,
-            'current_debt': current_debt
-        }
-
-        # Almacenar en cache por 1 hora (3600 segundos)
-        cache.set(cache_key, fundamental_data, timeout=3600)
+        # Obtener los tres estados financieros en paralelo
+        resultado = yahoo_fetcher.statements(ticker)
+        if not resultado.complete:
+            fallidos = {**resultado.errors, **{k: 'timeout' for k in resultado.timed_out}}
+            raise ValueError(f'estados financieros no disponibles: {fallidos}')
 
+        fundamental_data = _serializar_fundamentales(
+            resultado.data['cashflow'],
+            resultado.data['balance_sheet'],
+            resultado.data['income_stmt'],
+        )
+        FundamentalSnapshotRepository.create(ticker, fundamental_data)
         return fundamental_data
 
     except Exception as e:
         raise ValueError(f'Failed to retrieve data for {ticker}: {str(e)}')
-
@@ -5,6 +5,10 @@ from .trends import check_ema_trend, calculate_triple_ema, calculate_score
 from .signals import calculate_signal
 import pandas_ta as ta
 from api.models import StockData
+from api.cache.versions import VERSION_GLOBAL, obtener_versiones
+from api.repositories.price_store import price_store
+from .estado_indicadores import obtener_indicadores_actuales
+from .sectores import sector_index
 from django.utils.timezone import make_aware
 from django.core.cache import cache
 
@@ -34,17 +38,38 @@ def validate_date_range(start_date, end_date):
         raise ValueError('Start date must be earlier than end date.')
 
 def fetch_historical_data(ticker, start_date, end_date):
-    historical_data = StockData.objects.filter(
-        ticker=ticker, date__range=(start_date, end_date)
-    ).order_by('date')
+    return price_store.get_frame(ticker, start_date, end_date)
 
-    df = pd.DataFrame.from_records(
-        historical_data.values('date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
-    )
-    return df
+def calculate_analytics(df, ticker=None):
+    """
+    Calcula la serie de indicadores para graficar y las métricas actuales del activo.
 
-def calculate_analytics(df):
+    Si se indica el ticker y su estado incremental de indicadores está al día con
+    la última barra de ``df``, las métricas (tendencia, semáforos, triple EMA y
+    score) se leen del estado en lugar de recalcularse sobre toda la serie.
+    """
     pd.set_option('display.max_columns', None)
+    resumen = obtener_indicadores_actuales(ticker) if ticker and not df.empty else None
+    if resumen is not None and (
+        pd.Timestamp(resumen['last_date']) != pd.Timestamp(df['date'].iloc[-1])
+    ):
+        resumen = None  # La ventana pedida no termina en la última barra procesada
+
+    if resumen is not None:
+        # Replica las columnas que deja el cálculo completo: EMA_4/EMA_18 (con SMA
+        # inicial) y Signal marcan las primeras filas que descarta el dropna, y las
+        # EMAs graficadas quedan con ewm(adjust=False) como las deja calculate_score.
+        df['RSI'] = calculate_rsi(df)
+        df['EMA_4'] = calculate_ema(df, 4)
+        df['EMA_18'] = calculate_ema(df, 18)
+        calculate_signal(df, short_span=50, long_span=200, days_to_consider=9)
+        for span in (21, 9):
+            df[f'EMA_{span}'] = df['close_price'].ewm(span=span, adjust=False).mean()
+        df.dropna(inplace=True)
+        return _filas_analytics(df, resumen['tendencia219'], resumen['scoreEma'],
+                                resumen['emaRapidaSemaforo'], resumen['emaMediaSemaforo'],
+                                resumen['emaLentaSemaforo'], resumen['tripleEma'])
+
     # Calcular indicadores y agregar columnas necesarias
     df['RSI'] = calculate_rsi(df)  # Reemplaza con tu lógica real de RSI
     df['EMA_200'] = calculate_ema(df, 200)  # Reemplaza con tu lógica real de EMA
@@ -69,6 +94,12 @@ def calculate_analytics(df):
    
 
     df.dropna(inplace=True)
+    return _filas_analytics(df, tendencia219, scoreEma, emaRapidaSemaforo,
+                            emaMediaSemaforo, emaLentaSemaforo, tripleEma)
+
+
+def _filas_analytics(df, tendencia219, scoreEma, emaRapidaSemaforo,
+                     emaMediaSemaforo, emaLentaSemaforo, tripleEma):
     data = []
     for _, row in df.iterrows():
         data.append({
@@ -97,7 +128,13 @@ def calculate_sharpe_ratio(sector, x_years, y_years):
 
     # Sanitizar sector para evitar problemas con el cache_key
     safe_sector = sector.replace(" ", "_").replace(".", "-")
-    cache_key = f"sharpe_ratio_{safe_sector}_{x_years}_{y_years}"
+    # La versión sectorial cambia con cada `load_sectors` y la versión global de datos
+    # con cada ingesta; cualquiera de las dos descarta los resultados previos
+    version_datos = obtener_versiones([VERSION_GLOBAL])[VERSION_GLOBAL]
+    cache_key = (
+        f"sharpe_ratio_{safe_sector}_{x_years}_{y_years}_"
+        f"{sector_index.version()}_{version_datos}"
+    )
     sharpe_data = cache.get(cache_key)
 
     if sharpe_data:
@@ -109,11 +146,10 @@ def calculate_sharpe_ratio(sector, x_years, y_years):
             StockData.objects.values_list('ticker', flat=True).distinct()
         )
     else:
-        tickers = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0][
-            ['Symbol', 'GICS Sector', 'GICS Sub-Industry']
-        ]
-        sector_tickers = tickers[tickers['GICS Sector'] == sector]['Symbol'].tolist()
-        sector_tickers = [ticker.replace(".", "-") for ticker in sector_tickers]
+        # Composición local cargada con `manage.py load_sectors`, sin red en la solicitud
+        if sector_index.vacio():
+            return {'error': 'Sector data not loaded; run manage.py load_sectors'}
+        sector_tickers = sector_index.tickers(sector)
 
     if not sector_tickers:
         return {'error': 'Invalid sector or no tickers found'}
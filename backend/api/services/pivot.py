@@ -1,12 +1,180 @@
+import numpy as np
 import pandas as pd
 from decimal import Decimal
 from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
 
-def calculate_pivots(stock_data):
-    # Convertir los datos a un DataFrame
-    df = pd.DataFrame(list(stock_data))
-    df.drop(['id', 'ticker'], axis=1, inplace=True)
-    df.columns = ['time', 'open', 'high', 'low', 'close', 'volume']
+from api.repositories.activo_repository import StockDataRepository
+
+# Velas a cada lado que debe dominar un pivote
+N1_DEFAULT = 10
+N2_DEFAULT = 10
+
+# Códigos de pivote
+SIN_PIVOTE = 0
+PIVOTE_BAJO = 1
+PIVOTE_ALTO = 2
+PIVOTE_AMBOS = 3
+
+# Pivotes necesarios para considerar un nivel horizontal
+MIN_TOQUES = 2
+
+# Velas analizadas y graficadas
+LOOKBACK_DEFAULT = 300
+
+COLUMNAS_STOCK_DATA = {
+    'date': 'time',
+    'open_price': 'open',
+    'high_price': 'high',
+    'low_price': 'low',
+    'close_price': 'close',
+}
+
+
+def _formatear_fecha(valor):
+    return valor.strftime('%Y-%m-%d %H:%M:%S') if isinstance(valor, datetime) else str(valor)
+
+
+def detectar_pivotes(low, high, n1=N1_DEFAULT, n2=N2_DEFAULT):
+    """
+    Clasifica cada vela como pivote bajo, alto, ambos o ninguno.
+
+    Una vela ``l`` es pivote bajo si su mínimo es menor o igual que todos los
+    mínimos de ``[l - n1, l + n2]`` (y análogo con los máximos para el pivote
+    alto). Las velas sin ventana completa no son pivotes. Los extremos de cada
+    ventana se obtienen con ``sliding_window_view``, sin recorrer filas en Python.
+
+    Args:
+        low (array-like): Mínimos en orden cronológico.
+        high (array-like): Máximos en orden cronológico.
+        n1 (int, optional): Velas a la izquierda. Defaults to 10.
+        n2 (int, optional): Velas a la derecha. Defaults to 10.
+
+    Returns:
+        np.ndarray: Códigos 0 (ninguno), 1 (bajo), 2 (alto) o 3 (ambos) por vela.
+    """
+    if n1 < 0 or n2 < 0:
+        raise ValueError("n1 y n2 no pueden ser negativos")
+
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    codigos = np.zeros(len(low), dtype=np.int8)
+    ventana = n1 + n2 + 1
+    if len(low) < ventana:
+        return codigos
+
+    # La ventana k cubre [k, k + n1 + n2] y su vela central es k + n1;
+    # un NaN en la ventana anula el pivote, igual que una comparación fallida
+    centro = slice(n1, len(low) - n2)
+    es_bajo = low[centro] == sliding_window_view(low, ventana).min(axis=1)
+    es_alto = high[centro] == sliding_window_view(high, ventana).max(axis=1)
+    codigos[centro] = es_bajo * PIVOTE_BAJO + es_alto * PIVOTE_ALTO
+    return codigos
+
+
+def agrupar_niveles(pivotes, limites, min_toques=MIN_TOQUES):
+    """
+    Agrupa pivotes del mismo tipo con precios cercanos en niveles de soporte/resistencia.
+
+    Los pivotes se ordenan por tipo y precio y se recorren una sola vez: cada
+    pivote se une al nivel del anterior si la distancia entre ambos es menor
+    que ``limites``; si no, abre un nivel nuevo.
+
+    Args:
+        pivotes (pd.DataFrame): Columnas ``time``, ``pointpos`` y ``type`` ('high' o 'low').
+        limites (float): Distancia máxima entre pivotes vecinos de un mismo nivel.
+        min_toques (int, optional): Pivotes necesarios para formar un nivel. Defaults to 2.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.Series]: Niveles ordenados por precio (``type``,
+            ``price`` promedio, ``touches``, ``first_touch``, ``last_touch``) y
+            una máscara, alineada con ``pivotes``, de los pivotes que forman parte de ellos.
+    """
+    ordenados = pivotes.sort_values(['type', 'pointpos'], kind='stable')
+    nuevo = (
+        (ordenados['type'] != ordenados['type'].shift())
+        | (ordenados['pointpos'].diff() >= limites)
+    )
+    etiquetas = nuevo.cumsum()
+
+    niveles = ordenados.groupby(etiquetas).agg(
+        type=('type', 'first'),
+        price=('pointpos', 'mean'),
+        touches=('pointpos', 'size'),
+        first_touch=('time', 'min'),
+        last_touch=('time', 'max'),
+    )
+    niveles = niveles[niveles['touches'] >= min_toques]
+    en_nivel = etiquetas.isin(niveles.index).reindex(pivotes.index)
+    return niveles.sort_values('price').reset_index(drop=True), en_nivel
+
+
+def reducir_velas(velas, max_puntos):
+    """
+    Reduce una serie de velas a lo sumo ``max_puntos`` velas para graficar.
+
+    Las velas consecutivas se agrupan en bloques de tamaño similar que conservan
+    la apertura y la fecha de la primera, el cierre de la última y los extremos
+    del bloque, de modo que el gráfico mantiene los máximos y mínimos reales.
+
+    Args:
+        velas (pd.DataFrame): Columnas ``time``, ``open``, ``high``, ``low`` y ``close``.
+        max_puntos (Optional[int]): Cantidad máxima de velas. None no reduce.
+
+    Returns:
+        pd.DataFrame: Velas reducidas, en orden cronológico.
+    """
+    if not max_puntos or len(velas) <= max_puntos:
+        return velas
+    bloques = np.arange(len(velas)) * max_puntos // len(velas)
+    return velas.groupby(bloques).agg(
+        time=('time', 'first'),
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+    )
+
+
+def calcular_pivotes_ticker(ticker, n1=N1_DEFAULT, n2=N2_DEFAULT, lookback=LOOKBACK_DEFAULT,
+                            max_puntos=None):
+    """
+    Calcula pivotes y niveles de un ticker leyendo solo las velas necesarias.
+
+    La ventana de ``lookback`` velas necesita ``n1`` velas previas para
+    clasificar sus primeros pivotes; sus vecinas de la derecha ya son parte de
+    la ventana. Se leen entonces ``lookback + n1`` velas con volumen.
+
+    Args:
+        ticker (str): Ticker del activo.
+        n1 (int, optional): Velas a la izquierda de un pivote. Defaults to 10.
+        n2 (int, optional): Velas a la derecha de un pivote. Defaults to 10.
+        lookback (int, optional): Velas analizadas y graficadas. Defaults to 300.
+        max_puntos (Optional[int], optional): Máximo de velas en ``historical``. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: Igual que ``calculate_pivots``.
+    """
+    filas = StockDataRepository.get_recent_price_rows(ticker, lookback + n1, skip_zero_volume=True)
+    velas = pd.DataFrame.from_records(
+        filas, columns=['time', 'open', 'high', 'low', 'close', 'volume']
+    )
+    return calculate_pivots(velas, n1=n1, n2=n2, lookback=lookback, max_puntos=max_puntos)
+
+
+def preparar_velas(stock_data):
+    """
+    Normaliza velas a las columnas ``time``, ``open``, ``high``, ``low``, ``close`` y ``volume``.
+
+    Args:
+        stock_data (Union[pd.DataFrame, Iterable[dict]]): Filas de StockData
+            (``values()``) o un DataFrame con esas columnas o las normalizadas.
+
+    Returns:
+        pd.DataFrame: Velas con volumen en float, sin las de volumen 0.
+    """
+    df = pd.DataFrame(stock_data if isinstance(stock_data, pd.DataFrame) else list(stock_data))
+    df = df.rename(columns=COLUMNAS_STOCK_DATA)[['time', 'open', 'high', 'low', 'close', 'volume']]
 
     # Eliminar filas con volumen igual a 0
     df = df[df['volume'] != 0]
@@ -15,52 +183,37 @@ def calculate_pivots(stock_data):
     # Asegurar que los valores sean float (en caso de que vengan como Decimal)
     for col in ['open', 'high', 'low', 'close', 'volume']:
         df[col] = df[col].astype(float)
+    return df
 
-    # Función para calcular el tipo de pivote
-    def pivotid(df1, l, n1, n2):
-        if l - n1 < 0 or l + n2 >= len(df1):
-            return 0
-        pividlow = all(df1.low[l] <= df1.low[i] for i in range(l - n1, l + n2 + 1))
-        pividhigh = all(df1.high[l] >= df1.high[i] for i in range(l - n1, l + n2 + 1))
-        if pividlow and pividhigh:
-            return 3
-        elif pividlow:
-            return 1
-        elif pividhigh:
-            return 2
-        return 0
-
-    # Calcular la columna 'pivot'
-    df['pivot'] = df.apply(lambda x: pivotid(df, x.name, 10, 10), axis=1)
-
-    # Función para calcular la posición del punto pivote
-    def pointpos(x):
-        if x['pivot'] == 1:
-            return x['low'] - 1e-3
-        elif x['pivot'] == 2:
-            return x['high'] + 1e-3
-        return None
 
-    # Calcular la columna 'pointpos'
-    df['pointpos'] = df.apply(lambda row: pointpos(row), axis=1)
+def marcar_pivotes(df, n1=N1_DEFAULT, n2=N2_DEFAULT, lookback=LOOKBACK_DEFAULT):
+    """
+    Marca los pivotes de las velas y los agrupa en niveles dentro de la ventana analizada.
 
-    # Filtrar últimos 300 datos
-    dfpl = df[-300:-1]
+    Args:
+        df (pd.DataFrame): Velas de ``preparar_velas``; se les agregan las
+            columnas ``pivot`` y ``pointpos``.
+        n1 (int, optional): Velas a la izquierda de un pivote. Defaults to 10.
+        n2 (int, optional): Velas a la derecha de un pivote. Defaults to 10.
+        lookback (int, optional): Velas de la ventana. Defaults to 300.
 
-    # Identificar puntos pivote no nulos
-    pivot_points = dfpl.dropna(subset=['pointpos'])
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.Series, float]: Ventana
+            de velas, sus pivotes (``time``, ``pointpos``, ``type``), los niveles
+            de ``agrupar_niveles``, la máscara de pivotes en niveles y ``limites``.
+    """
+    # Calcular la columna 'pivot'
+    df['pivot'] = detectar_pivotes(df['low'].to_numpy(), df['high'].to_numpy(), n1, n2)
 
-    # Lista con datos de puntos pivote
-    data = []
+    # Posición del punto pivote: debajo del mínimo o encima del máximo
+    df['pointpos'] = np.select(
+        [df['pivot'] == PIVOTE_BAJO, df['pivot'] == PIVOTE_ALTO],
+        [df['low'] - 1e-3, df['high'] + 1e-3],
+        default=np.nan,
+    )
 
-    # Datos históricos para graficar
-    historical = dfpl.apply(lambda row: {
-        'date': row['time'].strftime('%Y-%m-%d %H:%M:%S') if isinstance(row['time'], datetime) else str(row['time']),
-        'open_price': row['open'],
-        'high_price': row['high'],
-        'low_price': row['low'],
-        'close_price': row['close'],
-    }, axis=1).tolist()
+    # Filtrar los últimos `lookback` datos
+    dfpl = df[-lookback:-1]
 
     # Calcular límites
     count = int(dfpl['pointpos'].count())
@@ -69,36 +222,53 @@ def calculate_pivots(stock_data):
     else:
         limites = 0.001
 
-    # Buscar puntos pivote similares (líneas horizontales)
-    for i in range(len(pivot_points)):
-        for j in range(i + 1, len(pivot_points)):
-            point_i = pivot_points.iloc[i]
-            point_j = pivot_points.iloc[j]
-
-            if (
-                point_i['pointpos'] > point_i['high'] and
-                point_j['pointpos'] > point_j['high'] and
-                abs(point_i['pointpos'] - point_j['pointpos']) < limites
-            ):
-                data.append({
-                    'time': point_i['time'].strftime('%Y-%m-%d %H:%M:%S') if isinstance(point_i['time'], datetime) else str(point_i['time']),
-                    'pointpos': float(point_i['pointpos']),
-                    'type': 'high'
-                })
-
-            elif (
-                point_i['pointpos'] < point_i['low'] and
-                point_j['pointpos'] < point_j['low'] and
-                abs(point_i['pointpos'] - point_j['pointpos']) < limites
-            ):
-                data.append({
-                    'time': point_i['time'].strftime('%Y-%m-%d %H:%M:%S') if isinstance(point_i['time'], datetime) else str(point_i['time']),
-                    'pointpos': float(point_i['pointpos']),
-                    'type': 'low'
-                })
+    # Identificar puntos pivote no nulos y agruparlos en niveles horizontales
+    pivot_points = dfpl.loc[dfpl['pointpos'].notna(), ['time', 'pointpos', 'pivot']]
+    pivot_points = pivot_points.assign(
+        type=np.where(pivot_points['pivot'] == PIVOTE_ALTO, 'high', 'low')
+    )
+    niveles, en_nivel = agrupar_niveles(pivot_points, limites)
+    return dfpl, pivot_points, niveles, en_nivel, limites
+
+
+def calculate_pivots(stock_data, n1=N1_DEFAULT, n2=N2_DEFAULT, lookback=LOOKBACK_DEFAULT,
+                     max_puntos=None):
+    df = preparar_velas(stock_data)
+    dfpl, pivot_points, niveles, en_nivel, limites = marcar_pivotes(df, n1, n2, lookback)
+
+    # Datos históricos para graficar, opcionalmente reducidos
+    historical = [
+        {
+            'date': _formatear_fecha(time),
+            'open_price': open_price,
+            'high_price': high_price,
+            'low_price': low_price,
+            'close_price': close_price,
+        }
+        for time, open_price, high_price, low_price, close_price in reducir_velas(
+            dfpl[['time', 'open', 'high', 'low', 'close']], max_puntos
+        ).itertuples(index=False)
+    ]
+
+    # Puntos pivote que pertenecen a algún nivel, en orden cronológico
+    data = [
+        {'time': _formatear_fecha(time), 'pointpos': float(pointpos), 'type': tipo}
+        for time, pointpos, tipo
+        in pivot_points.loc[en_nivel, ['time', 'pointpos', 'type']].itertuples(index=False)
+    ]
 
     return {
         'data': data,
+        'niveles': [
+            {
+                'price': float(nivel.price),
+                'type': nivel.type,
+                'touches': int(nivel.touches),
+                'first_touch': _formatear_fecha(nivel.first_touch),
+                'last_touch': _formatear_fecha(nivel.last_touch),
+            }
+            for nivel in niveles.itertuples(index=False)
+        ],
         'historical': historical,
         'limites': limites
     }
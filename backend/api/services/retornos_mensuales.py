@@ -1,44 +1,126 @@
 # api/services/retornos_mensuales.py
+"""
+Retornos mensuales por ticker en formato de grilla año x mes.
+
+Los cierres de fin de mes se leen del agregado continuo ``stockdata_monthly``
+con una sola consulta para todos los tickers; los que el agregado todavía no
+tiene (o todos, si no está disponible) se calculan desde los cierres diarios
+de ``StockData``. Los retornos y la grilla se arman con operaciones sobre
+arrays, sin recorrer celda por celda.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
-from ..models import StockData
-
-def calcular_retornos_mensuales(ticker: str, years: int):
-    # Consultar los datos históricos del ticker desde la base de datos
-    stock_data = StockData.objects.filter(
-        ticker=ticker,
-        date__gte=pd.Timestamp.now() - pd.DateOffset(years=years)
-    ).values('date', 'close_price').order_by('date')
-
-    # Convertir los datos a un DataFrame
-    df = pd.DataFrame(list(stock_data))
-
-    if df.empty:
-        return None  # No hay datos disponibles
-
-    # Procesar los datos
-    df['date'] = pd.to_datetime(df['date'])
-    df.set_index('date', inplace=True)
-
-    # Calcular los retornos mensuales
-    df['Month'] = df.index.to_period('M')
-    monthly_returns = df['close_price'].resample('M').ffill().pct_change()
-
-    # Crear una tabla pivot para retornos mensuales
-    monthly_returns = monthly_returns.to_frame().reset_index()
-    monthly_returns['Year'] = monthly_returns['date'].dt.year
-    monthly_returns['Month'] = monthly_returns['date'].dt.month
-
-    pivot_table = monthly_returns.pivot_table(values='close_price', index='Year', columns='Month')
-
-    # Convertir la tabla pivot a un formato adecuado para la respuesta JSON
-    data_for_plotly = []
-    for year in pivot_table.index:
-        for month in pivot_table.columns:
-            value = pivot_table.loc[year, month]
-            data_for_plotly.append({
-                'year': year,
-                'month': month,
-                'return': value if pd.notna(value) else None
-            })
-
-    return data_for_plotly
+
+from ..repositories.activo_repository import StockDataRepository
+from ..repositories.agregados_repository import AgregadosRepository
+
+
+def cierres_mensuales(tickers: List[str], years: int) -> pd.DataFrame:
+    """
+    Obtiene el último cierre de cada mes de los últimos ``years`` años.
+
+    Args:
+        tickers (List[str]): Tickers a consultar.
+        years (int): Años hacia atrás desde hoy.
+
+    Returns:
+        pd.DataFrame: Matriz mes x ticker (índice con el primer día de cada mes).
+            Los tickers sin datos no aparecen.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    inicio = pd.Timestamp.now() - pd.DateOffset(years=years)
+
+    # El primer mes puede empezar antes de ``inicio``: su cierre es igual
+    cierres = AgregadosRepository.load_closes(
+        tickers, 'monthly', inicio.to_period('M').to_timestamp().date()
+    )
+    if cierres is None:
+        cierres = pd.DataFrame(dtype='float64')
+
+    faltantes = [t for t in tickers if t not in cierres.columns]
+    if faltantes:
+        diarios = StockDataRepository.load_price_matrix(faltantes, start=inicio.date())
+        if not diarios.empty:
+            indice = diarios.index.tz_convert(None) if diarios.index.tz else diarios.index
+            meses = indice.to_period('M')
+            mensuales = diarios.groupby(meses).last()
+            mensuales.index = mensuales.index.to_timestamp()
+            cierres = pd.concat([cierres, mensuales], axis=1)
+
+    return cierres.reindex(columns=[t for t in tickers if t in cierres.columns]).sort_index()
+
+
+def grillas_retornos(cierres: pd.DataFrame) -> Dict[str, List[Dict]]:
+    """
+    Calcula los retornos mensuales y arma la grilla año x mes de cada ticker.
+
+    Los meses sin cierre conservan el cierre anterior (retorno cero), como al
+    remuestrear los cierres diarios. Como en una tabla pivot, se omiten los
+    años y meses sin ningún retorno definido.
+
+    Args:
+        cierres (pd.DataFrame): Matriz mes x ticker de cierres de fin de mes.
+
+    Returns:
+        Dict[str, List[Dict]]: Por ticker, celdas ``{'year', 'month', 'return'}``
+            (``return`` None si no está definido). Los tickers sin retornos no aparecen.
+    """
+    if cierres.empty:
+        return {}
+
+    meses = pd.period_range(cierres.index.min(), cierres.index.max(), freq='M')
+    valores = cierres.reindex(meses.to_timestamp()).ffill().to_numpy(dtype=np.float64)
+    retornos = np.full_like(valores, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retornos[1:] = valores[1:] / valores[:-1] - 1.0
+
+    # Grilla ticker x año x mes
+    anios = np.unique(meses.year)
+    grilla = np.full((valores.shape[1], len(anios), 12), np.nan)
+    grilla[:, np.searchsorted(anios, meses.year), meses.month - 1] = retornos.T
+
+    resultado = {}
+    definidos = ~np.isnan(grilla)
+    for i, ticker in enumerate(cierres.columns):
+        filas, columnas = definidos[i].any(axis=1), definidos[i].any(axis=0)
+        if not filas.any():
+            continue
+        celdas = grilla[i][np.ix_(filas, columnas)]
+        years = np.repeat(anios[filas], columnas.sum())
+        months = np.tile(np.arange(1, 13)[columnas], filas.sum())
+        resultado[ticker] = [
+            {'year': year, 'month': month, 'return': None if np.isnan(valor) else valor}
+            for year, month, valor in zip(years.tolist(), months.tolist(), celdas.ravel().tolist())
+        ]
+    return resultado
+
+
+def calcular_retornos_mensuales_tickers(tickers: List[str], years: int) -> Dict[str, List[Dict]]:
+    """
+    Calcula la grilla de retornos mensuales de varios tickers.
+
+    Args:
+        tickers (List[str]): Tickers a consultar.
+        years (int): Años hacia atrás desde hoy.
+
+    Returns:
+        Dict[str, List[Dict]]: Grilla por ticker (solo los que tienen datos).
+    """
+    return grillas_retornos(cierres_mensuales(tickers, years))
+
+
+def calcular_retornos_mensuales(ticker: str, years: int) -> Optional[List[Dict]]:
+    """
+    Calcula la grilla de retornos mensuales de un ticker.
+
+    Args:
+        ticker (str): Ticker a consultar.
+        years (int): Años hacia atrás desde hoy.
+
+    Returns:
+        Optional[List[Dict]]: Celdas ``{'year', 'month', 'return'}`` o None si
+            no hay datos disponibles.
+    """
+    return calcular_retornos_mensuales_tickers([ticker], years).get(ticker)
@@ -0,0 +1,150 @@
+"""
+Screener de soportes y resistencias para todo el universo de tickers.
+
+Los precios se leen por bloques de tickers como matrices alineadas por fecha
+(una consulta por bloque) y cada bloque se procesa en un pool de procesos con
+el detector vectorizado de ``api.services.pivot``. Los niveles resultantes,
+con la distancia del último cierre, se guardan en ``PivotLevel`` para que el
+frontend los filtre sin recalcular nada.
+"""
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from api.models import PivotLevel, StockData
+from api.repositories.activo_repository import StockDataRepository
+from api.repositories.pivot_level_repository import PivotLevelRepository
+from .pivot import LOOKBACK_DEFAULT, N1_DEFAULT, N2_DEFAULT, marcar_pivotes, preparar_velas
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_VELA = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+TICKERS_POR_BLOQUE = 50
+
+
+def niveles_de_bloque(velas_por_ticker: Dict[str, pd.DataFrame], n1: int, n2: int,
+                      lookback: int) -> List[Dict[str, Any]]:
+    """
+    Calcula los niveles de un bloque de tickers (se ejecuta en los procesos del pool).
+
+    Args:
+        velas_por_ticker (Dict[str, pd.DataFrame]): Velas por ticker con la
+            columna ``time`` y las columnas OHLCV de StockData.
+        n1 (int): Velas a la izquierda de un pivote.
+        n2 (int): Velas a la derecha de un pivote.
+        lookback (int): Velas analizadas.
+
+    Returns:
+        List[Dict[str, Any]]: Un registro por nivel con los campos de ``PivotLevel``
+            (salvo ``computed_at``).
+    """
+    registros = []
+    for ticker, velas in velas_por_ticker.items():
+        df = preparar_velas(velas)
+        if df.empty:
+            continue
+        _, _, niveles, _, _ = marcar_pivotes(df, n1, n2, lookback)
+        ultimo_cierre = float(df['close'].iloc[-1])
+        if not ultimo_cierre:
+            continue
+        for nivel in niveles.itertuples(index=False):
+            registros.append({
+                'ticker': ticker,
+                'type': nivel.type,
+                'price': float(nivel.price),
+                'touches': int(nivel.touches),
+                'first_touch': nivel.first_touch.date(),
+                'last_touch': nivel.last_touch.date(),
+                'last_close': ultimo_cierre,
+                'distance_pct': abs(ultimo_cierre - nivel.price) / ultimo_cierre * 100,
+            })
+    return registros
+
+
+def velas_de_bloque(tickers: List[str], barras: int) -> Dict[str, pd.DataFrame]:
+    """
+    Lee las últimas velas de un bloque de tickers con una sola consulta.
+
+    Args:
+        tickers (List[str]): Tickers del bloque.
+        barras (int): Velas con volumen necesarias por ticker.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Velas por ticker (a lo sumo ``barras``), en orden cronológico.
+    """
+    # Margen de fines de semana y feriados entre velas y días calendario
+    desde = timezone.now().date() - timedelta(days=int(barras * 1.5) + 10)
+    matriz = StockDataRepository.load_price_matrix(tickers, start=desde, fields=CAMPOS_VELA)
+    if matriz.empty:
+        return {}
+
+    velas_por_ticker = {}
+    for ticker in matriz.columns.get_level_values('ticker').unique():
+        velas = matriz.xs(ticker, level='ticker', axis=1).dropna()
+        velas = velas[velas['volume'] != 0].tail(barras)
+        velas_por_ticker[ticker] = velas.rename_axis('time').reset_index()
+    return velas_por_ticker
+
+
+def escanear_niveles(tickers: Optional[List[str]] = None, n1: int = N1_DEFAULT,
+                     n2: int = N2_DEFAULT, lookback: int = LOOKBACK_DEFAULT,
+                     workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calcula y guarda los niveles de soporte y resistencia de todos los tickers.
+
+    Args:
+        tickers (Optional[List[str]], optional): Tickers a escanear. Defaults to
+            todos los de StockData.
+        n1 (int, optional): Velas a la izquierda de un pivote. Defaults to 10.
+        n2 (int, optional): Velas a la derecha de un pivote. Defaults to 10.
+        lookback (int, optional): Velas analizadas por ticker. Defaults to 300.
+        workers (Optional[int], optional): Procesos del pool; 1 calcula en el
+            proceso actual. Defaults to ``PIVOT_SCREENER_WORKERS``.
+
+    Returns:
+        Dict[str, Any]: ``tickers`` escaneados, ``niveles`` guardados y ``segundos``.
+    """
+    inicio = time.perf_counter()
+    pedidos = tickers
+    tickers = tickers or list(
+        StockData.objects.values_list('ticker', flat=True).distinct().order_by('ticker')
+    )
+    workers = workers or getattr(settings, 'PIVOT_SCREENER_WORKERS', 2)
+    bloques = [
+        tickers[i:i + TICKERS_POR_BLOQUE] for i in range(0, len(tickers), TICKERS_POR_BLOQUE)
+    ]
+
+    registros = []
+    if workers > 1:
+        # La base se lee en este proceso; el pool solo recibe DataFrames
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futuros = [
+                executor.submit(
+                    niveles_de_bloque, velas_de_bloque(bloque, lookback + n1), n1, n2, lookback
+                )
+                for bloque in bloques
+            ]
+            for futuro in futuros:
+                registros.extend(futuro.result())
+    else:
+        for bloque in bloques:
+            registros.extend(
+                niveles_de_bloque(velas_de_bloque(bloque, lookback + n1), n1, n2, lookback)
+            )
+
+    calculado = timezone.now()
+    guardados = PivotLevelRepository.replace(
+        [PivotLevel(computed_at=calculado, **registro) for registro in registros],
+        tickers=pedidos,  # Sin tickers pedidos se reemplaza la tabla completa
+    )
+    segundos = time.perf_counter() - inicio
+    logger.info(
+        f"Screener de pivotes: {guardados} niveles de {len(tickers)} tickers en {segundos:.1f}s"
+    )
+    return {'tickers': len(tickers), 'niveles': guardados, 'segundos': segundos}
@@ -0,0 +1,152 @@
+"""
+Composición sectorial del S&P 500 sin acceso a la red en las solicitudes.
+
+La tabla ``SectorMembership`` se carga con el comando ``load_sectors`` desde
+un CSV o desde la lista de Wikipedia. Cada proceso mantiene un índice en
+memoria de sector a tickers, que se recarga solo cuando cambia la versión
+``VERSION_SECTORES`` en la caché compartida (la incrementa cada carga).
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from api.cache.versions import incrementar_versiones, obtener_versiones
+from api.models import SectorMembership
+from api.repositories.sector_repository import SectorMembershipRepository
+
+logger = logging.getLogger(__name__)
+
+VERSION_SECTORES = "__sectors__"
+URL_SP500 = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+# Nombres de columna aceptados para cada campo (lista de Wikipedia o CSV propio)
+COLUMNAS = {
+    'ticker': ('Symbol', 'ticker'),
+    'sector': ('GICS Sector', 'sector'),
+    'sub_industry': ('GICS Sub-Industry', 'sub_industry'),
+}
+
+
+def normalizar_constituyentes(tabla: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza una tabla de constituyentes a las columnas ``ticker``, ``sector`` y ``sub_industry``.
+
+    Los tickers con punto se escriben con guion, como en Yahoo Finance (``BRK.B`` -> ``BRK-B``).
+
+    Args:
+        tabla (pd.DataFrame): Tabla con las columnas de Wikipedia o con los
+            nombres de ``SectorMembership``.
+
+    Returns:
+        pd.DataFrame: Una fila por ticker, sin filas incompletas.
+    """
+    columnas = {}
+    for campo, alternativas in COLUMNAS.items():
+        encontrada = next((c for c in alternativas if c in tabla.columns), None)
+        if encontrada is None and campo != 'sub_industry':
+            raise ValueError(f"Falta la columna {' o '.join(alternativas)}")
+        columnas[campo] = tabla[encontrada] if encontrada else ''
+
+    normalizada = pd.DataFrame(columnas).dropna(subset=['ticker', 'sector'])
+    normalizada['ticker'] = (
+        normalizada['ticker'].astype(str).str.strip().str.replace('.', '-', regex=False)
+    )
+    normalizada['sector'] = normalizada['sector'].astype(str).str.strip()
+    normalizada['sub_industry'] = normalizada['sub_industry'].fillna('').astype(str).str.strip()
+    return normalizada.drop_duplicates('ticker', keep='last')
+
+
+def leer_constituyentes(origen: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lee la composición del S&P 500 desde un CSV o desde Wikipedia.
+
+    Args:
+        origen (Optional[str], optional): Ruta de un CSV. Defaults to la lista de Wikipedia.
+
+    Returns:
+        pd.DataFrame: Constituyentes normalizados.
+    """
+    tabla = pd.read_csv(origen) if origen else pd.read_html(URL_SP500)[0]
+    return normalizar_constituyentes(tabla)
+
+
+def cargar_sectores(constituyentes: pd.DataFrame) -> int:
+    """
+    Reemplaza la tabla de sectores e invalida los índices en memoria de todos los procesos.
+
+    Args:
+        constituyentes (pd.DataFrame): Salida de ``normalizar_constituyentes``.
+
+    Returns:
+        int: Cantidad de tickers guardados.
+    """
+    guardados = SectorMembershipRepository.replace_all([
+        SectorMembership(ticker=ticker, sector=sector, sub_industry=sub_industry)
+        for ticker, sector, sub_industry
+        in constituyentes[['ticker', 'sector', 'sub_industry']].itertuples(index=False)
+    ])
+    incrementar_versiones([VERSION_SECTORES])
+    logger.info(f"Composición sectorial cargada: {guardados} tickers")
+    return guardados
+
+
+class SectorIndex:
+    """
+    Índice en memoria de sector a tickers, por proceso.
+    """
+
+    def __init__(self, loader=SectorMembershipRepository.get_all):
+        """
+        Inicializa el índice vacío.
+
+        Args:
+            loader (Callable[[], List[Tuple[str, str]]], optional): Función que
+                devuelve los pares ``(ticker, sector)``. Defaults to el repositorio.
+        """
+        self._loader = loader
+        self._por_sector: Dict[str, Tuple[str, ...]] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _vigente(self) -> Dict[str, Tuple[str, ...]]:
+        version = obtener_versiones([VERSION_SECTORES])[VERSION_SECTORES]
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._por_sector = self._indexar(self._loader())
+                    self._version = version
+        return self._por_sector
+
+    @staticmethod
+    def _indexar(pares: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, ...]]:
+        por_sector: Dict[str, List[str]] = {}
+        for ticker, sector in pares:
+            por_sector.setdefault(sector.lower(), []).append(ticker)
+        return {sector: tuple(tickers) for sector, tickers in por_sector.items()}
+
+    def tickers(self, sector: str) -> List[str]:
+        """
+        Obtiene los tickers de un sector (sin distinguir mayúsculas).
+
+        Args:
+            sector (str): Nombre del sector GICS.
+
+        Returns:
+            List[str]: Tickers del sector; vacía si el sector no existe.
+        """
+        return list(self._vigente().get(sector.strip().lower(), ()))
+
+    def version(self) -> int:
+        """Versión de la composición vigente, útil para armar claves de caché."""
+        self._vigente()
+        return self._version
+
+    def vacio(self) -> bool:
+        """Indica si todavía no se cargó ninguna composición sectorial."""
+        return not self._vigente()
+
+
+# Instancia compartida por proceso
+sector_index = SectorIndex()
@@ -0,0 +1,98 @@
+"""
+Selección de la cantidad de clusters de k-means por silhouette.
+
+Este módulo no importa Django: joblib ejecuta ``_evaluar_k`` en procesos
+nuevos que solo necesitan poder importar este archivo.
+"""
+from typing import Any, Dict
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, kmeans_plusplus
+from sklearn.metrics import silhouette_score
+
+# Procesos de joblib, muestras desde las que conviene paralelizar
+# y tamaño de la muestra con la que se estima el silhouette
+N_JOBS = -1
+MIN_MUESTRAS_PARALELO = 1000
+MUESTRA_SILHOUETTE = 2000
+
+
+def _evaluar_k(datos_escalados, centros_iniciales, k, muestra_silhouette, random_state):
+    # Los primeros k centros de una siembra k-means++ son una siembra k-means++ válida para k
+    kmeans = KMeans(n_clusters=k, init=centros_iniciales[:k], n_init=1, random_state=random_state)
+    etiquetas = kmeans.fit_predict(datos_escalados)
+
+    # El silhouette no está definido si los clusters colapsan (por ejemplo, con puntos repetidos)
+    if not 2 <= len(np.unique(etiquetas)) < len(datos_escalados):
+        score = np.nan
+    else:
+        sample_size = muestra_silhouette if len(datos_escalados) > muestra_silhouette else None
+        score = silhouette_score(
+            datos_escalados, etiquetas, sample_size=sample_size, random_state=random_state
+        )
+    return {
+        'k': k,
+        'silhouette': float(score),
+        'inercia': float(kmeans.inertia_),
+        'etiquetas': etiquetas,
+    }
+
+
+def seleccionar_k(datos_escalados: np.ndarray, max_k: int = 10, n_jobs: int = N_JOBS,
+                  muestra_silhouette: int = MUESTRA_SILHOUETTE,
+                  random_state: int = 42) -> Dict[str, Any]:
+    """
+    Elige la cantidad de clusters que maximiza el silhouette entre 2 y ``max_k``.
+
+    Todos los candidatos parten de una única siembra k-means++ de ``max_k``
+    centros (cada k usa sus primeros k centros) y se ajustan en paralelo con
+    joblib cuando hay suficientes muestras. Con más de ``muestra_silhouette``
+    muestras el silhouette se estima sobre una muestra, evitando el costo O(n²).
+
+    Args:
+        datos_escalados (np.ndarray): Muestras ya estandarizadas.
+        max_k (int, optional): Máximo de clusters a evaluar. Defaults to 10.
+        n_jobs (int, optional): Procesos de joblib. Defaults to -1 (todos los núcleos).
+        muestra_silhouette (int, optional): Muestras para estimar el silhouette.
+            Defaults to 2000.
+        random_state (int, optional): Semilla. Defaults to 42.
+
+    Returns:
+        Dict[str, Any]: ``k`` elegido, ``etiquetas`` de ese ajuste y ``curva`` con
+            ``k``, ``silhouette`` (None si no está definido) e ``inercia`` por candidato.
+    """
+    datos_escalados = np.asarray(datos_escalados, dtype=np.float64)
+    # Limitar el número de clusters si las muestras son pocas
+    max_k = min(max_k, datos_escalados.shape[0] - 1)
+    if max_k < 2:
+        raise ValueError("Se necesitan al menos 3 tickers con datos para agrupar")
+
+    centros_iniciales, _ = kmeans_plusplus(
+        datos_escalados, n_clusters=max_k, random_state=random_state
+    )
+
+    # Con pocas muestras levantar procesos cuesta más que ajustar en serie
+    if datos_escalados.shape[0] < MIN_MUESTRAS_PARALELO:
+        n_jobs = 1
+    resultados = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluar_k)(datos_escalados, centros_iniciales, k, muestra_silhouette, random_state)
+        for k in range(2, max_k + 1)
+    )
+
+    scores = np.array([r['silhouette'] for r in resultados])
+    if np.isnan(scores).all():
+        raise ValueError("No se pudo calcular el silhouette para ningún k")
+    elegido = resultados[int(np.nanargmax(scores))]
+    return {
+        'k': elegido['k'],
+        'etiquetas': elegido['etiquetas'],
+        'curva': [
+            {
+                'k': r['k'],
+                'silhouette': None if np.isnan(r['silhouette']) else r['silhouette'],
+                'inercia': r['inercia'],
+            }
+            for r in resultados
+        ],
+    }
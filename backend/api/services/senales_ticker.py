@@ -0,0 +1,78 @@
+"""
+Tabla materializada de señales por ticker.
+
+Después de cada ingesta se recalculan, para todos los tickers actualizados a
+la vez, el resultado de la triple EMA, el RSI, el score de EMAs, los tres
+semáforos y la tendencia 9/21 a partir del estado incremental de indicadores.
+El listado de la cartera y el screener de señales leen la tabla con una sola
+consulta en lugar de recalcular cada ticker en cada solicitud.
+"""
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from api.models import TickerSignals
+from api.repositories.indicator_state_repository import IndicatorStateRepository
+from api.repositories.ticker_signals_repository import TickerSignalsRepository
+from .estado_indicadores import resumir_estados
+
+logger = logging.getLogger(__name__)
+
+
+def refrescar_senales(tickers: Optional[Iterable[str]] = None) -> int:
+    """
+    Recalcula la tabla de señales en un solo lote vectorizado.
+
+    Args:
+        tickers (Optional[Iterable[str]], optional): Tickers a recalcular.
+            Defaults to todos los tickers con estado de indicadores.
+
+    Returns:
+        int: Cantidad de tickers guardados.
+    """
+    estados = list(IndicatorStateRepository.get_many(tickers).values())
+    if not estados:
+        return 0
+
+    metricas = resumir_estados(estados)
+    rsi = metricas['rsi']
+    signals = [
+        TickerSignals(
+            ticker=estado['ticker'],
+            date=estado['last_date'],
+            precio=float(metricas['precio'][i]),
+            resultado_triple=int(metricas['resultadoTriple'][i]),
+            rsi=None if np.isnan(rsi[i]) else float(rsi[i]),
+            score_ema=float(metricas['scoreEma'][i]),
+            ema_rapida_semaforo=int(metricas['emaRapidaSemaforo'][i]),
+            ema_media_semaforo=int(metricas['emaMediaSemaforo'][i]),
+            ema_lenta_semaforo=int(metricas['emaLentaSemaforo'][i]),
+            tendencia219=int(metricas['tendencia219'][i]),
+        )
+        for i, estado in enumerate(estados)
+    ]
+    guardados = TickerSignalsRepository.upsert(signals)
+    logger.info(f"Señales recalculadas para {guardados} tickers")
+    return guardados
+
+
+def recomendacion_desde_senales(signals: TickerSignals) -> Dict[str, object]:
+    """
+    Arma los datos de ``ActivoService.process_activo`` a partir de la tabla de señales.
+
+    Args:
+        signals (TickerSignals): Fila de señales del ticker.
+
+    Returns:
+        Dict[str, object]: ``precioActual`` y ``recomendacion`` (JSON con
+            ``resultadoTriple`` y ``rsi``).
+    """
+    return {
+        'precioActual': signals.precio,
+        'recomendacion': json.dumps({
+            "resultadoTriple": signals.resultado_triple,
+            "rsi": signals.rsi,
+        }),
+    }
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas_ta as ta
 from .ema_logic import obtener_ema_signals
+from .cruces import detectar_cruce_puntual, detectar_cruces_triple
 
 def check_ema_trend(data):
     last3_ema9 = data['EMA_9'].tail(3).values
@@ -17,11 +18,9 @@ def check_ema_trend(data):
         return 0
 
 def detectar_cruce(ema4_prev, ema9_prev, ema18_prev, ema4_curr, ema9_curr, ema18_curr):
-    if ema4_prev <= ema9_prev and ema4_prev <= ema18_prev and ema4_curr > ema9_curr and ema4_curr > ema18_curr:
-        return 1  # Cruce al alza
-    elif ema4_prev >= ema9_prev and ema4_prev >= ema18_prev and ema4_curr < ema9_curr:
-        return 2  # Cruce a la baja
-    return 0
+    return detectar_cruce_puntual(
+        (ema4_prev, ema9_prev, ema18_prev), (ema4_curr, ema9_curr, ema18_curr)
+    )
 
 def calculate_score(data):
     # Calcular EMAs
@@ -60,10 +59,8 @@ def calculate_triple_ema(data):
     data['EMA_9'] = ta.ema(data['close_price'], length=9)
     data['EMA_18'] = ta.ema(data['close_price'], length=18)
 
-    # Aplica la función detectar_cruce para cada fila del DataFrame, comparando con la fila anterior
-    data['Cruce'] = data.apply(lambda row: detectar_cruce(
-        data['EMA_4'].shift(1)[row.name], data['EMA_9'].shift(1)[row.name], data['EMA_18'].shift(1)[row.name],
-        row['EMA_4'], row['EMA_9'], row['EMA_18']), axis=1)
+    # Detecta los cruces de toda la serie en una sola pasada, comparando con la fila anterior
+    data['Cruce'] = detectar_cruces_triple(data['EMA_4'], data['EMA_9'], data['EMA_18'])
     
     # Retorna un diccionario con las fechas y los valores de cruce
     result = data[['Cruce']].tail(5).to_dict(orient='records')
@@ -9,6 +9,8 @@ from typing import Dict, List, Any, Optional, Union, Tuple
 import pandas as pd
 from django.db.models import QuerySet
 
+from .cruces import detectar_cruce_puntual
+
 def validate_date_range(start_date: datetime, end_date: datetime, min_days: int = 365) -> None:
     """
     Valida que el rango de fechas cumpla con un mínimo de días.
@@ -55,13 +57,9 @@ def detectar_cruce(ema4_prev: float, ema9_prev: float, ema18_prev: float,
     Returns:
         int: 1 para cruce al alza, 2 para cruce a la baja, 0 sin cruce.
     """
-    # Detectar cruce al alza
-    if ema4_prev <= ema9_prev and ema4_prev <= ema18_prev and ema4_curr > ema9_curr and ema4_curr > ema18_curr:
-        return 1  # Cruce al alza de EMA4 a EMA9 y EMA18
-    # Detectar cruce a la baja
-    elif ema4_prev >= ema9_prev and ema4_prev >= ema18_prev and ema4_curr < ema9_curr:
-        return 2  # Cruce a la baja de EMA4 a EMA9
-    return 0  # No hay cruce significativo
+    return detectar_cruce_puntual(
+        (ema4_prev, ema9_prev, ema18_prev), (ema4_curr, ema9_curr, ema18_curr)
+    )
     
 def evaluar_cruce(triple: List[Dict[str, Any]]) -> int:
     """
@@ -0,0 +1,86 @@
+"""
+Tests unitarios para dividendos y splits almacenados localmente.
+
+Este módulo verifica la extracción de acciones corporativas de una descarga
+de Yahoo Finance, la agregación mensual de dividendos y la carga inicial
+del historial de dividendos.
+"""
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.logica.ingesta import extraer_acciones_corporativas
+from api.services.acciones_corporativas import backfill_dividendos, obtener_dividendos_por_mes
+from api.utils.yahoo_fetcher import FetchResult
+
+
+class TestAccionesCorporativas(SimpleTestCase):
+    """Tests para la ingesta y el uso de dividendos y splits."""
+
+    def test_extraer_de_descarga_con_actions(self):
+        """Solo los días con dividendo o split generan registros."""
+        fechas = pd.date_range("2024-03-01", periods=4, tz="America/New_York")
+        datos = pd.DataFrame({
+            "Close": [1.0, 2.0, 3.0, 4.0],
+            "Dividends": [0.0, 0.24, 0.0, 0.0],
+            "Stock Splits": [0.0, 0.0, 0.0, 4.0],
+        }, index=fechas)
+
+        dividendos, splits = extraer_acciones_corporativas("AAPL", datos)
+
+        self.assertEqual(
+            [(d.ticker, d.date, d.amount) for d in dividendos], [("AAPL", date(2024, 3, 2), 0.24)]
+        )
+        self.assertEqual([(s.date, s.ratio) for s in splits], [(date(2024, 3, 4), 4.0)])
+
+    def test_extraer_con_columnas_multiindex(self):
+        """Las descargas con el ticker como segundo nivel de columnas también se aceptan."""
+        fechas = pd.date_range("2024-03-01", periods=2)
+        datos = pd.DataFrame(
+            {("Dividends", "KO"): [0.0, 0.5], ("Stock Splits", "KO"): [0.0, 0.0]}, index=fechas
+        )
+
+        dividendos, splits = extraer_acciones_corporativas("KO", datos)
+
+        self.assertEqual(len(dividendos), 1)
+        self.assertEqual(splits, [])
+
+    @patch("api.services.acciones_corporativas.DividendRepository.get_monthly_totals")
+    def test_dividendos_por_mes(self, get_monthly_totals):
+        """Las filas agrupadas se vuelcan en los doce meses con total y detalle."""
+        get_monthly_totals.return_value = [
+            {"mes": 2, "ticker": "AAPL", "monto": 0.24},
+            {"mes": 2, "ticker": "KO", "monto": 0.46},
+            {"mes": 11, "ticker": "AAPL", "monto": 0.25},
+        ]
+
+        meses = obtener_dividendos_por_mes(["AAPL", "KO"], 2024)
+
+        self.assertEqual(len(meses), 12)
+        self.assertAlmostEqual(meses[1]["total"], 0.70)
+        self.assertEqual([d["empresa"] for d in meses[1]["detalles"]], ["AAPL", "KO"])
+        self.assertEqual(meses[10]["detalles"], [{"empresa": "AAPL", "monto": 0.25}])
+        self.assertEqual(meses[0], {"total": 0, "detalles": []})
+
+    @patch("api.services.acciones_corporativas.incrementar_versiones")
+    @patch("api.services.acciones_corporativas.DividendRepository.upsert")
+    def test_backfill_de_dividendos(self, upsert, incrementar_versiones):
+        """El historial de Yahoo se guarda completo y se informa el estado de cada ticker."""
+        resultado = FetchResult()
+        fechas = pd.to_datetime(["2022-03-14", "2022-06-14", "2023-03-16"])
+        fechas = fechas.tz_localize("America/New_York")
+        resultado.data["KO"] = pd.Series([0.44, 0.0, 0.46], index=fechas)
+        resultado.errors["DLST"] = "not found"
+        fetcher = SimpleNamespace(dividends=lambda tickers, timeout=None: resultado)
+
+        estados = backfill_dividendos(["KO", "DLST", "KO"], fetcher=fetcher)
+
+        self.assertEqual(estados, {"KO": "ok", "DLST": "not found"})
+        guardados = upsert.call_args.args[0]
+        self.assertEqual([(d.ticker, d.date, d.amount) for d in guardados],
+                         [("KO", date(2022, 3, 14), 0.44), ("KO", date(2023, 3, 16), 0.46)])
+        incrementar_versiones.assert_called_once()
+        self.assertEqual(list(incrementar_versiones.call_args.args[0]), ["KO"])
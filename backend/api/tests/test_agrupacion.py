@@ -0,0 +1,63 @@
+"""
+Tests unitarios para la selección de la cantidad de clusters.
+
+Este módulo verifica que la selección de k encuentre la estructura de los
+datos, devuelva la curva completa y dé lo mismo en serie y en paralelo.
+"""
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.datasets import make_blobs
+
+from api.services.agrupacion import encontrar_k_optimo
+from api.services.seleccion_k import seleccionar_k
+
+
+class TestSeleccionarK(SimpleTestCase):
+    """Tests para seleccionar_k."""
+
+    def setUp(self):
+        self.datos, _ = make_blobs(n_samples=300, centers=4, cluster_std=0.5, random_state=0)
+
+    def test_elige_k_de_los_datos_y_devuelve_la_curva(self):
+        seleccion = seleccionar_k(self.datos, max_k=8)
+
+        self.assertEqual(seleccion['k'], 4)
+        self.assertEqual([p['k'] for p in seleccion['curva']], list(range(2, 9)))
+        mejor = max(seleccion['curva'], key=lambda p: p['silhouette'])
+        self.assertEqual(mejor['k'], 4)
+        self.assertEqual(len(np.unique(seleccion['etiquetas'])), 4)
+        # La inercia baja a medida que crece k
+        inercias = [p['inercia'] for p in seleccion['curva']]
+        self.assertEqual(inercias[:3], sorted(inercias[:3], reverse=True))
+
+    def test_silhouette_muestreado(self):
+        completo = seleccionar_k(self.datos, max_k=6)
+        muestreado = seleccionar_k(self.datos, max_k=6, muestra_silhouette=150)
+
+        self.assertEqual(muestreado['k'], completo['k'])
+        for a, b in zip(completo['curva'], muestreado['curva']):
+            self.assertEqual(a['inercia'], b['inercia'])
+            self.assertAlmostEqual(a['silhouette'], b['silhouette'], delta=0.1)
+
+    @patch('api.services.seleccion_k.MIN_MUESTRAS_PARALELO', 0)
+    def test_paralelo_equivale_a_serie(self):
+        serie = seleccionar_k(self.datos, max_k=6, n_jobs=1)
+        paralelo = seleccionar_k(self.datos, max_k=6, n_jobs=2)
+
+        self.assertEqual(serie['curva'], paralelo['curva'])
+        np.testing.assert_array_equal(serie['etiquetas'], paralelo['etiquetas'])
+
+    def test_puntos_repetidos_no_rompen_la_curva(self):
+        """Si un k no puede formar clusters distintos, su silhouette queda en None."""
+        datos = np.array([[0.0, 0.0]] * 5 + [[1.0, 1.0]] * 5)
+
+        seleccion = seleccionar_k(datos, max_k=4)
+
+        self.assertEqual(seleccion['k'], 2)
+        self.assertIsNotNone(seleccion['curva'][0]['silhouette'])
+
+    def test_pocas_muestras(self):
+        with self.assertRaises(ValueError):
+            encontrar_k_optimo(np.array([[1.0, 2.0], [3.0, 4.0]]))
@@ -0,0 +1,334 @@
+"""
+Tests unitarios para la capa de caché compartida.
+
+Este módulo verifica el backend Redis con compresión contra un servidor
+Redis falso en proceso (fakeredis), el espacio de nombres de las claves
+por vista y los contadores de aciertos y fallos, la invalidación por
+versión de datos y el cálculo de una sola vez con stale-while-revalidate.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.cache.serializers import MARCA_COMPRIMIDO, CompressedRedisSerializer
+from api.cache.stats import obtener_estadisticas
+from api.cache.versions import obtener_versiones
+from api.logica.ingesta import notificar_ingesta
+from api.services.indicators import calculate_sharpe_ratio
+from api.views.analytics_views import DividendosView
+from api.views.base import CachedAPIView
+
+LOCMEM = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests-cache",
+    }
+}
+
+
+def _redis_falso(server, min_bytes=1024):
+    """Crea un backend RedisCache de Django conectado a un servidor fakeredis."""
+    return RedisCache(
+        "redis://localhost:6379/0",
+        {
+            "KEY_PREFIX": "tests",
+            "OPTIONS": {
+                "serializer": lambda: CompressedRedisSerializer(min_bytes=min_bytes),
+                "connection_class": fakeredis.FakeConnection,
+                "server": server,
+            },
+        },
+    )
+
+
+class TestCompressedRedisCache(SimpleTestCase):
+    """Tests del backend Redis con el serializador comprimido."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        self.server = fakeredis.FakeServer()
+        self.cache = _redis_falso(self.server)
+        self.raw = fakeredis.FakeStrictRedis(server=self.server)
+
+    def test_payload_grande_se_comprime(self):
+        """Los payloads que superan el umbral se guardan comprimidos."""
+        curva = [{"Equity": 10000.0 + i, "DrawdownPct": 0.0} for i in range(2000)]
+        self.cache.set("equity", curva)
+
+        crudo = self.raw.get(self.cache.make_key("equity"))
+        self.assertTrue(crudo.startswith(MARCA_COMPRIMIDO))
+        self.assertEqual(self.cache.get("equity"), curva)
+
+    def test_payload_chico_no_se_comprime(self):
+        """Los payloads chicos se guardan como pickle plano."""
+        self.cache.set("chico", {"a": 1})
+
+        crudo = self.raw.get(self.cache.make_key("chico"))
+        self.assertFalse(crudo.startswith(MARCA_COMPRIMIDO))
+        self.assertEqual(self.cache.get("chico"), {"a": 1})
+
+    def test_enteros_admiten_incr(self):
+        """Los enteros no se serializan, así que incr es atómico en Redis."""
+        self.cache.set("contador", 1)
+        self.assertEqual(self.cache.incr("contador"), 2)
+        self.assertEqual(self.cache.get("contador"), 2)
+
+    def test_cache_compartida_entre_clientes(self):
+        """Dos clientes (workers) conectados al mismo servidor comparten los valores."""
+        otro_worker = _redis_falso(self.server)
+        self.cache.set("sharpe", {"sharpe_data": [1, 2, 3]})
+        self.assertEqual(otro_worker.get("sharpe"), {"sharpe_data": [1, 2, 3]})
+
+
+class _VistaDePrueba(CachedAPIView):
+    pass
+
+
+class _VistaConNamespace(CachedAPIView):
+    cache_namespace = "analytics.prueba"
+
+
+class _VistaSinVersion(CachedAPIView):
+    cache_versioned = False
+
+
+@override_settings(CACHES=LOCMEM)
+class TestNamespaceYContadores(SimpleTestCase):
+    """Tests del espacio de nombres de claves y los contadores de CachedAPIView."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        cache.clear()
+
+    def test_clave_con_namespace_por_vista(self):
+        """Las claves quedan prefijadas por el espacio de nombres de la vista."""
+        self.assertRegex(
+            _VistaDePrueba().get_cache_key(ticker="AAPL", years=10),
+            r"^_VistaDePrueba:ticker_AAPL_years_10@v\d+$",
+        )
+        self.assertTrue(
+            _VistaConNamespace().get_cache_key(ticker="AAPL").startswith("analytics.prueba:")
+        )
+
+    def test_parametros_largos_se_hashean(self):
+        """Los parámetros muy largos se reemplazan por su hash dentro del namespace."""
+        tickers = ",".join(f"T{i}" for i in range(300))
+        clave = _VistaDePrueba().get_cache_key(tickers=tickers)
+        self.assertTrue(clave.startswith("_VistaDePrueba:"))
+        self.assertLess(len(clave), 60)
+        self.assertEqual(clave, _VistaDePrueba().get_cache_key(tickers=tickers))
+
+    def test_contadores_de_aciertos_y_fallos(self):
+        """get_from_cache registra aciertos y fallos por espacio de nombres."""
+        vista = _VistaDePrueba()
+        clave = vista.get_cache_key(ticker="AAPL")
+
+        self.assertIsNone(vista.get_from_cache(clave))
+        vista.set_in_cache(clave, {"x": 1})
+        vista.get_from_cache(clave)
+        vista.get_from_cache(clave)
+
+        stats = obtener_estadisticas(["_VistaDePrueba", "_VistaConNamespace"])
+        self.assertEqual(stats["_VistaDePrueba"], {"hits": 2, "misses": 1, "hit_rate": 0.6667})
+        self.assertEqual(stats["_VistaConNamespace"]["hit_rate"], 0.0)
+
+
+@override_settings(CACHES=LOCMEM)
+class TestGetOrCompute(SimpleTestCase):
+    """Tests del cálculo de una sola vez y stale-while-revalidate de CachedAPIView."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        cache.clear()
+        self.vista = _VistaDePrueba()
+        self.clave = self.vista.get_cache_key(sector="Tecnologia")
+
+    def test_solicitudes_concurrentes_calculan_una_vez(self):
+        """Varios hilos con la misma clave ejecutan el cálculo una sola vez."""
+        llamadas = []
+        inicio = threading.Event()
+
+        def calcular():
+            llamadas.append(1)
+            time.sleep(0.2)
+            return {"sharpe_data": [1, 2]}
+
+        resultados = []
+
+        def solicitud():
+            inicio.wait()
+            resultados.append(_VistaDePrueba().get_or_compute(self.clave, calcular))
+
+        hilos = [threading.Thread(target=solicitud) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        inicio.set()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, [{"sharpe_data": [1, 2]}] * 8)
+
+    def test_valor_vencido_se_sirve_mientras_otro_worker_recalcula(self):
+        """Si otro worker tiene el lock, se devuelve el valor vencido sin recalcular."""
+        cache.set(self.clave, {"value": "viejo", "fresh_until": time.time() - 1}, timeout=60)
+        cache.add(f"{self.clave}:lock", 1)
+
+        valor = self.vista.get_or_compute(self.clave, lambda: self.fail("no debe recalcular"))
+
+        self.assertEqual(valor, "viejo")
+
+    def test_valor_vencido_se_recalcula_sin_competencia(self):
+        """Sin otro worker calculando, el valor vencido se reemplaza y el lock se libera."""
+        cache.set(self.clave, {"value": "viejo", "fresh_until": time.time() - 1}, timeout=60)
+
+        self.assertEqual(self.vista.get_or_compute(self.clave, lambda: "nuevo"), "nuevo")
+        self.assertEqual(self.vista.get_or_compute(self.clave, lambda: "otro"), "nuevo")
+        self.assertIsNone(cache.get(f"{self.clave}:lock"))
+
+    def test_should_cache_evita_guardar_errores(self):
+        """Los resultados rechazados por should_cache no se guardan."""
+        def es_valido(data):
+            return "error" not in data
+
+        self.vista.get_or_compute(
+            self.clave, lambda: {"error": "sin datos"}, should_cache=es_valido
+        )
+        self.assertEqual(
+            self.vista.get_or_compute(self.clave, lambda: {"ok": 1}, should_cache=es_valido),
+            {"ok": 1},
+        )
+
+
+@override_settings(CACHES=LOCMEM)
+class TestVersionesDeDatos(SimpleTestCase):
+    """Tests de la invalidación de claves por versión de datos de cada ticker."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        cache.clear()
+        self.vista = _VistaDePrueba()
+
+    def test_ingesta_invalida_solo_los_tickers_afectados(self):
+        """La clave cambia solo si cambian los datos de alguno de sus tickers."""
+        aapl = self.vista.get_cache_key(ticker="AAPL")
+        msft = self.vista.get_cache_key(ticker="MSFT")
+
+        notificar_ingesta(["AAPL"])
+
+        self.assertNotEqual(self.vista.get_cache_key(ticker="AAPL"), aapl)
+        self.assertEqual(self.vista.get_cache_key(ticker="MSFT"), msft)
+
+    def test_varios_tickers_en_lista_o_texto(self):
+        """Los parámetros con varios tickers dependen de la versión de cada uno."""
+        clave = self.vista.get_cache_key(tickers="AAPL,MSFT", years=5)
+        self.assertEqual(self.vista.get_cache_key(tickers="AAPL,MSFT", years=5), clave)
+
+        notificar_ingesta(["MSFT"])
+
+        self.assertNotEqual(self.vista.get_cache_key(tickers="AAPL,MSFT", years=5), clave)
+
+    def test_sin_tickers_usa_version_global(self):
+        """Las claves sin tickers se invalidan con cualquier ingesta."""
+        clave = self.vista.get_cache_key(sector="Tecnologia")
+        notificar_ingesta(["TSLA"])
+        self.assertNotEqual(self.vista.get_cache_key(sector="Tecnologia"), clave)
+
+    def test_vista_sin_version(self):
+        """Las vistas que no dependen de StockData no incluyen versión."""
+        clave = _VistaSinVersion().get_cache_key(ticker="AAPL")
+        notificar_ingesta(["AAPL"])
+        self.assertEqual(clave, "_VistaSinVersion:ticker_AAPL")
+        self.assertEqual(_VistaSinVersion().get_cache_key(ticker="AAPL"), clave)
+
+    def test_version_desalojada_no_se_repite(self):
+        """Si la versión se pierde, la nueva no coincide con la anterior."""
+        anterior = obtener_versiones(["AAPL"])["AAPL"]
+        cache.clear()
+        self.assertNotEqual(obtener_versiones(["AAPL"])["AAPL"], anterior)
+
+    def test_resultado_sin_expiracion(self):
+        """Con cache_timeout None el resultado se guarda sin TTL hasta la próxima ingesta."""
+        vista = _VistaDePrueba()
+        vista.cache_timeout = None
+        clave = vista.get_cache_key(ticker="AAPL")
+
+        self.assertEqual(vista.get_or_compute(clave, lambda: 1), 1)
+        self.assertEqual(vista.get_or_compute(clave, lambda: 2), 1)
+
+        notificar_ingesta(["AAPL"])
+        self.assertEqual(vista.get_or_compute(vista.get_cache_key(ticker="AAPL"), lambda: 3), 3)
+
+    def test_version_anterior_se_sirve_mientras_otro_worker_recalcula(self):
+        """Tras una ingesta, la clave nueva sirve el valor anterior si otro worker calcula."""
+        vista = _VistaDePrueba()
+        vista.cache_timeout = None
+        vista.get_or_compute(vista.get_cache_key(ticker="AAPL"), lambda: 1)
+
+        notificar_ingesta(["AAPL"])
+        vista = _VistaDePrueba()
+        clave = vista.get_cache_key(ticker="AAPL")
+        cache.add(f"{clave}:lock", 1)
+        self.assertEqual(vista.get_or_compute(clave, lambda: self.fail("no debe recalcular")), 1)
+
+        cache.delete(f"{clave}:lock")
+        self.assertEqual(vista.get_or_compute(clave, lambda: 2), 2)
+        self.assertEqual(vista.get_or_compute(clave, lambda: 3), 2)
+
+    @override_settings(LOCAL_CACHE_MAX_TIMEOUT=60)
+    def test_sin_expiracion_limitada_en_cache_local(self):
+        """En la caché in-memory por proceso, None se limita a LOCAL_CACHE_MAX_TIMEOUT."""
+        vista = _VistaDePrueba()
+        vista.cache_timeout = None
+        clave = vista.get_cache_key(ticker="AAPL")
+
+        vista.get_or_compute(clave, lambda: 1)
+        self.assertLessEqual(cache.get(clave)["fresh_until"], time.time() + 60)
+        self.assertEqual(vista.get_cache_timeout(None), 60)
+        self.assertEqual(vista.get_cache_timeout(10), 10)
+
+    @patch("api.views.analytics_views.obtener_dividendos_por_mes", return_value=[])
+    def test_dividendos_por_año_y_ticker_normalizado(self, dividendos):
+        """La clave de dividendos usa el ticker de StockData y distingue el año."""
+        factory = RequestFactory()
+        vista = DividendosView.as_view()
+
+        vista(factory.get("/dividendos/", {"tickers": "BRK.B", "year": 2023}))
+        vista(factory.get("/dividendos/", {"tickers": "BRK.B", "year": 2024}))
+        self.assertEqual(dividendos.call_count, 2)
+        dividendos.assert_called_with(["BRK-B"], 2024)
+
+        notificar_ingesta(["BRK-B"])
+        vista(factory.get("/dividendos/", {"tickers": "BRK.B", "year": 2024}))
+        self.assertEqual(dividendos.call_count, 3)
+
+    @patch("api.services.indicators.sector_index")
+    @patch("api.services.indicators.StockData")
+    def test_sharpe_se_recalcula_tras_una_ingesta(self, stock_data, sectores):
+        """La caché interna del ratio de Sharpe depende de la versión de datos."""
+        sectores.vacio.return_value = False
+        sectores.tickers.return_value = ["AAPL"]
+        sectores.version.return_value = 1
+        fechas = pd.bdate_range("2020-01-01", periods=300)
+        precios = 100 * np.cumprod(1 + np.random.default_rng(5).normal(0, 0.01, 300))
+        consulta = stock_data.objects.filter.return_value.values
+        consulta.return_value = [
+            {"ticker": ticker, "date": fecha, "close_price": precio}
+            for ticker in ("AAPL", "^GSPC")
+            for fecha, precio in zip(fechas, precios)
+        ]
+
+        calculate_sharpe_ratio("Tecnologia", 1, 1)
+        calculate_sharpe_ratio("Tecnologia", 1, 1)
+        self.assertEqual(consulta.call_count, 1)
+
+        notificar_ingesta(["AAPL"])
+        calculate_sharpe_ratio("Tecnologia", 1, 1)
+        self.assertEqual(consulta.call_count, 2)
@@ -0,0 +1,84 @@
+"""
+Tests unitarios para la matriz de correlación de retornos.
+
+Este módulo verifica que la correlación se calcule sobre los cierres
+almacenados y que solo se descarguen de Yahoo Finance los tickers faltantes.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.correlacion import calcular_correlacion, matriz_correlacion
+from api.utils.yahoo_fetcher import FetchResult
+
+
+def _cierres_locales(tickers, dias=30, semilla=1):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range("2024-01-01", periods=dias, tz="UTC", name="date")
+    datos = {t: 100 * np.cumprod(1 + rng.normal(0, 0.01, dias)) for t in tickers}
+    matriz = pd.DataFrame(datos, index=fechas)
+    matriz.columns.name = "ticker"
+    return matriz
+
+
+class _FetcherFalso:
+    """Fetcher que devuelve historiales sintéticos y registra lo pedido."""
+
+    def __init__(self, historiales):
+        self.historiales = historiales
+        self.pedidos = []
+
+    def history(self, tickers, start=None, end=None):
+        self.pedidos.append(list(tickers))
+        resultado = FetchResult()
+        for ticker in tickers:
+            if ticker in self.historiales:
+                resultado.data[ticker] = self.historiales[ticker]
+            else:
+                resultado.errors[ticker] = "not found"
+        return resultado
+
+
+class TestCorrelacion(SimpleTestCase):
+    """Tests para el servicio de correlación."""
+
+    def test_equivale_a_pandas_sobre_retornos(self):
+        """np.corrcoef sobre retornos alineados coincide con DataFrame.corr."""
+        cierres = _cierres_locales(["AAPL", "MSFT", "TSLA"])
+        cierres.iloc[5, 1] = np.nan
+
+        esperado = cierres.dropna().pct_change().dropna().corr()
+        np.testing.assert_allclose(matriz_correlacion(cierres).to_numpy(), esperado.to_numpy())
+
+    @patch("api.services.correlacion.StockDataRepository.load_price_matrix")
+    def test_todo_local_sin_red(self, load_price_matrix):
+        """Si todos los tickers están en la base, no se consulta Yahoo Finance."""
+        load_price_matrix.return_value = _cierres_locales(["AAPL", "MSFT"])
+        fetcher = _FetcherFalso({})
+
+        resultado = calcular_correlacion(["MSFT", "AAPL"], "2024-01-01", "2024-02-01", fetcher)
+
+        self.assertEqual(fetcher.pedidos, [])
+        self.assertEqual(list(resultado["correlation_matrix"]), ["MSFT", "AAPL"])
+        self.assertAlmostEqual(resultado["correlation_matrix"]["AAPL"]["AAPL"], 1.0)
+        self.assertEqual(resultado["remotos"], [])
+        load_price_matrix.assert_called_once()
+
+    @patch("api.services.correlacion.StockDataRepository.load_price_matrix")
+    def test_solo_descarga_faltantes(self, load_price_matrix):
+        """Los tickers sin datos locales se descargan y se alinean por día."""
+        load_price_matrix.return_value = _cierres_locales(["AAPL"])
+        remoto = _cierres_locales(["QQQ"], semilla=2)["QQQ"]
+        remoto.index = remoto.index.tz_convert(None).tz_localize("America/New_York")
+        fetcher = _FetcherFalso({"QQQ": pd.DataFrame({"Close": remoto})})
+
+        resultado = calcular_correlacion(
+            ["AAPL", "QQQ", "XXXX"], "2024-01-01", "2024-02-01", fetcher
+        )
+
+        self.assertEqual(fetcher.pedidos, [["QQQ", "XXXX"]])
+        self.assertEqual(resultado["remotos"], ["QQQ"])
+        self.assertEqual(resultado["faltantes"], ["XXXX"])
+        self.assertIsNotNone(resultado["correlation_matrix"]["AAPL"]["QQQ"])
@@ -0,0 +1,134 @@
+"""
+Tests unitarios para la detección vectorizada de cruces.
+
+Este módulo verifica que el motor vectorizado de cruces produce exactamente
+los mismos códigos que la implementación original fila por fila.
+"""
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.cruces import (
+    detectar_cruce_puntual,
+    detectar_cruces,
+    detectar_cruces_doble,
+    detectar_cruces_triple,
+)
+from api.services.utils import detectar_cruce
+
+
+def _cruce_doble_original(ema_prev, ema_curr):
+    """Implementación escalar original de ``ema_logic.detectar_cruce`` para dos EMAs."""
+    ema_short_prev, ema_long_prev = ema_prev
+    ema_short_curr, ema_long_curr = ema_curr
+    if ema_short_prev <= ema_long_prev and ema_short_curr > ema_long_curr:
+        return 1
+    elif ema_short_prev >= ema_long_prev and ema_short_curr < ema_long_curr:
+        return 2
+    return 0
+
+
+def _cruce_triple_original(ema4_prev, ema9_prev, ema18_prev, ema4_curr, ema9_curr, ema18_curr):
+    """Implementación escalar original de ``trends.detectar_cruce``."""
+    if (
+        ema4_prev <= ema9_prev
+        and ema4_prev <= ema18_prev
+        and ema4_curr > ema9_curr
+        and ema4_curr > ema18_curr
+    ):
+        return 1
+    elif ema4_prev >= ema9_prev and ema4_prev >= ema18_prev and ema4_curr < ema9_curr:
+        return 2
+    return 0
+
+
+def _datos_sinteticos(n=600, semilla=7):
+    """Genera un DataFrame con EMAs sobre una caminata aleatoria, con NaN iniciales."""
+    rng = np.random.default_rng(semilla)
+    close = pd.Series(100 + rng.normal(0, 1, n).cumsum())
+    data = pd.DataFrame({'close_price': close})
+    for periodo in (4, 9, 18):
+        ema = close.ewm(span=periodo, adjust=False).mean()
+        ema.iloc[: periodo - 1] = np.nan  # Igual que pandas_ta, que no emite valores previos
+        data[f'EMA_{periodo}'] = ema
+    return data
+
+
+class TestCrucesVectorizados(SimpleTestCase):
+    """Tests de equivalencia entre el motor vectorizado y el cálculo fila por fila."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        self.data = _datos_sinteticos()
+
+    def test_triple_equivale_a_apply_original(self):
+        """El cruce triple coincide con el ``apply`` fila por fila original."""
+        data = self.data
+        esperado = data.apply(
+            lambda row: _cruce_triple_original(
+                data['EMA_4'].shift(1)[row.name],
+                data['EMA_9'].shift(1)[row.name],
+                data['EMA_18'].shift(1)[row.name],
+                row['EMA_4'],
+                row['EMA_9'],
+                row['EMA_18'],
+            ),
+            axis=1,
+        )
+
+        resultado = detectar_cruces_triple(data['EMA_4'], data['EMA_9'], data['EMA_18'])
+
+        np.testing.assert_array_equal(resultado, esperado.to_numpy())
+        self.assertTrue((resultado == 1).any())
+        self.assertTrue((resultado == 2).any())
+
+    def test_doble_equivale_a_apply_original(self):
+        """El cruce doble coincide con el ``apply`` fila por fila original."""
+        data = self.data
+        esperado = data.apply(
+            lambda row: _cruce_doble_original(
+                (data['EMA_4'].shift(1)[row.name], data['EMA_18'].shift(1)[row.name]),
+                (row['EMA_4'], row['EMA_18']),
+            ),
+            axis=1,
+        )
+
+        resultado = detectar_cruces_doble(data['EMA_4'], data['EMA_18'])
+
+        np.testing.assert_array_equal(resultado, esperado.to_numpy())
+        self.assertEqual(resultado[0], 0)
+
+    def test_matriz_procesa_cada_columna_por_separado(self):
+        """Con arrays 2D cada columna se evalúa como una serie independiente."""
+        otra = _datos_sinteticos(semilla=11)
+        matriz = [
+            np.column_stack([self.data[col], otra[col]]) for col in ('EMA_4', 'EMA_9', 'EMA_18')
+        ]
+
+        resultado = detectar_cruces(matriz)
+
+        np.testing.assert_array_equal(
+            resultado[:, 0],
+            detectar_cruces_triple(self.data['EMA_4'], self.data['EMA_9'], self.data['EMA_18']),
+        )
+        np.testing.assert_array_equal(
+            resultado[:, 1], detectar_cruces_triple(otra['EMA_4'], otra['EMA_9'], otra['EMA_18'])
+        )
+
+    def test_cruce_puntual_y_utils(self):
+        """Las funciones escalares delegan en el motor vectorizado."""
+        casos = [
+            ((1.0, 2.0, 3.0), (4.0, 2.0, 3.0)),
+            ((4.0, 2.0, 3.0), (1.0, 2.0, 3.0)),
+            ((1.0, 2.0, 3.0), (1.5, 2.0, 3.0)),
+            ((np.nan, 2.0, 3.0), (4.0, 2.0, 3.0)),
+        ]
+        for previo, actual in casos:
+            esperado = _cruce_triple_original(*previo, *actual)
+            self.assertEqual(detectar_cruce_puntual(previo, actual), esperado)
+            self.assertEqual(detectar_cruce(*previo, *actual), esperado)
+
+    def test_cantidad_de_emas_invalida(self):
+        """Se rechaza una cantidad de EMAs distinta de dos o tres."""
+        with self.assertRaises(ValueError):
+            detectar_cruces([np.zeros(3)])
@@ -0,0 +1,143 @@
+"""
+Tests unitarios para el estado incremental de indicadores.
+
+Este módulo verifica que avanzar el estado barra a barra produzca los
+mismos valores que recalcular EMA y RSI sobre toda la historia, y que las
+métricas derivadas coincidan con las funciones de tendencias y señales.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services import indicators
+from api.services.estado_indicadores import (
+    PERIODOS_EMA,
+    avanzar_estado,
+    calcular_rsi,
+    construir_estado,
+    resumen_indicadores,
+)
+from api.services.signals import calculate_signal
+from api.services.trends import calculate_score
+
+
+def _cierres(n=400, semilla=7):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range("2022-01-01", periods=n, tz="UTC")
+    return fechas, 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+
+
+def _rsi_pandas(cierres, periodo=14):
+    """RSI de Wilder como en pandas_ta.rsi (medias ewm con adjust=True)."""
+    cambios = pd.Series(cierres).diff()
+    ganancias = cambios.clip(lower=0).ewm(alpha=1 / periodo, min_periods=periodo).mean()
+    perdidas = (-cambios.clip(upper=0)).ewm(alpha=1 / periodo, min_periods=periodo).mean()
+    return (100 * ganancias / (ganancias + perdidas)).iloc[-1]
+
+
+def _ema_sma(serie, length):
+    """EMA sembrada con la SMA inicial, como pandas_ta.ema."""
+    sembrada = serie.copy()
+    sembrada.iloc[:length - 1] = np.nan
+    sembrada.iloc[length - 1] = serie.iloc[:length].mean()
+    return sembrada.ewm(span=length, adjust=False).mean()
+
+
+def _rsi_serie(serie, length=14):
+    """RSI de Wilder sobre toda la serie, como pandas_ta.rsi."""
+    cambios = serie.diff()
+    ganancias = cambios.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    perdidas = (-cambios.clip(upper=0)).ewm(alpha=1 / length, min_periods=length).mean()
+    return 100 * ganancias / (ganancias + perdidas)
+
+
+_TA_FALSO = SimpleNamespace(ema=_ema_sma, rsi=_rsi_serie)
+
+
+class TestEstadoIndicadores(SimpleTestCase):
+    """Tests para el estado incremental de EMA y RSI."""
+
+    def test_avance_incremental_equivale_al_recalculo(self):
+        """Avanzar barra a barra da los mismos valores que construir con toda la historia."""
+        fechas, cierres = _cierres()
+        estado = construir_estado("AAPL", fechas[:300], cierres[:300])
+        for fecha, cierre in zip(fechas[300:], cierres[300:]):
+            avanzar_estado(estado, fecha, cierre)
+
+        completo = construir_estado("AAPL", fechas, cierres)
+
+        self.assertEqual(estado["bars"], 400)
+        self.assertEqual(estado["last_date"], fechas[-1])
+        for periodo in PERIODOS_EMA:
+            clave = str(periodo)
+            self.assertAlmostEqual(estado["ema"][clave], completo["ema"][clave], places=8)
+            np.testing.assert_allclose(estado["ema_recent"][clave], completo["ema_recent"][clave])
+        self.assertAlmostEqual(estado["rsi_avg_gain"], completo["rsi_avg_gain"], places=10)
+        self.assertAlmostEqual(estado["rsi_weight"], completo["rsi_weight"], places=8)
+
+    def test_ema_y_rsi_coinciden_con_pandas(self):
+        """Los valores coinciden con ewm(adjust=False) y con el RSI de Wilder."""
+        fechas, cierres = _cierres()
+        estado = construir_estado("AAPL", fechas[:1], cierres[:1])
+        for fecha, cierre in zip(fechas[1:], cierres[1:]):
+            avanzar_estado(estado, fecha, cierre)
+
+        serie = pd.Series(cierres)
+        self.assertAlmostEqual(
+            estado["ema"]["200"], serie.ewm(span=200, adjust=False).mean().iloc[-1], places=8
+        )
+        self.assertAlmostEqual(calcular_rsi(estado), _rsi_pandas(cierres), places=8)
+
+    def test_rsi_requiere_periodo_completo(self):
+        """Con menos de 14 variaciones no hay RSI, igual que pandas_ta."""
+        fechas, cierres = _cierres(n=14)
+        self.assertIsNone(calcular_rsi(construir_estado("AAPL", fechas, cierres)))
+
+    def test_resumen_coincide_con_el_calculo_completo(self):
+        """Score y semáforos derivados del estado coinciden con trends y signals."""
+        fechas, cierres = _cierres(n=600, semilla=3)
+        resumen = resumen_indicadores(construir_estado("AAPL", fechas, cierres))
+
+        df = pd.DataFrame({"close_price": cierres})
+        self.assertAlmostEqual(resumen["scoreEma"], calculate_score(df.copy()))
+        self.assertEqual(resumen["emaRapidaSemaforo"], calculate_signal(df.copy(), 9, 21, 3))
+        self.assertEqual(resumen["emaMediaSemaforo"], calculate_signal(df.copy(), 50, 100, 5))
+        self.assertEqual(resumen["emaLentaSemaforo"], calculate_signal(df.copy(), 50, 200, 9))
+        self.assertEqual(len(resumen["tripleEma"]), 5)
+        self.assertIn(resumen["resultadoTriple"], (0, 1, 2))
+
+
+@patch("api.services.trends.ta", _TA_FALSO)
+@patch("api.services.indicators.ta", _TA_FALSO)
+class TestCalculateAnalytics(SimpleTestCase):
+    """Tests para las dos rutas de calculate_analytics."""
+
+    def _serie(self):
+        fechas, cierres = _cierres(n=300, semilla=11)
+        return pd.DataFrame({
+            "date": fechas,
+            "open_price": cierres,
+            "high_price": cierres * 1.01,
+            "low_price": cierres * 0.99,
+            "close_price": cierres,
+        })
+
+    def test_ruta_con_estado_coincide_con_el_calculo_completo(self):
+        """Con el estado al día se obtienen las mismas filas y EMAs que recalculando."""
+        df = self._serie()
+        with patch("api.services.indicators.obtener_indicadores_actuales", return_value=None):
+            completo = indicators.calculate_analytics(df.copy(), "AAPL")
+
+        metricas = ("tendencia219", "scoreEma", "emaRapidaSemaforo",
+                    "emaMediaSemaforo", "emaLentaSemaforo", "tripleEma")
+        resumen = {clave: completo[-1][clave] for clave in metricas}
+        resumen["last_date"] = df["date"].iloc[-1]
+        with patch("api.services.indicators.obtener_indicadores_actuales",
+                   return_value=resumen):
+            rapido = indicators.calculate_analytics(df.copy(), "AAPL")
+
+        self.assertEqual(len(completo), len(df) - 17)
+        self.assertEqual(rapido, completo)
@@ -0,0 +1,79 @@
+"""
+Tests unitarios para los snapshots de datos fundamentales.
+
+Este módulo verifica que ``get_fundamental_data`` lea el último snapshot
+guardado y solo descargue de Yahoo Finance cuando el ticker no tiene ninguno.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.fundamental import actualizar_fundamentales, get_fundamental_data
+from api.utils.yahoo_fetcher import YahooFetcher
+
+
+class _EstadosFalsos:
+    """Transporte que devuelve estados financieros mínimos."""
+
+    def __init__(self, sin_datos=()):
+        self.sin_datos = set(sin_datos)
+        self.llamadas = []
+
+    def statement(self, ticker, kind):
+        self.llamadas.append((ticker, kind))
+        if ticker in self.sin_datos:
+            raise ConnectionError("sin datos")
+        return pd.DataFrame(
+            {pd.Timestamp("2024-12-31"): [100.0, 20.0]},
+            index=["LongTermDebt", "CurrentDebt"],
+        )
+
+
+@patch("api.services.fundamental.FundamentalSnapshotRepository")
+class TestFundamental(SimpleTestCase):
+    """Tests para el servicio de datos fundamentales."""
+
+    def test_lee_el_snapshot_sin_red(self, repositorio):
+        """Con snapshot guardado no se consulta Yahoo Finance."""
+        repositorio.get_latest.return_value = SimpleNamespace(
+            cash_flow='{"a":1}', balance='{"b":2}', income=None,
+            long_term_debt=5.0, current_debt=1.0,
+        )
+        transporte = _EstadosFalsos()
+
+        with patch("api.services.fundamental.yahoo_fetcher", YahooFetcher(transport=transporte)):
+            datos = get_fundamental_data("AAPL")
+
+        self.assertEqual(datos["balance"], '{"b":2}')
+        self.assertEqual(datos["long_term_debt"], 5.0)
+        self.assertEqual(transporte.llamadas, [])
+        repositorio.create.assert_not_called()
+
+    def test_sin_snapshot_descarga_y_guarda(self, repositorio):
+        """Sin snapshot se descarga en el momento y se guarda para la próxima vez."""
+        repositorio.get_latest.return_value = None
+        transporte = _EstadosFalsos()
+
+        fetcher = YahooFetcher(transport=transporte, retries=0)
+        with patch("api.services.fundamental.yahoo_fetcher", fetcher):
+            datos = get_fundamental_data("AAPL")
+
+        self.assertEqual(len(transporte.llamadas), 3)
+        self.assertEqual(datos["long_term_debt"], 100.0)
+        self.assertEqual(datos["current_debt"], 20.0)
+        repositorio.create.assert_called_once_with("AAPL", datos)
+
+    def test_actualizacion_por_lote(self, repositorio):
+        """El job guarda un snapshot por ticker e informa los fallidos."""
+        transporte = _EstadosFalsos(sin_datos={"ZZZZ"})
+
+        fetcher = YahooFetcher(transport=transporte, retries=0)
+        with patch("api.services.fundamental.yahoo_fetcher", fetcher):
+            estados = actualizar_fundamentales(["AAPL", "MSFT", "ZZZZ"])
+
+        self.assertEqual(estados["AAPL"], "ok")
+        self.assertEqual(estados["MSFT"], "ok")
+        self.assertIn("no disponibles", estados["ZZZZ"])
+        self.assertEqual(repositorio.create.call_count, 2)
@@ -0,0 +1,183 @@
+"""
+Tests unitarios para el guardado por lotes de precios.
+
+Este módulo verifica la conversión de una descarga de Yahoo Finance en filas
+de ``StockData`` o en CSV para ``COPY``, que el guardado use un upsert por
+lote y que cada ticker se descargue desde su propia marca de ingesta.
+"""
+from contextlib import nullcontext
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.logica.carga_copy import CargadorCopy, csv_stock_data
+from api.logica.ingesta import (
+    CAMPOS_PRECIOS,
+    INICIO_HISTORIA,
+    agrupar_por_inicio,
+    filas_stock_data,
+    frames_por_ticker,
+    guardar_stock_data,
+    resumen_por_ticker,
+    tuplas_stock_data,
+)
+
+
+def _descarga(n=5, ticker=None):
+    fechas = pd.date_range("2024-03-01", periods=n, tz="UTC")
+    datos = pd.DataFrame({
+        "Open": np.arange(n, dtype=float),
+        "High": np.arange(n, dtype=float) + 2,
+        "Low": np.arange(n, dtype=float) - 1,
+        "Close": np.arange(n, dtype=float) + 1,
+        "Volume": np.arange(n) * 100,
+        "Dividends": 0.0,
+    }, index=fechas)
+    if ticker:
+        datos.columns = pd.MultiIndex.from_product([datos.columns, [ticker]])
+    return datos
+
+
+class TestIngestaStockData(SimpleTestCase):
+    """Tests para filas_stock_data y guardar_stock_data."""
+
+    def test_filas_descarta_dias_incompletos(self):
+        """Cada día completo genera una fila; los que tienen faltantes se descartan."""
+        datos = _descarga()
+        datos.iloc[2, 0] = np.nan
+
+        filas = filas_stock_data("AAPL", datos)
+
+        self.assertEqual(len(filas), 4)
+        self.assertEqual(filas[0].ticker, "AAPL")
+        self.assertEqual(filas[0].date, datos.index[0].to_pydatetime())
+        self.assertEqual([f.close_price for f in filas], [1.0, 2.0, 4.0, 5.0])
+        self.assertEqual(filas[-1].volume, 400)
+        self.assertIsInstance(filas[-1].volume, int)
+
+    def test_filas_con_columnas_multiindex(self):
+        """Las descargas con el ticker como segundo nivel de columnas también se aceptan."""
+        filas = filas_stock_data("KO", _descarga(ticker="KO"))
+        self.assertEqual(len(filas), 5)
+        self.assertEqual(filas_stock_data("KO", pd.DataFrame()), [])
+
+    def test_tuplas_de_bloque_agrupado_por_ticker(self):
+        """Un bloque de varios tickers se convierte de una vez, sin los días incompletos."""
+        datos = pd.concat({"AAPL": _descarga(n=3), "KO": _descarga(n=3)}, axis=1)
+        datos.loc[datos.index[1], ("KO", "Volume")] = np.nan
+
+        tuplas = tuplas_stock_data(["AAPL", "KO"], datos)
+
+        self.assertEqual(len(tuplas), 5)
+        self.assertEqual(sorted(t[0] for t in tuplas), ["AAPL"] * 3 + ["KO"] * 2)
+        self.assertEqual(
+            tuplas[0], ("AAPL", datos.index[0].to_pydatetime(), 0.0, 2.0, -1.0, 1.0, 0)
+        )
+        self.assertIsInstance(tuplas[-1][6], int)
+        self.assertEqual(tuplas_stock_data(["AAPL", "KO"], pd.DataFrame()), [])
+
+    def test_tuplas_coinciden_con_columnas_por_campo(self):
+        """Las descargas con el campo en el primer nivel dan las mismas tuplas."""
+        por_ticker = pd.concat({"AAPL": _descarga(n=3), "KO": _descarga(n=3)}, axis=1)
+        por_campo = por_ticker.swaplevel(axis=1)
+
+        self.assertEqual(
+            sorted(tuplas_stock_data(["AAPL", "KO"], por_campo)),
+            sorted(tuplas_stock_data(["AAPL", "KO"], por_ticker)),
+        )
+
+    @patch("api.logica.ingesta.transaction.atomic", side_effect=nullcontext)
+    @patch(
+        "api.logica.ingesta.StockData.objects.bulk_create",
+        side_effect=lambda filas, **kwargs: filas,
+    )
+    def test_guardar_usa_un_upsert_por_lote(self, mock_bulk_create, _):
+        """Las filas se guardan en lotes de ``chunk_size`` con ON CONFLICT DO UPDATE."""
+        filas = filas_stock_data("AAPL", _descarga(n=7))
+
+        self.assertEqual(guardar_stock_data(filas, chunk_size=3), 7)
+
+        self.assertEqual([len(c.args[0]) for c in mock_bulk_create.call_args_list], [3, 3, 1])
+        kwargs = mock_bulk_create.call_args.kwargs
+        self.assertTrue(kwargs["update_conflicts"])
+        self.assertEqual(kwargs["update_fields"], CAMPOS_PRECIOS)
+        self.assertEqual(kwargs["unique_fields"], ["ticker", "date"])
+
+
+class TestCargaCopy(SimpleTestCase):
+    """Tests para csv_stock_data y CargadorCopy."""
+
+    def test_csv_una_linea_por_dia_completo(self):
+        """Cada día completo genera una línea CSV con fecha y volumen enteros."""
+        datos = _descarga(n=3, ticker="KO")
+        datos.iloc[1, 0] = np.nan
+
+        lineas = csv_stock_data("KO", datos).splitlines()
+
+        self.assertEqual(
+            lineas, ["KO,2024-03-01,0.0,2.0,-1.0,1.0,0", "KO,2024-03-03,2.0,4.0,1.0,3.0,200"]
+        )
+        self.assertEqual(csv_stock_data("KO", pd.DataFrame()), "")
+
+    @patch("api.logica.carga_copy.transaction.atomic", side_effect=nullcontext)
+    @patch("api.logica.carga_copy.connection")
+    def test_cargador_vuelca_por_lotes(self, mock_connection, _):
+        """El buffer se envía con COPY al superar el lote y lo pendiente al salir."""
+        cursor = MagicMock(rowcount=5)
+        mock_connection.cursor.return_value.__enter__.return_value = cursor
+        copy = cursor.copy.return_value.__enter__.return_value
+
+        with CargadorCopy(filas_por_lote=8) as cargador:
+            cargador.agregar("AAPL", _descarga())
+            cursor.copy.assert_not_called()
+            cargador.agregar("MSFT", _descarga())
+            self.assertEqual(cursor.copy.call_count, 1)
+            cargador.agregar("KO", _descarga())
+
+        self.assertEqual(cursor.copy.call_count, 2)
+        self.assertEqual(cargador.guardadas, 10)
+        self.assertEqual(cargador.tickers, {"AAPL", "MSFT", "KO"})
+        self.assertEqual(cargador.resumen["KO"], (date(2024, 3, 5), 5))
+        enviado = "".join(c.args[0] for c in copy.write.call_args_list)
+        self.assertEqual(enviado.count("\n"), 15)
+        merge = cursor.execute.call_args_list[-1].args[0]
+        self.assertIn("ON CONFLICT (ticker, date) DO UPDATE", merge)
+
+
+class TestMarcasIngesta(SimpleTestCase):
+    """Tests para el agrupamiento por marca de ingesta."""
+
+    def test_agrupa_tickers_por_fecha_de_inicio(self):
+        """Cada ticker sigue desde su marca y los que comparten inicio van juntos."""
+        grupos = agrupar_por_inicio(
+            ["AAPL", "MSFT", "NUEVO", "KO", "OTRO"],
+            {"AAPL": date(2024, 3, 1), "MSFT": date(2024, 3, 1), "KO": date(2023, 1, 10)},
+        )
+
+        self.assertEqual(grupos, {
+            INICIO_HISTORIA: ["NUEVO", "OTRO"],
+            date(2023, 1, 11): ["KO"],
+            date(2024, 3, 2): ["AAPL", "MSFT"],
+        })
+        self.assertEqual(list(grupos), sorted(grupos))
+
+    def test_resumen_por_ticker(self):
+        """El resumen tiene la última fecha y la cantidad de filas de cada ticker."""
+        filas = filas_stock_data("AAPL", _descarga(n=4)) + filas_stock_data("KO", _descarga(n=2))
+
+        self.assertEqual(resumen_por_ticker(filas), {
+            "AAPL": (date(2024, 3, 4), 4),
+            "KO": (date(2024, 3, 2), 2),
+        })
+
+    def test_frames_por_ticker(self):
+        """Las descargas agrupadas por ticker se separan; los tickers ausentes se omiten."""
+        datos = pd.concat({"AAPL": _descarga(n=2), "KO": _descarga(n=2)}, axis=1)
+
+        self.assertEqual(
+            [t for t, _ in frames_por_ticker(["AAPL", "KO", "ZM"], datos)], ["AAPL", "KO"]
+        )
+        self.assertEqual([t for t, _ in frames_por_ticker("AAPL", _descarga(n=2))], ["AAPL"])
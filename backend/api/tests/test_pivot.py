@@ -0,0 +1,195 @@
+"""
+Tests unitarios para la detección de pivotes.
+
+Este módulo compara el detector vectorizado con la implementación original
+fila por fila, incluyendo empates, NaN y ventanas asimétricas.
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.pivot import (
+    agrupar_niveles, calcular_pivotes_ticker, calculate_pivots, detectar_pivotes, reducir_velas,
+)
+
+
+def _pivotid_original(df1, vela, n1, n2):
+    """Implementación anterior, aplicada fila por fila."""
+    if vela - n1 < 0 or vela + n2 >= len(df1):
+        return 0
+    pividlow = all(df1.low[vela] <= df1.low[i] for i in range(vela - n1, vela + n2 + 1))
+    pividhigh = all(df1.high[vela] >= df1.high[i] for i in range(vela - n1, vela + n2 + 1))
+    if pividlow and pividhigh:
+        return 3
+    elif pividlow:
+        return 1
+    elif pividhigh:
+        return 2
+    return 0
+
+
+def _velas(n, semilla=3):
+    rng = np.random.default_rng(semilla)
+    # Precios redondeados para forzar empates entre velas
+    cierre = np.round(100 + np.cumsum(rng.normal(0, 1, n)), 0)
+    return pd.DataFrame({
+        'low': cierre - np.round(rng.uniform(0, 2, n), 0),
+        'high': cierre + np.round(rng.uniform(0, 2, n), 0),
+    })
+
+
+class TestDetectarPivotes(SimpleTestCase):
+    """Tests para detectar_pivotes."""
+
+    def test_equivale_a_la_implementacion_original(self):
+        df = _velas(400)
+        df.loc[57, 'low'] = np.nan
+        df.loc[203, 'high'] = np.nan
+
+        for n1, n2 in [(10, 10), (3, 7), (1, 1), (0, 5)]:
+            esperado = [_pivotid_original(df, vela, n1, n2) for vela in range(len(df))]
+            obtenido = detectar_pivotes(df['low'], df['high'], n1, n2)
+            self.assertEqual(obtenido.tolist(), esperado, f"n1={n1}, n2={n2}")
+
+    def test_serie_mas_corta_que_la_ventana(self):
+        self.assertEqual(detectar_pivotes([1.0, 2.0], [2.0, 3.0], 1, 1).tolist(), [0, 0])
+
+    def test_ventana_negativa(self):
+        with self.assertRaises(ValueError):
+            detectar_pivotes([1.0], [1.0], -1, 1)
+
+
+class TestCalculatePivots(SimpleTestCase):
+    """Tests para calculate_pivots."""
+
+    def _stock_data(self, n):
+        velas = _velas(n, semilla=5)
+        inicio = date(2023, 1, 2)
+        return [
+            {
+                'id': i, 'ticker': 'AAPL', 'date': inicio + timedelta(days=i),
+                'open_price': baja + 0.5, 'high_price': alta, 'low_price': baja,
+                'close_price': baja + 0.5, 'volume': 1000,
+            }
+            for i, (baja, alta) in enumerate(zip(velas['low'], velas['high']))
+        ]
+
+    def test_pointpos_segun_tipo_de_pivote(self):
+        resultado = calculate_pivots(self._stock_data(120), n1=3, n2=3)
+
+        self.assertEqual(len(resultado['historical']), 119)
+        self.assertTrue(resultado['data'])
+        for punto in resultado['data']:
+            self.assertIn(punto['type'], ('high', 'low'))
+            self.assertIsInstance(punto['pointpos'], float)
+
+        niveles = resultado['niveles']
+        self.assertTrue(niveles)
+        self.assertEqual(sum(n['touches'] for n in niveles), len(resultado['data']))
+        self.assertEqual([n['price'] for n in niveles], sorted(n['price'] for n in niveles))
+        for nivel in niveles:
+            self.assertGreaterEqual(nivel['touches'], 2)
+            self.assertLessEqual(nivel['first_touch'], nivel['last_touch'])
+
+    def test_sin_pivotes_en_la_ventana(self):
+        """Una serie plana sin ventanas completas no produce niveles."""
+        resultado = calculate_pivots(self._stock_data(5))
+
+        self.assertEqual(resultado['data'], [])
+        self.assertEqual(resultado['niveles'], [])
+        self.assertEqual(resultado['limites'], 0.001)
+
+
+class TestAgruparNiveles(SimpleTestCase):
+    """Tests para agrupar_niveles."""
+
+    def test_barrido_por_tipo_y_precio(self):
+        pivotes = pd.DataFrame({
+            'time': pd.to_datetime([
+                '2024-01-05', '2024-01-02', '2024-01-09', '2024-01-03', '2024-01-07', '2024-01-08',
+            ]),
+            'pointpos': [10.0, 10.4, 10.7, 10.2, 20.0, 30.0],
+            'type': ['low', 'low', 'low', 'high', 'high', 'high'],
+        })
+
+        niveles, en_nivel = agrupar_niveles(pivotes, limites=0.5)
+
+        # 10.0, 10.4 y 10.7 se encadenan; el pivote alto en 10.2 no se mezcla con los bajos
+        self.assertEqual(len(niveles), 1)
+        nivel = niveles.iloc[0]
+        self.assertEqual((nivel['type'], nivel['touches']), ('low', 3))
+        self.assertAlmostEqual(nivel['price'], (10.0 + 10.4 + 10.7) / 3)
+        self.assertEqual(nivel['first_touch'], pd.Timestamp('2024-01-02'))
+        self.assertEqual(nivel['last_touch'], pd.Timestamp('2024-01-09'))
+        self.assertEqual(en_nivel.tolist(), [True, True, True, False, False, False])
+
+    def test_distancia_igual_al_limite_separa(self):
+        pivotes = pd.DataFrame({'time': [1, 2], 'pointpos': [1.0, 1.5], 'type': ['high', 'high']})
+
+        niveles, en_nivel = agrupar_niveles(pivotes, limites=0.5)
+
+        self.assertTrue(niveles.empty)
+        self.assertFalse(en_nivel.any())
+
+    def test_sin_pivotes(self):
+        niveles, en_nivel = agrupar_niveles(
+            pd.DataFrame(columns=['time', 'pointpos', 'type']), limites=1.0
+        )
+
+        self.assertTrue(niveles.empty)
+        self.assertTrue(en_nivel.empty)
+
+
+class TestVentanaDePivotes(SimpleTestCase):
+    """Tests para la lectura acotada y la reducción de velas."""
+
+    def setUp(self):
+        velas = _velas(1000, semilla=7)
+        inicio = date(2020, 1, 1)
+        self.filas = [
+            (
+                inicio + timedelta(days=i), baja + 0.5, alta, baja, baja + 0.5,
+                0 if i % 50 == 0 else 1000,
+            )
+            for i, (baja, alta) in enumerate(zip(velas['low'], velas['high']))
+        ]
+
+    def _recientes(self, ticker, bars, skip_zero_volume=False):
+        filas = [f for f in self.filas if f[-1] != 0] if skip_zero_volume else self.filas
+        return filas[-bars:]
+
+    def test_ventana_equivale_al_historial_completo(self):
+        """Leer lookback + n1 velas da el mismo resultado que leer todo el historial."""
+        completo = [
+            {'id': i, 'ticker': 'AAPL', 'date': f[0], 'open_price': f[1], 'high_price': f[2],
+             'low_price': f[3], 'close_price': f[4], 'volume': f[5]}
+            for i, f in enumerate(self.filas)
+        ]
+        with patch('api.services.pivot.StockDataRepository.get_recent_price_rows',
+                   side_effect=self._recientes) as recientes:
+            for n1, n2, lookback in [(10, 10, 300), (4, 12, 120)]:
+                resultado = calcular_pivotes_ticker('AAPL', n1=n1, n2=n2, lookback=lookback)
+                self.assertEqual(
+                    resultado, calculate_pivots(completo, n1=n1, n2=n2, lookback=lookback)
+                )
+                self.assertEqual(recientes.call_args.args, ('AAPL', lookback + n1))
+
+    def test_reducir_velas_conserva_extremos(self):
+        velas = pd.DataFrame({
+            'time': pd.date_range('2024-01-01', periods=10),
+            'open': np.arange(10.0), 'high': np.arange(10.0) + 5,
+            'low': np.arange(10.0) - 5, 'close': np.arange(10.0) + 0.5,
+        })
+
+        reducidas = reducir_velas(velas, 3)
+
+        self.assertEqual(len(reducidas), 3)
+        self.assertEqual(reducidas['open'].iloc[0], 0.0)
+        self.assertEqual(reducidas['close'].iloc[-1], 9.5)
+        self.assertEqual(reducidas['high'].max(), velas['high'].max())
+        self.assertEqual(reducidas['low'].min(), velas['low'].min())
+        self.assertIs(reducir_velas(velas, None), velas)
+        self.assertIs(reducir_velas(velas, 10), velas)
@@ -0,0 +1,205 @@
+"""
+Tests unitarios para el planificador de ingesta.
+
+Este módulo verifica el limitador de tasa del transporte de Yahoo Finance, el
+lock de ejecución única y que el planificador agrupe los bloques, reintente
+los fallidos y reanude un trabajo interrumpido con un descargador falso en memoria.
+"""
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import call, patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+
+from api.logica.planificador import LOCK_ID, PlanificadorIngesta
+from api.models import IngestionBlock
+from api.utils.yahoo_fetcher import RateLimiter, ingesta_rate_limiter, yahoo_rate_limiter
+
+
+class _DescargadorFalso:
+    """Descargador con la interfaz de ``YFinanceTransport.download`` que puede fallar."""
+
+    def __init__(self, fallos=None):
+        self.fallos = dict(fallos or {})
+        self.llamadas = []
+
+    def download(self, tickers, start=None, end=None):
+        self.llamadas.append((tuple(tickers), start))
+        for ticker in tickers:
+            if self.fallos.get(ticker, 0) > 0:
+                self.fallos[ticker] -= 1
+                raise ConnectionError(f"fallo simulado para {ticker}")
+        fechas = pd.date_range(start, end, inclusive="left")
+        return pd.concat({
+            ticker: pd.DataFrame({
+                "Open": 1.0, "High": 2.0, "Low": 0.5, "Close": 1.5, "Volume": 100,
+                "Dividends": 0.0, "Stock Splits": 0.0,
+            }, index=fechas)
+            for ticker in tickers
+        }, axis=1)
+
+
+class _Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.ahora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+class TestRateLimiter(SimpleTestCase):
+    """Tests para RateLimiter."""
+
+    def test_permite_rafaga_y_luego_espacia_los_pedidos(self):
+        """Los primeros ``burst`` pedidos no esperan; los siguientes respetan la tasa."""
+        reloj = _Reloj()
+        limitador = RateLimiter(rate=2, burst=3, clock=reloj, sleep=reloj.dormir)
+
+        esperas = [limitador.acquire() for _ in range(5)]
+
+        self.assertEqual(esperas[:3], [0.0, 0.0, 0.0])
+        np.testing.assert_allclose(esperas[3:], [0.5, 0.5])
+
+    def test_cobra_un_turno_por_ticker(self):
+        """Un pedido de varios tickers consume un turno por ticker, aunque supere la ráfaga."""
+        reloj = _Reloj()
+        limitador = RateLimiter(rate=2, burst=4, clock=reloj, sleep=reloj.dormir)
+
+        self.assertEqual(limitador.acquire(10), 3.0)  # 6 turnos de deuda a 2 por segundo
+        self.assertEqual(limitador.acquire(), 0.5)
+
+    def test_ingesta_usa_su_propio_limitador(self):
+        """Las descargas del planificador no consumen los turnos de las solicitudes."""
+        limitador = PlanificadorIngesta().transport.rate_limiter
+        self.assertIs(limitador, ingesta_rate_limiter)
+        self.assertIsNot(limitador, yahoo_rate_limiter)
+
+    def test_tasa_cero_desactiva_el_limite(self):
+        """Con tasa cero nunca se espera."""
+        limitador = RateLimiter(rate=0, sleep=lambda s: self.fail("no debería esperar"))
+        self.assertEqual([limitador.acquire() for _ in range(10)], [0.0] * 10)
+
+
+@patch("api.logica.planificador.connection")
+class TestLockDeIngesta(SimpleTestCase):
+    """Tests para el lock de ejecución única del planificador."""
+
+    job = SimpleNamespace(id=1)
+
+    def _run(self, conexion, libre):
+        conexion.vendor = "postgresql"
+        cursor = conexion.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (libre,)
+        planificador = PlanificadorIngesta(transport=_DescargadorFalso())
+        with patch.object(planificador, "trabajo_pendiente", return_value=self.job), \
+                patch.object(planificador, "ejecutar", side_effect=lambda job: job) as ejecutar:
+            return planificador.run(["AAPL"]), ejecutar, cursor
+
+    def test_advisory_lock_en_postgres(self, conexion):
+        """En PostgreSQL la ejecución toma y libera un advisory lock de sesión."""
+        resultado, ejecutar, cursor = self._run(conexion, True)
+        self.assertIs(resultado, self.job)
+        ejecutar.assert_called_once_with(self.job)
+        self.assertEqual(cursor.execute.call_args_list, [
+            call("SELECT pg_try_advisory_lock(%s)", [LOCK_ID]),
+            call("SELECT pg_advisory_unlock(%s)", [LOCK_ID]),
+        ])
+
+    def test_lock_tomado_por_otro_proceso(self, conexion):
+        """Si otro proceso tiene el lock, no se ejecuta ni se libera el lock ajeno."""
+        resultado, ejecutar, cursor = self._run(conexion, False)
+        self.assertIsNone(resultado)
+        ejecutar.assert_not_called()
+        cursor.execute.assert_called_once_with("SELECT pg_try_advisory_lock(%s)", [LOCK_ID])
+
+
+@patch("api.logica.planificador.finalizar_ingesta")
+@patch("api.logica.planificador.IngestionWatermarkRepository")
+@patch("api.logica.planificador.guardar_stock_data", side_effect=len)
+class TestPlanificadorIngesta(TestCase):
+    """Tests para PlanificadorIngesta."""
+
+    def _marcas(self, mock_marcas, ultimas):
+        mock_marcas.inicializar.side_effect = lambda tickers: {
+            t: SimpleNamespace(last_date=ultimas.get(t)) for t in tickers
+        }
+
+    def test_planifica_bloques_por_fecha_de_inicio(self, _, mock_marcas, __):
+        """Los tickers con la misma marca van juntos, en bloques de ``block_size``."""
+        self._marcas(mock_marcas, {
+            "AAPL": date(2024, 3, 1), "MSFT": date(2024, 3, 1), "KO": date(2024, 3, 20),
+        })
+        planificador = PlanificadorIngesta(transport=_DescargadorFalso(), workers=1, block_size=1)
+
+        job = planificador.planificar(["AAPL", "MSFT", "KO", "NUEVO"], end_date=date(2024, 3, 21))
+
+        bloques = [(b.tickers, b.start_date) for b in job.blocks.order_by("start_date", "id")]
+        self.assertEqual(bloques, [
+            (["NUEVO"], date(2015, 1, 1)),
+            (["AAPL"], date(2024, 3, 2)),
+            (["MSFT"], date(2024, 3, 2)),
+        ])  # KO ya está al día
+
+    def test_reintenta_y_reanuda_solo_lo_pendiente(self, mock_guardar, mock_marcas, mock_finalizar):
+        """Un bloque sin reintentos deja el trabajo fallido y se retoma en la próxima ejecución."""
+        self._marcas(mock_marcas, {
+            "AAPL": date(2024, 3, 1), "KO": date(2024, 3, 1), "ZM": date(2024, 3, 5),
+        })
+        descargador = _DescargadorFalso(fallos={"AAPL": 1, "ZM": 5})
+        esperas = []
+        planificador = PlanificadorIngesta(
+            transport=descargador, workers=1, retries=2, backoff=1, block_size=2,
+            sleep=esperas.append,
+        )
+
+        job = planificador.run(["AAPL", "KO", "ZM"], end_date=date(2024, 3, 11))
+
+        self.assertEqual(job.status, "failed")
+        estados = {tuple(b.tickers): (b.status, b.attempts, b.rows) for b in job.blocks.all()}
+        self.assertEqual(estados[("AAPL", "KO")], ("done", 2, 2 * 9))
+        self.assertEqual(estados[("ZM",)][:2], ("failed", 3))
+        self.assertEqual(esperas, [1, 1, 2])
+        mock_finalizar.assert_called_with(["AAPL", "KO"])
+
+        descargador.fallos = {}
+        descargador.llamadas.clear()
+        reanudado = planificador.run(["AAPL", "KO", "ZM"])
+
+        self.assertEqual(reanudado.id, job.id)
+        self.assertEqual(reanudado.status, "done")
+        self.assertEqual(descargador.llamadas, [(("ZM",), date(2024, 3, 6))])
+        self.assertEqual(IngestionBlock.objects.get(job=job, status="done", tickers=["ZM"]).rows, 5)
+
+    def test_bloque_que_siempre_falla_se_abandona(self, mock_guardar, mock_marcas, mock_finalizar):
+        """Un bloque que nunca funciona agota sus intentos y deja de bloquear la ingesta."""
+        self._marcas(mock_marcas, {"AAPL": date(2024, 3, 1), "DLST": date(2023, 6, 1)})
+        descargador = _DescargadorFalso(fallos={"DLST": 1000})
+        planificador = PlanificadorIngesta(
+            transport=descargador, workers=1, retries=1, backoff=0, block_size=1,
+            max_attempts=3, sleep=lambda s: None,
+        )
+
+        primero = planificador.run(["AAPL", "DLST"], end_date=date(2024, 3, 11))
+        self.assertEqual(primero.status, "failed")
+        self.assertEqual(IngestionBlock.objects.get(job=primero, tickers=["DLST"]).status, "failed")
+
+        # La segunda ejecución reanuda el trabajo y le queda un solo intento al bloque
+        reanudado = planificador.run(["AAPL", "DLST"])
+        bloque = IngestionBlock.objects.get(job=primero, tickers=["DLST"])
+        self.assertEqual(reanudado.id, primero.id)
+        self.assertEqual((bloque.status, bloque.attempts), ("abandoned", 3))
+        self.assertEqual(reanudado.status, "done")
+
+        # Con el trabajo cerrado, la siguiente ejecución planifica uno nuevo hasta el nuevo fin
+        self._marcas(mock_marcas, {"AAPL": date(2024, 3, 10), "DLST": date(2023, 6, 1)})
+        descargador.llamadas.clear()
+        nuevo = planificador.run(["AAPL", "DLST"], end_date=date(2024, 3, 13))
+        self.assertNotEqual(nuevo.id, primero.id)
+        self.assertIn((("AAPL",), date(2024, 3, 11)), descargador.llamadas)
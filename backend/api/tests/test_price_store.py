@@ -0,0 +1,133 @@
+"""
+Tests unitarios para el almacén columnar de precios.
+
+Este módulo verifica la carga, el refresco incremental y la política
+de descarte por memoria de PriceStore sin acceder a la base de datos.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from api.cache.versions import incrementar_versiones
+from api.repositories.price_store import PriceStore
+
+
+class _FuenteFalsa:
+    """Fuente de filas en memoria que registra las consultas recibidas."""
+
+    def __init__(self):
+        self.filas = {}
+        self.consultas = []
+
+    def agregar(self, ticker, dias, inicio=datetime(2024, 1, 1, tzinfo=timezone.utc), base=100.0):
+        filas = self.filas.setdefault(ticker, [])
+        for i in range(dias):
+            fecha = inicio + timedelta(days=i)
+            precio = base + i
+            filas.append((fecha, precio, precio + 1, precio - 1, precio + 0.5, 1000 + i))
+
+    def __call__(self, ticker, since, fields):
+        self.consultas.append((ticker, since))
+        filas = self.filas.get(ticker, [])
+        if since is not None:
+            filas = [f for f in filas if f[0] > since]
+        return list(filas)
+
+
+class TestPriceStore(SimpleTestCase):
+    """Tests para PriceStore."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        self.fuente = _FuenteFalsa()
+        self.fuente.agregar('AAPL', 10)
+        self.store = PriceStore(max_bytes=10 ** 6, refresh_interval=0, fetch_rows=self.fuente)
+
+    def test_get_frame_devuelve_columnas_del_orm(self):
+        """El DataFrame tiene las mismas columnas que una lectura vía ORM."""
+        df = self.store.get_frame('AAPL')
+        self.assertEqual(
+            list(df.columns),
+            ['date', 'open_price', 'high_price', 'low_price', 'close_price', 'volume'],
+        )
+        self.assertEqual(len(df), 10)
+        self.assertEqual(df['close_price'].dtype, np.float64)
+        self.assertEqual(df['close_price'].iloc[-1], 109.5)
+
+    def test_ventana_inclusiva(self):
+        """Los extremos de la ventana son inclusivos y aceptan fechas sin zona horaria."""
+        df = self.store.get_frame(
+            'AAPL', '2024-01-03', datetime(2024, 1, 5), fields=['close_price']
+        )
+        self.assertEqual(list(df.columns), ['date', 'close_price'])
+        self.assertEqual(df['close_price'].tolist(), [102.5, 103.5, 104.5])
+
+    def test_refresco_incremental(self):
+        """Solo se consultan las filas posteriores a la última fecha en memoria."""
+        self.store.get_frame('AAPL')
+        self.fuente.agregar('AAPL', 2, inicio=datetime(2024, 1, 11, tzinfo=timezone.utc), base=200)
+
+        df = self.store.get_frame('AAPL')
+
+        self.assertEqual(len(df), 12)
+        self.assertEqual(self.fuente.consultas[0], ('AAPL', None))
+        self.assertEqual(self.fuente.consultas[1][1], datetime(2024, 1, 10, tzinfo=timezone.utc))
+
+    def test_sin_refresco_dentro_del_intervalo(self):
+        """Dentro del intervalo de refresco no se consulta la fuente."""
+        store = PriceStore(max_bytes=10 ** 6, refresh_interval=3600, fetch_rows=self.fuente)
+        store.get_frame('AAPL')
+        store.get_frame('AAPL')
+        self.assertEqual(len(self.fuente.consultas), 1)
+
+    def test_ingesta_de_otro_proceso_recarga_la_serie(self):
+        """Un cambio de versión en la caché compartida recarga la serie antes del intervalo."""
+        cache.clear()
+        store = PriceStore(max_bytes=10 ** 6, refresh_interval=3600, fetch_rows=self.fuente)
+        self.assertEqual(store.get_frame('AAPL')['close_price'].iloc[-1], 109.5)
+
+        # Otro proceso reescribe el último día y agrega uno nuevo
+        self.fuente.filas['AAPL'][-1] = self.fuente.filas['AAPL'][-1][:4] + (200.0, 1000)
+        self.fuente.agregar(
+            'AAPL', 1, inicio=datetime(2024, 1, 11, tzinfo=timezone.utc), base=110.0
+        )
+        self.assertEqual(len(store.get_frame('AAPL')), 10)
+
+        incrementar_versiones(['AAPL'])
+        df = store.get_frame('AAPL')
+
+        self.assertEqual(len(df), 11)
+        self.assertEqual(df['close_price'].iloc[-2], 200.0)
+        self.assertEqual(self.fuente.consultas[-1], ('AAPL', None))
+
+    def test_frame_es_una_copia(self):
+        """Modificar el DataFrame devuelto no altera la caché."""
+        df = self.store.get_frame('AAPL')
+        df['close_price'] = 0.0
+        self.assertEqual(self.store.get_frame('AAPL')['close_price'].iloc[0], 100.5)
+
+    def test_ticker_sin_datos(self):
+        """Un ticker sin datos devuelve un DataFrame vacío."""
+        df = self.store.get_frame('ZZZZ', fields=['close_price'])
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ['date', 'close_price'])
+
+    def test_descarte_lru_por_memoria(self):
+        """Al superar el presupuesto se descarta el ticker usado hace más tiempo."""
+        for ticker in ('MSFT', 'TSLA'):
+            self.fuente.agregar(ticker, 10)
+        self.store.get_frame('AAPL')
+        por_ticker = self.store.nbytes
+        store = PriceStore(max_bytes=2 * por_ticker, refresh_interval=0, fetch_rows=self.fuente)
+
+        store.get_frame('AAPL')
+        store.get_frame('MSFT')
+        store.get_frame('AAPL')
+        store.get_frame('TSLA')
+
+        self.assertIn('AAPL', store)
+        self.assertIn('TSLA', store)
+        self.assertNotIn('MSFT', store)
+        self.assertLessEqual(store.nbytes, 2 * por_ticker)
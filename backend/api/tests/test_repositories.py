@@ -5,12 +5,17 @@ Este módulo contiene tests unitarios para los repositorios de la aplicación,
 verificando su funcionamiento correcto.
 """
 import pytest
-from django.test import TestCase
+from unittest.mock import patch
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
 from django.utils import timezone
-from datetime import timedelta, date
+from datetime import timedelta, date, datetime
 
-from api.models import Activo, StockData
+import pandas as pd
+
+from api.models import Activo, IngestionWatermark, StockData
 from api.repositories.activo_repository import ActivoRepository, StockDataRepository
+from api.repositories.watermark_repository import IngestionWatermarkRepository
 
 
 class TestActivoRepository(TestCase):
@@ -222,3 +227,97 @@ class TestStockDataRepository(TestCase):
         
         # Verificar que se guardaron en la base de datos
         self.assertEqual(StockData.objects.filter(ticker="AMZN").count(), 3)
+
+
+class TestLoadPriceMatrix(SimpleTestCase):
+    """Tests para StockDataRepository.load_price_matrix."""
+
+    def setUp(self):
+        """Configuración inicial para los tests."""
+        base = datetime(2024, 1, 1)
+        self.rows = [
+            ("AAPL", base, 150.0, 151.0),
+            ("MSFT", base, 300.0, 301.0),
+            ("AAPL", base + timedelta(days=1), 152.0, 153.0),
+            ("MSFT", base + timedelta(days=2), 305.0, None),
+        ]
+
+    def _load(self, tickers, fields):
+        with patch('api.repositories.activo_repository.StockData') as mock_model:
+            query = mock_model.objects.filter.return_value
+            width = 2 + len(fields or ['close_price'])
+            query.order_by.return_value.values_list.return_value = [r[:width] for r in self.rows]
+            result = StockDataRepository.load_price_matrix(tickers, fields=fields)
+        return result, mock_model
+
+    def test_single_query_for_all_tickers(self):
+        """Se emite una única consulta ticker__in para todo el universo."""
+        _, mock_model = self._load(["AAPL", "MSFT", "TSLA"], None)
+        mock_model.objects.filter.assert_called_once_with(ticker__in=["AAPL", "MSFT", "TSLA"])
+        values_list = mock_model.objects.filter.return_value.order_by.return_value.values_list
+        values_list.assert_called_once_with('ticker', 'date', 'close_price')
+
+    def test_matrix_aligned_by_date(self):
+        """Con un campo devuelve una matriz fecha x ticker alineada."""
+        result, _ = self._load(["MSFT", "AAPL", "TSLA"], ['open_price'])
+        self.assertEqual(list(result.columns), ["MSFT", "AAPL"])
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result["AAPL"].tolist()[:2], [150.0, 152.0])
+        self.assertTrue(pd.isna(result["AAPL"].iloc[2]))
+
+    def test_multiple_fields(self):
+        """Con varios campos las columnas son un MultiIndex (campo, ticker)."""
+        result, _ = self._load(["AAPL", "MSFT"], ['open_price', 'close_price'])
+        self.assertEqual(result[('close_price', 'MSFT')].iloc[0], 301.0)
+        self.assertTrue(pd.isna(result[('close_price', 'MSFT')].iloc[2]))
+        self.assertEqual(list(result.xs("AAPL", axis=1, level='ticker').columns),
+                         ['open_price', 'close_price'])
+
+    def test_empty_result(self):
+        """Sin filas devuelve un DataFrame vacío."""
+        self.rows = []
+        result, _ = self._load(["AAPL"], None)
+        self.assertTrue(result.empty)
+
+    def test_chunks_give_the_same_matrix(self):
+        """Pivotear por bloques, con una fecha partida entre dos, da la misma matriz."""
+        fields = ['open_price', 'close_price']
+        expected, _ = self._load(["AAPL", "MSFT"], fields)
+        with patch.object(StockDataRepository, 'SERVER_CURSOR_CHUNK_SIZE', 1):
+            result, _ = self._load(["AAPL", "MSFT"], fields)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+class TestIngestionWatermarkRepository(TestCase):
+    """Tests para IngestionWatermarkRepository."""
+
+    @classmethod
+    def setUpClass(cls):
+        # StockData no es administrado por Django: la base de tests no tiene la tabla
+        with connection.schema_editor() as editor:
+            editor.create_model(StockData)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(StockData)
+
+    def _guardar(self, dias):
+        for dia in dias:
+            StockData.objects.update_or_create(
+                ticker="AAPL", date=timezone.make_aware(datetime.combine(dia, datetime.min.time())),
+                defaults=dict(close_price=1.0, volume=1),
+            )
+        return {"AAPL": (max(dias), len(dias))}
+
+    def test_filas_reescritas_no_se_cuentan_dos_veces(self):
+        """row_count refleja las filas de StockData, no las filas guardadas en cada ingesta."""
+        IngestionWatermarkRepository.registrar(self._guardar([date(2024, 3, 1), date(2024, 3, 4)]))
+        # La siguiente descarga vuelve a escribir el último día y agrega uno nuevo
+        IngestionWatermarkRepository.registrar(self._guardar([date(2024, 3, 4), date(2024, 3, 5)]))
+
+        marca = IngestionWatermark.objects.get(ticker="AAPL")
+        self.assertEqual(marca.row_count, 3)
+        self.assertEqual(marca.last_date, date(2024, 3, 5))
@@ -0,0 +1,118 @@
+"""
+Tests unitarios para los retornos mensuales.
+
+Este módulo verifica que la grilla año x mes calculada con arrays coincida
+con el cálculo anterior (resample, pivot y recorrido por celda) y que los
+cierres del agregado mensual se completen desde los precios diarios, y que
+la ingesta pueda refrescar los agregados continuos.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.repositories.agregados_repository import AgregadosRepository
+from api.services.retornos_mensuales import (
+    calcular_retornos_mensuales,
+    calcular_retornos_mensuales_tickers,
+)
+
+
+def _diarios(tickers, inicio="2021-03-15", dias=700, semilla=3):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.bdate_range(inicio, periods=dias, tz="UTC")
+    datos = {t: 100 * np.cumprod(1 + rng.normal(0, 0.02, dias)) for t in tickers}
+    return pd.DataFrame(datos, index=fechas)
+
+
+def _grilla_anterior(cierres):
+    """Cálculo anterior de calcular_retornos_mensuales sobre la serie diaria de un ticker."""
+    df = cierres.rename("close_price").to_frame()
+    monthly_returns = df["close_price"].resample("M").ffill().pct_change()
+    monthly_returns = monthly_returns.to_frame().reset_index()
+    monthly_returns["Year"] = monthly_returns["date"].dt.year
+    monthly_returns["Month"] = monthly_returns["date"].dt.month
+    pivot_table = monthly_returns.pivot_table(values="close_price", index="Year", columns="Month")
+    return [
+        {
+            "year": year,
+            "month": month,
+            "return": (
+                pivot_table.loc[year, month] if pd.notna(pivot_table.loc[year, month]) else None
+            ),
+        }
+        for year in pivot_table.index for month in pivot_table.columns
+    ]
+
+
+@patch("api.services.retornos_mensuales.AgregadosRepository.load_closes", return_value=None)
+@patch("api.services.retornos_mensuales.StockDataRepository.load_price_matrix")
+class TestRetornosMensuales(SimpleTestCase):
+    """Tests para calcular_retornos_mensuales."""
+
+    def _comparar(self, obtenido, esperado):
+        self.assertEqual(
+            [(c["year"], c["month"]) for c in obtenido],
+            [(c["year"], c["month"]) for c in esperado],
+        )
+        for o, e in zip(obtenido, esperado):
+            if e["return"] is None:
+                self.assertIsNone(o["return"])
+            else:
+                self.assertAlmostEqual(o["return"], e["return"], places=12)
+
+    def test_coincide_con_el_calculo_anterior(self, mock_matrix, _):
+        """Sin agregado, la grilla desde los cierres diarios es la misma que antes."""
+        diarios = _diarios(["AAPL"])
+        diarios.index.name = "date"
+        # Un mes completo sin datos conserva el cierre anterior
+        diarios = diarios[(diarios.index < "2022-05-01") | (diarios.index >= "2022-06-01")]
+        mock_matrix.return_value = diarios
+
+        self._comparar(calcular_retornos_mensuales("AAPL", 10), _grilla_anterior(diarios["AAPL"]))
+
+    def test_varios_tickers_y_agregado_parcial(self, mock_matrix, mock_closes):
+        """Los tickers del agregado no se leen de StockData; el resto sí."""
+        diarios = _diarios(["AAPL", "KO"])
+        meses = diarios.index.tz_convert(None).to_period("M")
+        mensuales = diarios.groupby(meses).last()
+        mensuales.index = mensuales.index.to_timestamp()
+        mock_closes.return_value = mensuales[["AAPL"]]
+        mock_matrix.return_value = diarios[["KO"]]
+
+        resultado = calcular_retornos_mensuales_tickers(["AAPL", "KO", "ZM"], 10)
+
+        mock_matrix.assert_called_once()
+        self.assertEqual(mock_matrix.call_args.args[0], ["KO", "ZM"])
+        self.assertEqual(set(resultado), {"AAPL", "KO"})
+        for ticker in ("AAPL", "KO"):
+            self._comparar(resultado[ticker], _grilla_anterior(diarios[ticker].rename_axis("date")))
+
+    def test_sin_datos(self, mock_matrix, _):
+        """Sin datos se devuelve None, como antes."""
+        mock_matrix.return_value = pd.DataFrame(dtype="float64")
+        self.assertIsNone(calcular_retornos_mensuales("ZM", 10))
+
+
+@patch("api.repositories.agregados_repository.connection")
+class TestRefrescarAgregados(SimpleTestCase):
+    """Tests para AgregadosRepository.refrescar."""
+
+    def test_refresca_las_vistas_disponibles(self, conexion):
+        """Cada vista disponible se materializa con la ventana completa."""
+        conexion.in_atomic_block = False
+        cursor = conexion.cursor.return_value.__enter__.return_value
+        disponibles = {"stockdata_monthly": True, "stockdata_weekly": False}
+        with patch.object(AgregadosRepository, "disponible", side_effect=disponibles.get):
+            self.assertEqual(AgregadosRepository.refrescar(), ["stockdata_monthly"])
+        cursor.execute.assert_called_once_with(
+            "CALL refresh_continuous_aggregate(%s, NULL, NULL)", ["stockdata_monthly"]
+        )
+
+    def test_no_refresca_dentro_de_una_transaccion(self, conexion):
+        """Dentro de una transacción no se intenta el refresco."""
+        conexion.in_atomic_block = True
+        with patch.object(AgregadosRepository, "disponible", return_value=True):
+            self.assertEqual(AgregadosRepository.refrescar(), [])
+        conexion.cursor.assert_not_called()
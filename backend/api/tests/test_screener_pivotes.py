@@ -0,0 +1,86 @@
+"""
+Tests unitarios para el screener de soportes y resistencias.
+
+Este módulo verifica que los niveles por ticker coincidan con los de
+``calculate_pivots`` y que el pool de procesos dé el mismo resultado que
+el cálculo en el proceso actual.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.pivot import calculate_pivots
+from api.services.screener_pivotes import escanear_niveles, niveles_de_bloque, velas_de_bloque
+
+
+def _matriz(tickers, dias=400, semilla=11):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range('2023-01-02', periods=dias, tz='UTC', name='date')
+    campos = {}
+    for i, ticker in enumerate(tickers):
+        cierre = np.round(50 + 10 * i + np.cumsum(rng.normal(0, 1, dias)), 1)
+        campos[('open_price', ticker)] = cierre
+        campos[('high_price', ticker)] = cierre + np.round(rng.uniform(0, 2, dias), 1)
+        campos[('low_price', ticker)] = cierre - np.round(rng.uniform(0, 2, dias), 1)
+        campos[('close_price', ticker)] = cierre
+        campos[('volume', ticker)] = np.full(dias, 1000.0)
+    matriz = pd.DataFrame(campos, index=fechas)
+    matriz.columns.names = [None, 'ticker']
+    return matriz
+
+
+class TestScreenerPivotes(SimpleTestCase):
+    """Tests para el screener de niveles."""
+
+    def setUp(self):
+        self.matriz = _matriz(['AAPL', 'MSFT'])
+        # MSFT empieza más tarde: sus primeras fechas quedan en NaN en la matriz
+        self.matriz.loc[self.matriz.index[:150], (slice(None), 'MSFT')] = np.nan
+
+    def _velas(self, tickers, barras):
+        with patch('api.services.screener_pivotes.StockDataRepository.load_price_matrix',
+                   return_value=self.matriz[[c for c in self.matriz.columns if c[1] in tickers]]):
+            return velas_de_bloque(tickers, barras)
+
+    def test_velas_alineadas_por_ticker(self):
+        velas = self._velas(['AAPL', 'MSFT'], 310)
+
+        self.assertEqual(len(velas['AAPL']), 310)
+        self.assertEqual(len(velas['MSFT']), 250)
+        self.assertFalse(velas['MSFT'].isna().any().any())
+        self.assertEqual(velas['AAPL']['time'].iloc[-1], self.matriz.index[-1])
+
+    def test_niveles_coinciden_con_calculate_pivots(self):
+        velas = self._velas(['AAPL'], 310)
+
+        registros = niveles_de_bloque(velas, 10, 10, 300)
+        esperado = calculate_pivots(velas['AAPL'], n1=10, n2=10, lookback=300)['niveles']
+
+        self.assertEqual([(r['type'], r['price'], r['touches']) for r in registros],
+                         [(n['type'], n['price'], n['touches']) for n in esperado])
+        cierre = self.matriz[('close_price', 'AAPL')].iloc[-1]
+        for registro in registros:
+            self.assertEqual(registro['last_close'], cierre)
+            self.assertAlmostEqual(
+                registro['distance_pct'], abs(cierre - registro['price']) / cierre * 100
+            )
+
+    @patch('api.services.screener_pivotes.PivotLevelRepository.replace')
+    def test_pool_equivale_al_calculo_local(self, replace):
+        replace.side_effect = lambda levels, tickers=None: len(levels)
+
+        with patch('api.services.screener_pivotes.velas_de_bloque', side_effect=self._velas):
+            local = escanear_niveles(['AAPL', 'MSFT'], workers=1)
+            niveles_local = replace.call_args.args[0]
+            pool = escanear_niveles(['AAPL', 'MSFT'], workers=2)
+            niveles_pool = replace.call_args.args[0]
+
+        self.assertEqual(local['niveles'], pool['niveles'])
+        self.assertGreater(local['niveles'], 0)
+        self.assertEqual(replace.call_args.kwargs, {'tickers': ['AAPL', 'MSFT']})
+        self.assertEqual(
+            [(n.ticker, n.type, n.price) for n in niveles_local],
+            [(n.ticker, n.type, n.price) for n in niveles_pool],
+        )
@@ -0,0 +1,94 @@
+"""
+Tests unitarios para la composición sectorial local.
+
+Este módulo verifica la normalización de constituyentes y que el índice en
+memoria se recargue solo cuando cambia la versión de sectores.
+"""
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.services.sectores import SectorIndex, normalizar_constituyentes
+
+
+class TestNormalizarConstituyentes(SimpleTestCase):
+    """Tests para la lectura de tablas de constituyentes."""
+
+    def test_columnas_de_wikipedia(self):
+        """Las columnas GICS se renombran y los puntos pasan a guiones."""
+        tabla = pd.DataFrame({
+            'Symbol': ['AAPL', 'BRK.B', None],
+            'Security': ['Apple', 'Berkshire', 'Sin ticker'],
+            'GICS Sector': ['Information Technology', 'Financials', 'Energy'],
+            'GICS Sub-Industry': ['Hardware', 'Insurance', 'Oil'],
+        })
+
+        resultado = normalizar_constituyentes(tabla)
+
+        self.assertEqual(list(resultado.columns), ['ticker', 'sector', 'sub_industry'])
+        self.assertEqual(resultado['ticker'].tolist(), ['AAPL', 'BRK-B'])
+        self.assertEqual(resultado['sub_industry'].tolist(), ['Hardware', 'Insurance'])
+
+    def test_csv_propio_sin_subindustria(self):
+        """Un CSV con ticker y sector alcanza; la sub-industria queda vacía."""
+        tabla = pd.DataFrame({'ticker': ['XOM', 'XOM'], 'sector': ['Energy', ' Energy ']})
+
+        resultado = normalizar_constituyentes(tabla)
+
+        self.assertEqual(
+            resultado.to_dict('records'),
+            [{'ticker': 'XOM', 'sector': 'Energy', 'sub_industry': ''}],
+        )
+
+    def test_falta_sector(self):
+        with self.assertRaises(ValueError):
+            normalizar_constituyentes(pd.DataFrame({'Symbol': ['AAPL']}))
+
+
+class TestSectorIndex(SimpleTestCase):
+    """Tests para el índice sector -> tickers."""
+
+    def setUp(self):
+        self.lecturas = 0
+        self.pares = [
+            ('AAPL', 'Information Technology'),
+            ('MSFT', 'Information Technology'),
+            ('XOM', 'Energy'),
+        ]
+
+    def _loader(self):
+        self.lecturas += 1
+        return list(self.pares)
+
+    @patch('api.services.sectores.obtener_versiones')
+    def test_consulta_sin_distinguir_mayusculas(self, obtener_versiones):
+        obtener_versiones.return_value = {'__sectors__': 1}
+        indice = SectorIndex(loader=self._loader)
+
+        self.assertEqual(indice.tickers('information technology'), ['AAPL', 'MSFT'])
+        self.assertEqual(indice.tickers('Energy '), ['XOM'])
+        self.assertEqual(indice.tickers('Utilities'), [])
+        self.assertFalse(indice.vacio())
+        self.assertEqual(self.lecturas, 1)
+
+    @patch('api.services.sectores.obtener_versiones')
+    def test_recarga_al_cambiar_version(self, obtener_versiones):
+        """Una nueva carga (otra versión) se refleja sin reiniciar el proceso."""
+        obtener_versiones.return_value = {'__sectors__': 1}
+        indice = SectorIndex(loader=self._loader)
+        indice.tickers('Energy')
+
+        self.pares.append(('CVX', 'Energy'))
+        self.assertEqual(indice.tickers('Energy'), ['XOM'])
+
+        obtener_versiones.return_value = {'__sectors__': 2}
+        self.assertEqual(indice.tickers('Energy'), ['XOM', 'CVX'])
+        self.assertEqual(self.lecturas, 2)
+
+    @patch('api.services.sectores.obtener_versiones')
+    def test_vacio_sin_carga(self, obtener_versiones):
+        obtener_versiones.return_value = {'__sectors__': 1}
+        self.pares = []
+
+        self.assertTrue(SectorIndex(loader=self._loader).vacio())
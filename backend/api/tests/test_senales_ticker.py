@@ -0,0 +1,86 @@
+"""
+Tests unitarios para la tabla materializada de señales por ticker.
+
+Este módulo verifica que el recálculo en lote coincida con el resumen de
+cada ticker y que el listado de la cartera lea la tabla con una sola consulta.
+"""
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.models import TickerSignals
+from api.services.activo_service import ActivoService
+from api.services.estado_indicadores import construir_estado, resumen_indicadores
+from api.services.senales_ticker import refrescar_senales
+
+
+def _estado(ticker, semilla, n=300):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range("2022-01-01", periods=n, tz="UTC")
+    return construir_estado(ticker, fechas, 100 * np.cumprod(1 + rng.normal(0, 0.02, n)))
+
+
+class TestRefrescarSenales(SimpleTestCase):
+    """Tests para refrescar_senales."""
+
+    @patch("api.services.senales_ticker.TickerSignalsRepository.upsert", side_effect=len)
+    @patch("api.services.senales_ticker.IndicatorStateRepository.get_many")
+    def test_lote_coincide_con_resumen_por_ticker(self, mock_get_many, mock_upsert):
+        """Cada fila del lote tiene las mismas métricas que el resumen individual."""
+        estados = {f"T{i}": _estado(f"T{i}", i) for i in range(20)}
+        estados["NUEVO"] = _estado("NUEVO", 99, n=5)  # sin RSI definido
+        mock_get_many.return_value = estados
+
+        self.assertEqual(refrescar_senales(["T0"]), 21)
+        mock_get_many.assert_called_once_with(["T0"])
+
+        for signals in mock_upsert.call_args.args[0]:
+            resumen = resumen_indicadores(estados[signals.ticker])
+            self.assertEqual(signals.date, resumen["last_date"])
+            self.assertAlmostEqual(signals.precio, resumen["precio"])
+            self.assertEqual(signals.resultado_triple, resumen["resultadoTriple"])
+            self.assertAlmostEqual(signals.score_ema, resumen["scoreEma"])
+            self.assertEqual(signals.tendencia219, resumen["tendencia219"])
+            self.assertEqual(signals.ema_rapida_semaforo, resumen["emaRapidaSemaforo"])
+            self.assertEqual(signals.ema_media_semaforo, resumen["emaMediaSemaforo"])
+            self.assertEqual(signals.ema_lenta_semaforo, resumen["emaLentaSemaforo"])
+            if resumen["rsi"] is None:
+                self.assertIsNone(signals.rsi)
+            else:
+                self.assertAlmostEqual(signals.rsi, resumen["rsi"])
+
+    @patch("api.services.senales_ticker.TickerSignalsRepository.upsert")
+    @patch("api.services.senales_ticker.IndicatorStateRepository.get_many", return_value={})
+    def test_sin_estados_no_guarda(self, mock_get_many, mock_upsert):
+        """Sin estados de indicadores no se escribe la tabla."""
+        self.assertEqual(refrescar_senales(), 0)
+        mock_get_many.assert_called_once_with(None)
+        mock_upsert.assert_not_called()
+
+
+class TestProcessActivos(SimpleTestCase):
+    """Tests para ActivoService.process_activos."""
+
+    @patch("api.services.activo_service.ActivoService.process_activo")
+    @patch("api.services.activo_service.TickerSignalsRepository.get_many")
+    def test_lee_tabla_y_recalcula_faltantes(self, mock_get_many, mock_process):
+        """Los tickers de la tabla no se recalculan; los faltantes sí."""
+        mock_get_many.return_value = {
+            "AAPL": TickerSignals(ticker="AAPL", precio=160.0, resultado_triple=1, rsi=55.5),
+        }
+        mock_process.return_value = {"precioActual": 210.0, "recomendacion": "{}"}
+        activos = [SimpleNamespace(id=1, ticker="AAPL"), SimpleNamespace(id=2, ticker="MSFT")]
+
+        resultado = ActivoService().process_activos(activos)
+
+        mock_get_many.assert_called_once_with({"AAPL", "MSFT"})
+        mock_process.assert_called_once_with(activos[1])
+        self.assertEqual(resultado[1]["precioActual"], 160.0)
+        self.assertEqual(
+            json.loads(resultado[1]["recomendacion"]), {"resultadoTriple": 1, "rsi": 55.5}
+        )
+        self.assertEqual(resultado[2]["precioActual"], 210.0)
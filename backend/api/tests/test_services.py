@@ -169,15 +169,17 @@ class TestActivoService(TestCase):
             # Simular que no hay datos en caché
             mock_cache.get.return_value = None
             
-            # Mockear dataframe_from_historical_data
-            with patch('api.services.activo_service.dataframe_from_historical_data') as mock_df:
+            # Sin estado de indicadores: se calcula desde el almacén de precios
+            with patch('api.services.activo_service.obtener_indicadores_actuales',
+                       return_value=None), \
+                    patch('api.services.activo_service.price_store') as mock_store:
                 # Crear un DataFrame ficticio
                 import pandas as pd
                 df = pd.DataFrame({
                     'date': [today - timedelta(days=i) for i in range(10)],
                     'close_price': [152.0 + i for i in range(10)]
                 })
-                mock_df.return_value = df
+                mock_store.get_frame.return_value = df
                 
                 # Mockear calculate_triple_ema y evaluar_cruce
                 with patch('api.services.activo_service.calculate_triple_ema') as mock_triple:
@@ -0,0 +1,159 @@
+"""
+Tests unitarios para la descarga concurrente de Yahoo Finance.
+
+Este módulo verifica la concurrencia, el plazo por solicitud, los reintentos
+y los resultados parciales de YahooFetcher con un transporte falso en memoria.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.utils.yahoo_fetcher import (
+    RateLimiter,
+    YahooFetcher,
+    YFinanceTransport,
+    _download_lock,
+)
+
+
+class _YahooFalso:
+    """Transporte falso que simula latencia, fallos y tickers lentos."""
+
+    def __init__(self, latencia=0.05, fallos=None, lentos=()):
+        self.latencia = latencia
+        self.fallos = dict(fallos or {})
+        self.lentos = set(lentos)
+        self.llamadas = []
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._lock = threading.Lock()
+
+    def _atender(self, ticker):
+        with self._lock:
+            self.llamadas.append(ticker)
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+        try:
+            time.sleep(2 if ticker in self.lentos else self.latencia)
+            if self.fallos.get(ticker, 0) > 0:
+                self.fallos[ticker] -= 1
+                raise ConnectionError(f"fallo simulado para {ticker}")
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+
+    def history(self, ticker, start=None, end=None):
+        self._atender(ticker)
+        fechas = pd.date_range("2024-01-01", periods=3)
+        return pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=fechas)
+
+    def dividends(self, ticker):
+        self._atender(ticker)
+        return pd.Series([0.5], index=pd.to_datetime(["2024-03-01"]))
+
+    def statement(self, ticker, kind):
+        self._atender(ticker)
+        return pd.DataFrame({"2024": [kind]})
+
+
+class TestYahooFetcher(SimpleTestCase):
+    """Tests para YahooFetcher."""
+
+    def test_descargas_en_paralelo_con_concurrencia_acotada(self):
+        """Las descargas se solapan sin superar el máximo de hilos."""
+        transporte = _YahooFalso(latencia=0.1)
+        fetcher = YahooFetcher(transport=transporte, max_workers=4, timeout=5, retries=0)
+        tickers = [f"T{i}" for i in range(8)]
+
+        inicio = time.monotonic()
+        resultado = fetcher.history(tickers)
+        duracion = time.monotonic() - inicio
+
+        self.assertTrue(resultado.complete)
+        self.assertEqual(sorted(resultado.data), sorted(tickers))
+        self.assertEqual(transporte.max_simultaneas, 4)
+        self.assertLess(duracion, 0.6)
+
+    def test_reintentos_con_espera(self):
+        """Un error transitorio se reintenta hasta obtener el dato."""
+        transporte = _YahooFalso(fallos={"AAPL": 2})
+        fetcher = YahooFetcher(
+            transport=transporte, max_workers=2, timeout=5, retries=2, backoff=0.01
+        )
+
+        resultado = fetcher.dividends(["AAPL"])
+
+        self.assertTrue(resultado.complete)
+        self.assertEqual(transporte.llamadas.count("AAPL"), 3)
+
+    def test_errores_y_plazo_devuelven_resultado_parcial(self):
+        """Los tickers que fallan o vencen el plazo se informan sin perder el resto."""
+        transporte = _YahooFalso(fallos={"MSFT": 5}, lentos={"TSLA"})
+        fetcher = YahooFetcher(
+            transport=transporte, max_workers=4, timeout=0.5, retries=1, backoff=0.01
+        )
+
+        inicio = time.monotonic()
+        resultado = fetcher.history(["AAPL", "MSFT", "TSLA"])
+
+        self.assertLess(time.monotonic() - inicio, 1.5)
+        self.assertFalse(resultado.complete)
+        self.assertEqual(list(resultado.data), ["AAPL"])
+        self.assertIn("fallo simulado", resultado.errors["MSFT"])
+        self.assertEqual(resultado.timed_out, ["TSLA"])
+
+    def test_estados_financieros_por_tipo(self):
+        """Los tres estados financieros se obtienen en una sola llamada."""
+        fetcher = YahooFetcher(transport=_YahooFalso(), max_workers=3, timeout=5, retries=0)
+
+        resultado = fetcher.statements("AAPL")
+
+        self.assertEqual(sorted(resultado.data), ["balance_sheet", "cashflow", "income_stmt"])
+        self.assertEqual(resultado.data["balance_sheet"].iloc[0, 0], "balance_sheet")
+
+
+class TestYFinanceTransport(SimpleTestCase):
+    """Tests para las descargas por lote del transporte de yfinance."""
+
+    def test_descargas_de_a_una_y_un_turno_por_ticker(self):
+        """yf.download no es seguro entre hilos: dos bloques simultáneos no se superponen."""
+        activas, maximo, turnos = [0], [0], []
+        lock = threading.Lock()
+
+        def download(**kwargs):
+            with lock:
+                activas[0] += 1
+                maximo[0] = max(maximo[0], activas[0])
+            time.sleep(0.05)
+            with lock:
+                activas[0] -= 1
+            return pd.DataFrame({'threads': [kwargs['threads']]})
+
+        limitador = RateLimiter(rate=0, burst=4)
+
+        def acquire(tokens=1):
+            # La espera del limitador no debe hacerse con el lock de descargas tomado
+            turnos.append((tokens, _download_lock.locked()))
+            return 0.0
+
+        limitador.acquire = acquire
+        transporte = YFinanceTransport(rate_limiter=limitador)
+
+        with patch('yfinance.download', side_effect=download):
+            hilos = [
+                threading.Thread(target=transporte.download, args=([f'T{i}{j}' for j in range(6)],))
+                for i in range(3)
+            ]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            resultado = transporte.download(['AAPL', 'KO'])
+
+        self.assertEqual(maximo[0], 1)
+        self.assertEqual(sorted(t for t, _ in turnos), [2, 6, 6, 6])
+        self.assertFalse(turnos[-1][1])  # Sin descargas en curso, el lock está libre al esperar
+        self.assertEqual(resultado['threads'].iloc[0], 2)
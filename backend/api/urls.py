@@ -28,6 +28,7 @@ urlpatterns = [
     path('sharpe-ratio/', SharpeRatioView.as_view(), name='sharpe-ratio'),
     path('backtest/', BacktestView.as_view(), name='backtest'),
     path('pivot-points/', PivotPointsView.as_view(), name='pivot-points'),
+    path('pivot-screener/', PivotScreenerView.as_view(), name='pivot-screener'),
     path('agrupamiento/', AgrupamientoView.as_view(), name='agrupamiento'),
     path('ema-signals/', EMASignalsView.as_view(), name='ema-signals'),
     path('dividendos/', DividendosView.as_view(), name='dividendos'),
@@ -38,4 +39,5 @@ urlpatterns = [
     path('health/', HealthCheckView.as_view(), name='health_check'),
     path('last-execution/', LastExecutionDateView.as_view(), name='last-execution'),
     path('tickers/', TickersView.as_view(), name='tickers'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -0,0 +1,390 @@
+"""
+Descarga concurrente de datos de Yahoo Finance para el camino de las solicitudes.
+
+Las vistas que consultan Yahoo Finance por cada ticker usan ``YahooFetcher``
+para lanzar las descargas en un pool de hilos acotado, con un plazo máximo
+por solicitud y reintentos con espera exponencial. Cuando el plazo vence o un
+ticker falla, se devuelven los resultados parciales junto con los errores.
+
+El acceso a la red está encapsulado en un transporte intercambiable
+(``YFinanceTransport`` por defecto) para que los tests usen uno falso. El
+transporte respeta un ``RateLimiter`` compartido por el proceso, de modo que
+las vistas no superan juntas la tasa de pedidos configurada. La ingesta usa su
+propio limitador (``ingesta_rate_limiter``) para que la deuda de una descarga
+masiva no demore los pedidos de las solicitudes.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_FINANCIEROS = ('cashflow', 'balance_sheet', 'income_stmt')
+
+# Serializa las llamadas a yf.download del proceso (ver YFinanceTransport.download)
+_download_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Limitador de tasa tipo token bucket, seguro entre hilos.
+
+    Permite ráfagas de hasta ``burst`` pedidos y luego ``rate`` pedidos por
+    segundo. Cada llamada a ``acquire`` reserva su turno bajo el lock y espera
+    fuera de él, así los hilos no se bloquean entre sí mientras duermen.
+    """
+
+    def __init__(self, rate: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Inicializa el limitador.
+
+        Args:
+            rate (float): Pedidos por segundo. Cero o negativo desactiva el límite.
+            burst (int, optional): Pedidos permitidos sin espera. Defaults to 1.
+            clock (Callable[[], float], optional): Reloj monotónico. Defaults to ``time.monotonic``.
+            sleep (Callable[[float], None], optional): Función de espera.
+                Defaults to ``time.sleep``.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Espera hasta que haya turnos disponibles para ``tokens`` pedidos.
+
+        Pedir más turnos que ``burst`` es válido: la deuda se paga esperando.
+
+        Args:
+            tokens (int, optional): Pedidos que se van a hacer. Defaults to 1.
+
+        Returns:
+            float: Segundos esperados.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+class YFinanceTransport:
+    """
+    Transporte que obtiene los datos con la librería ``yfinance``.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Inicializa el transporte.
+
+        Args:
+            rate_limiter (Optional[RateLimiter], optional): Limitador aplicado
+                antes de cada pedido. Defaults to ``yahoo_rate_limiter``.
+        """
+        self.rate_limiter = rate_limiter or yahoo_rate_limiter
+
+    def download(self, tickers: List[str], start: Any = None, end: Any = None) -> pd.DataFrame:
+        """
+        Descarga precios diarios, dividendos y splits de varios tickers en un pedido.
+
+        Args:
+            tickers (List[str]): Tickers a descargar.
+            start (Any, optional): Fecha de inicio. Defaults to None.
+            end (Any, optional): Fecha de fin. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Datos con el ticker como primer nivel de columnas.
+        """
+        import yfinance as yf
+        # Cada ticker es un pedido HTTP y consume un turno; la espera se hace antes de
+        # tomar el lock para no demorar a quien ya tiene su turno.
+        self.rate_limiter.acquire(len(tickers))
+        # yf.download guarda sus resultados en estado global del módulo (yfinance 0.2.x):
+        # dos descargas simultáneas pueden mezclar o perder tickers, así que van de a una.
+        # Los hilos internos de yfinance se limitan a la ráfaga del limitador.
+        with _download_lock:
+            return yf.download(
+                tickers=tickers,
+                start=start,
+                end=end,
+                threads=min(len(tickers), self.rate_limiter.burst),
+                group_by='ticker',
+                auto_adjust=False,
+                actions=True,
+                progress=False,
+            )
+
+    def history(self, ticker: str, start: Any = None, end: Any = None) -> pd.DataFrame:
+        """
+        Obtiene el historial de precios de un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+            start (Any, optional): Fecha de inicio. Defaults to None.
+            end (Any, optional): Fecha de fin. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Historial con columnas Open, High, Low, Close y Volume.
+        """
+        import yfinance as yf
+        self.rate_limiter.acquire()
+        return yf.Ticker(ticker).history(start=start, end=end)
+
+    def dividends(self, ticker: str) -> pd.Series:
+        """
+        Obtiene los dividendos pagados por un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+
+        Returns:
+            pd.Series: Montos indexados por fecha de pago.
+        """
+        import yfinance as yf
+        self.rate_limiter.acquire()
+        return yf.Ticker(ticker).dividends
+
+    def statement(self, ticker: str, kind: str) -> pd.DataFrame:
+        """
+        Obtiene un estado financiero anual de un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+            kind (str): Uno de ``ESTADOS_FINANCIEROS``.
+
+        Returns:
+            pd.DataFrame: El estado financiero (conceptos x períodos).
+        """
+        import yfinance as yf
+        if kind not in ESTADOS_FINANCIEROS:
+            raise ValueError(f'Estado financiero desconocido: {kind}')
+        self.rate_limiter.acquire()
+        return getattr(yf.Ticker(ticker), f'get_{kind}')()
+
+
+# Limitador compartido por los transportes del camino de las solicitudes
+yahoo_rate_limiter = RateLimiter(
+    rate=getattr(settings, 'YAHOO_RATE_LIMIT', 2.0),
+    burst=getattr(settings, 'YAHOO_RATE_BURST', 4),
+)
+
+# Limitador de las descargas masivas del planificador de ingesta
+ingesta_rate_limiter = RateLimiter(
+    rate=getattr(settings, 'YAHOO_INGEST_RATE_LIMIT', 2.0),
+    burst=getattr(settings, 'YAHOO_INGEST_RATE_BURST', 4),
+)
+
+
+class FetchResult:
+    """
+    Resultado de una descarga concurrente, posiblemente parcial.
+
+    Attributes:
+        data (Dict[Hashable, Any]): Resultados obtenidos por clave.
+        errors (Dict[Hashable, str]): Mensaje de error por clave fallida.
+        timed_out (List[Hashable]): Claves que no terminaron antes del plazo.
+    """
+
+    def __init__(self):
+        self.data: Dict[Hashable, Any] = {}
+        self.errors: Dict[Hashable, str] = {}
+        self.timed_out: List[Hashable] = []
+
+    @property
+    def complete(self) -> bool:
+        """Indica si todas las claves se obtuvieron correctamente."""
+        return not self.errors and not self.timed_out
+
+    def __repr__(self) -> str:
+        return (f'FetchResult(data={list(self.data)}, errors={list(self.errors)}, '
+                f'timed_out={self.timed_out})')
+
+
+class YahooFetcher:
+    """
+    Ejecuta descargas a Yahoo Finance con concurrencia acotada, plazo y reintentos.
+
+    El pool de hilos es compartido por todas las solicitudes del proceso, de modo
+    que la cantidad de conexiones simultáneas a Yahoo está acotada por worker.
+    """
+
+    def __init__(self, transport: Optional[Any] = None, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, retries: Optional[int] = None,
+                 backoff: Optional[float] = None):
+        """
+        Inicializa el fetcher.
+
+        Args:
+            transport (Optional[Any], optional): Objeto con los métodos de
+                ``YFinanceTransport``. Defaults to ``YFinanceTransport()``.
+            max_workers (Optional[int], optional): Descargas simultáneas.
+                Defaults to ``settings.YAHOO_FETCH_MAX_WORKERS``.
+            timeout (Optional[float], optional): Plazo por solicitud en segundos.
+                Defaults to ``settings.YAHOO_FETCH_TIMEOUT``.
+            retries (Optional[int], optional): Reintentos por clave tras un error.
+                Defaults to ``settings.YAHOO_FETCH_RETRIES``.
+            backoff (Optional[float], optional): Espera inicial entre reintentos,
+                que se duplica en cada intento. Defaults to ``settings.YAHOO_FETCH_BACKOFF``.
+        """
+        self.transport = transport or YFinanceTransport()
+        self.max_workers = max_workers or getattr(settings, 'YAHOO_FETCH_MAX_WORKERS', 8)
+        if timeout is None:
+            timeout = getattr(settings, 'YAHOO_FETCH_TIMEOUT', 15)
+        if retries is None:
+            retries = getattr(settings, 'YAHOO_FETCH_RETRIES', 2)
+        if backoff is None:
+            backoff = getattr(settings, 'YAHOO_FETCH_BACKOFF', 0.5)
+        self.timeout, self.retries, self.backoff = timeout, retries, backoff
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='yahoo-fetch'
+                )
+            return self._executor
+
+    def fetch(self, calls: Dict[Hashable, Callable[[Any], Any]],
+              timeout: Optional[float] = None) -> FetchResult:
+        """
+        Ejecuta varias descargas en paralelo y espera como máximo el plazo indicado.
+
+        Args:
+            calls (Dict[Hashable, Callable[[Any], Any]]): Por clave, una función que
+                recibe el transporte y devuelve el dato.
+            timeout (Optional[float], optional): Plazo en segundos para esta solicitud.
+                Defaults to ``self.timeout``.
+
+        Returns:
+            FetchResult: Datos obtenidos, errores y claves que vencieron el plazo.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        executor = self._get_executor()
+        futures: Dict[Future, Hashable] = {
+            executor.submit(self._call_with_retries, call, deadline): key
+            for key, call in calls.items()
+        }
+
+        result = FetchResult()
+        pending = set(futures)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                try:
+                    result.data[key] = future.result()
+                except Exception as e:
+                    logger.warning(f'Error al descargar {key} de Yahoo Finance: {e}')
+                    result.errors[key] = str(e)
+
+        for future in pending:
+            # Las descargas en curso terminan en segundo plano; las encoladas se cancelan
+            future.cancel()
+            result.timed_out.append(futures[future])
+        if result.timed_out:
+            logger.warning(f'Plazo vencido al descargar de Yahoo Finance: {result.timed_out}')
+        return result
+
+    def _call_with_retries(self, call: Callable[[Any], Any], deadline: float) -> Any:
+        """
+        Ejecuta una descarga reintentando con espera exponencial dentro del plazo.
+
+        Args:
+            call (Callable[[Any], Any]): Función que recibe el transporte.
+            deadline (float): Instante (``time.monotonic``) límite de la solicitud.
+
+        Returns:
+            Any: El dato descargado.
+        """
+        attempt = 0
+        while True:
+            try:
+                return call(self.transport)
+            except Exception:
+                delay = self.backoff * (2 ** attempt)
+                attempt += 1
+                if attempt > self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                time.sleep(delay)
+
+    def history(self, tickers: Iterable[str], start: Any = None, end: Any = None,
+                timeout: Optional[float] = None) -> FetchResult:
+        """
+        Descarga el historial de precios de varios tickers.
+
+        Args:
+            tickers (Iterable[str]): Tickers a descargar.
+            start (Any, optional): Fecha de inicio. Defaults to None.
+            end (Any, optional): Fecha de fin. Defaults to None.
+            timeout (Optional[float], optional): Plazo de la solicitud. Defaults to None.
+
+        Returns:
+            FetchResult: Historial por ticker.
+        """
+        return self.fetch(
+            {
+                t: (lambda tr, t=t: tr.history(t, start=start, end=end))
+                for t in dict.fromkeys(tickers)
+            },
+            timeout=timeout,
+        )
+
+    def dividends(self, tickers: Iterable[str], timeout: Optional[float] = None) -> FetchResult:
+        """
+        Descarga los dividendos de varios tickers.
+
+        Args:
+            tickers (Iterable[str]): Tickers a descargar.
+            timeout (Optional[float], optional): Plazo de la solicitud. Defaults to None.
+
+        Returns:
+            FetchResult: Serie de dividendos por ticker.
+        """
+        return self.fetch(
+            {t: (lambda tr, t=t: tr.dividends(t)) for t in dict.fromkeys(tickers)},
+            timeout=timeout,
+        )
+
+    def statements(self, ticker: str, kinds: Iterable[str] = ESTADOS_FINANCIEROS,
+                   timeout: Optional[float] = None) -> FetchResult:
+        """
+        Descarga en paralelo varios estados financieros de un ticker.
+
+        Args:
+            ticker (str): Ticker del activo.
+            kinds (Iterable[str], optional): Estados a descargar. Defaults to todos.
+            timeout (Optional[float], optional): Plazo de la solicitud. Defaults to None.
+
+        Returns:
+            FetchResult: Estado financiero por tipo.
+        """
+        return self.fetch(
+            {k: (lambda tr, k=k: tr.statement(ticker, k)) for k in kinds},
+            timeout=timeout,
+        )
+
+
+# Instancias compartidas por proceso
+yahoo_fetcher = YahooFetcher()
@@ -22,6 +22,7 @@ class ActivoDetailView(CachedAPIView):
     Vista para obtener información detallada sobre un activo específico.
     """
     permission_classes = [AllowAny]
+    cache_timeout = None  # Se invalida por versión de datos al ingerir
     def post(self, request):
         """
         Obtiene información detallada para un ticker específico.
@@ -75,7 +76,7 @@ class ActivoDetailView(CachedAPIView):
                 )
 
             # Calcular analíticas
-            data = calculate_analytics(df)
+            data = calculate_analytics(df, ticker=ticker)
             
             # Almacenar en caché y devolver respuesta
             return self.cache_response(cache_key, data)
@@ -107,10 +108,12 @@ class ActivoListCreateView(generics.ListCreateAPIView):
         tickers = []
         total_actual_cartera = 0
 
+        # Señales de todos los activos con una sola consulta
+        procesados = ActivoService().process_activos(activos)
+
         # Primera pasada: calcular valor total de la cartera
         for activo in activos:
-            service = ActivoService()
-            processed_data = service.process_activo(activo)
+            processed_data = procesados.get(activo.id)
             if processed_data:
                 precio_actual = processed_data.get('precioActual', activo.precioActual)
                 cantidad = activo.cantidad
@@ -118,8 +121,7 @@ class ActivoListCreateView(generics.ListCreateAPIView):
 
         # Segunda pasada: procesar cada activo con sus cálculos
         for activo in activos:
-            service = ActivoService()
-            processed_data = service.process_activo(activo)
+            processed_data = procesados.get(activo.id)
             if processed_data:
                 precio_compra = activo.precioCompra
                 cantidad = activo.cantidad
@@ -15,16 +15,22 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
-from api.models import StockData
-from api.services.retornos_mensuales import calcular_retornos_mensuales
+from api.repositories.activo_repository import StockDataRepository
+from api.repositories.pivot_level_repository import PivotLevelRepository
+from api.services.retornos_mensuales import (
+    calcular_retornos_mensuales,
+    calcular_retornos_mensuales_tickers,
+)
 from api.services.fundamental import get_fundamental_data
 from api.services.backtesting import run_backtest_service
 from api.services.indicators import calculate_sharpe_ratio
-from api.services.pivot import calculate_pivots
-from api.services.agrupacion import agrupar_acciones
+from api.services.pivot import LOOKBACK_DEFAULT, N1_DEFAULT, N2_DEFAULT, calcular_pivotes_ticker
+from api.services.acciones_corporativas import obtener_dividendos_por_mes
+from api.services.agrupacion import agrupar_acciones_con_curva
+from api.services.correlacion import calcular_correlacion
 from api.services.ema_logic import obtener_ema_signals
 from api.services.entrenamiento import entrenar_modelo_service
-from api.views.base import CachedAPIView
+from api.views.base import BaseAPIView, CachedAPIView
 
 
 class RetornosMensualesView(CachedAPIView):
@@ -32,20 +38,37 @@ class RetornosMensualesView(CachedAPIView):
     View for retrieving monthly returns data.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
     
     def get(self, request):
         """
-        Get monthly returns data for a ticker.
+        Get monthly returns data for a ticker, or for several tickers at once.
         
         Args:
-            request: The HTTP request object.
+            request: The HTTP request object. ``tickers`` (comma-separated) returns
+                a grid per ticker; otherwise ``ticker`` returns a single grid.
             
         Returns:
             Response: The HTTP response object with monthly returns data.
         """
         try:
-            ticker = request.GET.get('ticker', 'AAPL')  # Default ticker: AAPL
             years = int(request.GET.get('years', 10))  # Default years: 10
+            tickers = [t for t in request.GET.get('tickers', '').split(',') if t]
+            if tickers:
+                cache_key = self.get_cache_key(tickers=",".join(sorted(set(tickers))), years=years)
+                cached_response = self.get_cached_response(cache_key)
+                if cached_response:
+                    return cached_response
+
+                # One query for all tickers; grids keyed by ticker
+                grids = calcular_retornos_mensuales_tickers(tickers, years)
+                if not grids:
+                    return self.error_response(
+                        'No data found for the provided tickers', status.HTTP_400_BAD_REQUEST
+                    )
+                return self.cache_response(cache_key, grids)
+
+            ticker = request.GET.get('ticker', 'AAPL')  # Default ticker: AAPL
 
             # Generate cache key
             cache_key = self.get_cache_key(ticker=ticker, years=years)
@@ -71,6 +94,7 @@ class FundamentalInfoView(CachedAPIView):
     View for retrieving fundamental information for a ticker.
     """
     permission_classes = []
+    cache_versioned = False  # Data comes from Yahoo Finance, not StockData
     
     def get(self, request):
         """
@@ -108,10 +132,12 @@ class CorrelationMatrixView(CachedAPIView):
     View for calculating correlation matrices for tickers.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
+    remote_cache_timeout = 3600  # Results that needed Yahoo Finance data expire
     
     def get(self, request):
         """
-        Get correlation matrix for a list of tickers.
+        Get correlation matrix of daily returns for a list of tickers.
         
         Args:
             request: The HTTP request object.
@@ -130,35 +156,34 @@ class CorrelationMatrixView(CachedAPIView):
             return self.error_response('Start and end dates are required.', status.HTTP_400_BAD_REQUEST)
 
         # Generate cache key
-        cache_key = hashlib.md5(f"{','.join(sorted(tickers))}_{start_date}_{end_date}".encode()).hexdigest()
+        cache_key = self.get_cache_key(
+            tickers=",".join(sorted(tickers)), start_date=start_date, end_date=end_date
+        )
         cached_data = self.get_from_cache(cache_key)
         if cached_data:
             return JsonResponse({'correlation_matrix': cached_data})
 
         try:
-            # Import yfinance here to avoid circular imports
-            import yfinance as yf
-            
-            data_frames = {}
-            for ticker in tickers:
-                # Get data based on provided dates
-                ticker_data = yf.Ticker(ticker).history(start=start_date, end=end_date)
-                data_frames[ticker] = ticker_data['Close']
-
-            # Combine close prices in a single DataFrame
-            combined_data = pd.DataFrame(data_frames)
-
-            # Remove rows with NaN values
-            combined_data.dropna(inplace=True)
-
-            # Calculate correlation matrix
-            correlation_matrix = combined_data.corr()
-
-            # Convert correlation matrix to dictionary format for JSON response
-            correlation_data = correlation_matrix.to_dict()
-
-            # Store result in cache with 1 hour expiration
-            self.set_in_cache(cache_key, correlation_data, timeout=3600)
+            # Stored closes in one query; only missing tickers go to Yahoo Finance
+            resultado = calcular_correlacion(tickers, start_date, end_date)
+            correlation_data = resultado['correlation_matrix']
+
+            if not correlation_data:
+                return self.error_response(
+                    'Could not retrieve data for the requested tickers.',
+                    status.HTTP_404_NOT_FOUND,
+                    errors={'missing': resultado['faltantes']},
+                )
+
+            # Only complete results are cached; partial ones report what is missing
+            if resultado['faltantes']:
+                return JsonResponse({
+                    'correlation_matrix': correlation_data,
+                    'missing': resultado['faltantes'],
+                })
+
+            timeout = self.remote_cache_timeout if resultado['remotos'] else self.cache_timeout
+            self.set_in_cache(cache_key, correlation_data, timeout=timeout)
 
             return JsonResponse({'correlation_matrix': correlation_data})
         
@@ -171,6 +196,7 @@ class SharpeRatioView(CachedAPIView):
     View for calculating Sharpe ratio.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
     
     def get(self, request):
         """
@@ -189,19 +215,19 @@ class SharpeRatioView(CachedAPIView):
         
         # Generate cache key
         cache_key = self.get_cache_key(sector=sector, x_years=x_years, y_years=y_years)
-        cached_response = self.get_cached_response(cache_key)
-        if cached_response:
-            return cached_response
 
-        # Call service to calculate Sharpe ratio
-        sharpe_data = calculate_sharpe_ratio(sector, x_years, y_years)
+        # Compute once across concurrent requests; errors are not cached
+        sharpe_data = self.get_or_compute(
+            cache_key,
+            lambda: calculate_sharpe_ratio(sector, x_years, y_years),
+            should_cache=lambda data: not (isinstance(data, dict) and 'error' in data),
+        )
 
         # Check if an error occurred
         if isinstance(sharpe_data, dict) and 'error' in sharpe_data:
             return self.error_response(sharpe_data['error'], status.HTTP_400_BAD_REQUEST)
 
-        # Cache and return response
-        return self.cache_response(cache_key, {'sharpe_data': sharpe_data})
+        return self.success_response(data={'sharpe_data': sharpe_data})
 
 
 class BacktestView(CachedAPIView):
@@ -239,6 +265,9 @@ class PivotPointsView(CachedAPIView):
     View for calculating pivot points.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
+    max_window = 250
+    max_lookback = 5000
     
     def get(self, request):
         """
@@ -252,21 +281,82 @@ class PivotPointsView(CachedAPIView):
         """
         # Get ticker from request parameters
         ticker = request.GET.get('ticker', 'AAPL')  # Default to AAPL if not provided
-        
+
+        # Candles on each side of a pivot; detection cost does not depend on them
+        try:
+            n1 = int(request.GET.get('n1', N1_DEFAULT))
+            n2 = int(request.GET.get('n2', N2_DEFAULT))
+            lookback = int(request.GET.get('lookback', LOOKBACK_DEFAULT))
+            max_points = request.GET.get('max_points')
+            max_points = int(max_points) if max_points else None
+        except ValueError:
+            return self.error_response(
+                'Parameters "n1", "n2", "lookback" and "max_points" must be integers.',
+                status.HTTP_400_BAD_REQUEST,
+            )
+        if not (1 <= n1 <= self.max_window and 1 <= n2 <= self.max_window):
+            return self.error_response(
+                f'Parameters "n1" and "n2" must be between 1 and {self.max_window}.',
+                status.HTTP_400_BAD_REQUEST,
+            )
+        if not (2 <= lookback <= self.max_lookback):
+            return self.error_response(
+                f'Parameter "lookback" must be between 2 and {self.max_lookback}.',
+                status.HTTP_400_BAD_REQUEST,
+            )
+        if max_points is not None and max_points < 1:
+            return self.error_response(
+                'Parameter "max_points" must be positive.', status.HTTP_400_BAD_REQUEST
+            )
+
         # Generate cache key
-        cache_key = self.get_cache_key(ticker=ticker)
-        cached_response = self.get_cached_response(cache_key)
-        if cached_response:
-            return cached_response
+        cache_key = self.get_cache_key(
+            ticker=ticker, n1=n1, n2=n2, lookback=lookback, max_points=max_points
+        )
 
-        # Get historical data from model
-        stock_data = StockData.objects.filter(ticker=ticker).values().order_by('date')
+        def compute():
+            # Only the last lookback + n1 candles are read from the database
+            return calcular_pivotes_ticker(
+                ticker, n1=n1, n2=n2, lookback=lookback, max_puntos=max_points
+            )
 
-        # Calculate pivots using service function
-        pivot_data = calculate_pivots(stock_data)
+        # Compute once across concurrent requests
+        pivot_data = self.get_or_compute(cache_key, compute)
+        return self.success_response(data=pivot_data)
 
-        # Cache and return response
-        return self.cache_response(cache_key, pivot_data)
+
+class PivotScreenerView(BaseAPIView):
+    """
+    View for the nightly support/resistance screener.
+    """
+    permission_classes = []
+
+    def get(self, request):
+        """
+        Get the tickers whose latest close is near a support or resistance level.
+
+        Args:
+            request: The HTTP request object. Accepts ``distance`` (max distance
+                to the level, in % of the close, default 2) and ``type``
+                (``high`` or ``low``).
+
+        Returns:
+            Response: The HTTP response object with the matching levels, closest first.
+        """
+        try:
+            distance = float(request.GET.get('distance', 2))
+        except ValueError:
+            return self.error_response(
+                'Parameter "distance" must be a number.', status.HTTP_400_BAD_REQUEST
+            )
+        level_type = request.GET.get('type') or None
+        if level_type not in (None, 'high', 'low'):
+            return self.error_response(
+                'Parameter "type" must be "high" or "low".', status.HTTP_400_BAD_REQUEST
+            )
+
+        # Levels are precomputed by scan_pivot_levels, so this is a single indexed query
+        return self.success_response(data=PivotLevelRepository.near(distance, type=level_type))
 
 
 class AgrupamientoView(CachedAPIView):
@@ -274,6 +364,7 @@ class AgrupamientoView(CachedAPIView):
     View for clustering stocks.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
     
     def get(self, request):
         """
@@ -286,27 +377,35 @@ class AgrupamientoView(CachedAPIView):
             Response: The HTTP response object with clustering results.
         """
         tickers_param = request.GET.get('tickers')
-        tickers = tickers_param.split(',')
+        # Same ticker format as StockData and the data versions ('BRK.B' -> 'BRK-B')
+        tickers = [ticker.replace('.', '-') for ticker in tickers_param.split(',')]
         parametros_seleccionados = request.GET.get('parametros', '').split(',')
         start_date = request.GET.get('start_date')
         end_date = request.GET.get('end_date')
+        # With scores=true the response also explains how k was chosen
+        include_scores = request.GET.get('scores', 'false').lower() == 'true'
 
         # Generate cache key
-        cache_key = hashlib.md5(
-            f"agrupamiento_{','.join(tickers)}_{start_date}_{end_date}_{','.join(parametros_seleccionados)}".encode()
-        ).hexdigest()
-        cached_data = self.get_from_cache(cache_key)
-        if cached_data:
-            return JsonResponse(cached_data, safe=False)
+        cache_key = self.get_cache_key(
+            tickers=",".join(tickers),
+            start_date=start_date,
+            end_date=end_date,
+            parametros=",".join(parametros_seleccionados),
+            scores=include_scores or None,
+        )
+
+        def compute():
+            resultado = agrupar_acciones_con_curva(
+                tickers, parametros_seleccionados, start_date, end_date
+            )
+            acciones = resultado['parametros'].reset_index().to_dict(orient='records')
+            if not include_scores:
+                return acciones
+            return {'acciones': acciones, 'k': resultado['k'], 'curva': resultado['curva']}
 
         try:
-            agrupamiento = agrupar_acciones(tickers, parametros_seleccionados, start_date, end_date)
-            agrupamiento = agrupamiento.reset_index()
-            agrupamiento_json = agrupamiento.to_dict(orient='records')
-
-            # Store in cache
-            self.set_in_cache(cache_key, agrupamiento_json, timeout=3600)
-
+            # Compute once across concurrent requests
+            agrupamiento_json = self.get_or_compute(cache_key, compute)
             return JsonResponse(agrupamiento_json, safe=False, status=200)
         except Exception as e:
             return self.error_response(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -317,6 +416,7 @@ class EMASignalsView(CachedAPIView):
     View for calculating EMA signals.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
     
     def get(self, request):
         """
@@ -336,9 +436,9 @@ class EMASignalsView(CachedAPIView):
         use_triple = request.GET.get('useTriple', 'false').lower() == 'true'
 
         # Generate a unique cache key based on parameters
-        cache_key = hashlib.md5(
-            f"ema_signals_{','.join(tickers)}_{ema4}_{ema9}_{ema18}_{use_triple}".encode()
-        ).hexdigest()
+        cache_key = self.get_cache_key(
+            tickers=",".join(tickers), ema4=ema4, ema9=ema9, ema18=ema18, use_triple=use_triple
+        )
 
         # Check if result is already in cache
         cached_data = self.get_from_cache(cache_key)
@@ -355,8 +455,8 @@ class EMASignalsView(CachedAPIView):
             # Create result as a dictionary including signals
             result = {"signals": signals_with_data}
 
-            # Store result in cache (e.g., for 1 hour)
-            self.set_in_cache(cache_key, result, timeout=3600)
+            # Store result in cache until the tickers' data changes
+            self.set_in_cache(cache_key, result, timeout=self.cache_timeout)
 
             # Return result as JSON
             return JsonResponse(result)
@@ -370,10 +470,11 @@ class DividendosView(CachedAPIView):
     View for retrieving dividend information.
     """
     permission_classes = []
+    cache_timeout = None  # Invalidated by data version on ingestion
     
     def get(self, request):
         """
-        Get dividend information for tickers.
+        Get a year's dividends by month for tickers (``year``, default last year).
         
         Args:
             request: The HTTP request object.
@@ -381,46 +482,24 @@ class DividendosView(CachedAPIView):
         Returns:
             Response: The HTTP response object with dividend information.
         """
-        tickers = request.GET.getlist("tickers")  # Get list of tickers
+        # Same ticker format as StockData and the data versions ('BRK.B' -> 'BRK-B')
+        tickers = [ticker.replace('.', '-') for ticker in request.GET.getlist("tickers")]
+        try:
+            year = int(request.GET.get("year", datetime.now().year - 1))  # Default: last year
+        except ValueError:
+            return self.error_response(
+                'Parameter "year" must be an integer.', status.HTTP_400_BAD_REQUEST
+            )
         
         # Generate cache key
-        cache_key = self.get_cache_key(tickers=",".join(tickers))
-        cached_response = self.get_cached_response(cache_key)
-        if cached_response:
-            return cached_response
-        
-        # Import yfinance here to avoid circular imports
-        import yfinance as yf
-        from datetime import datetime
+        cache_key = self.get_cache_key(tickers=",".join(tickers), year=year)
+        cached_data = self.get_from_cache(cache_key)
+        if cached_data:
+            return JsonResponse(cached_data)
         
-        resultados = {}
-        año_anterior = datetime.now().year - 1  # Last year
-        # Change the structure of dividendos_por_mes to store total and company details
-        dividendos_por_mes = {i: {"total": 0, "detalles": []} for i in range(12)}  # Dictionary to store dividends by month
-
-        for ticker in tickers:
-            try:
-                accion = yf.Ticker(ticker)
-                dividendos = accion.dividends
-
-                if dividendos.empty:
-                    resultados[ticker] = {"error": "No se encontraron dividendos"}
-                    continue
-
-                for fecha, monto in dividendos.items():
-                    fecha_pago = fecha.to_pydatetime()
-                    if fecha_pago.year == año_anterior:
-                        mes_pago = fecha_pago.month - 1  # Convert to 0-11 index
-                        dividendos_por_mes[mes_pago]["total"] += monto  # Sum dividend amounts
-                        dividendos_por_mes[mes_pago]["detalles"].append({"empresa": ticker, "monto": monto})  # Save details
-
-            except Exception as e:
-                resultados[ticker] = {"error": str(e)}
-                continue
-                
-        # Cache and return response
-        data = {"dividendos": dividendos_por_mes}
-        self.set_in_cache(cache_key, data, timeout=3600)
+        # Single grouped query over the stored dividends of the year
+        data = {"dividendos": obtener_dividendos_por_mes(tickers, year)}
+        self.set_in_cache(cache_key, data, timeout=self.cache_timeout)
         return JsonResponse(data)
 
 
@@ -484,25 +563,16 @@ class PortfolioMetricsView(CachedAPIView):
         tickers = [a["ticker"] for a in activos]
         tickers_unicos = list(set(tickers + [indice]))
 
-        precios_dict = {}
+        # Una sola consulta para todos los tickers, alineada por fecha
+        precios = StockDataRepository.load_price_matrix(tickers_unicos)
 
         for ticker in tickers_unicos:
-            data = StockData.objects.filter(ticker=ticker).values("date", "close_price").order_by("date")
-            df = pd.DataFrame(data)
-
-            if df.empty:
+            if ticker not in precios.columns:
                 print(f"⚠️ No hay datos para {ticker}")
-                continue
-
-            df["date"] = pd.to_datetime(df["date"])
-            df["close_price"] = df["close_price"].astype(float)  # Asegurar que los precios sean float
-            df = df.set_index("date")
-            precios_dict[ticker] = df["close_price"]
 
-        if not precios_dict:
+        if precios.empty:
             return self.error_response("No hay datos disponibles", status.HTTP_400_BAD_REQUEST)
 
-        precios = pd.concat(precios_dict.values(), axis=1, keys=precios_dict.keys())
         precios = precios.dropna()
 
         if precios.shape[0] < 10:
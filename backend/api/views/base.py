@@ -4,13 +4,21 @@ Vistas base para la aplicación API.
 Este módulo define clases base para las vistas API que proporcionan
 funcionalidad común y aseguran un comportamiento consistente en toda la aplicación.
 """
-from typing import Dict, Any, Optional
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
 from django.http import JsonResponse
 
+from api.cache.stats import registrar_acierto, registrar_fallo
+from api.cache.versions import VERSION_GLOBAL, obtener_versiones
+
 class BaseAPIView(APIView):
     """
     Clase base para todas las vistas API.
@@ -19,23 +27,82 @@ class BaseAPIView(APIView):
     manejo de errores y soporte de caché.
     """
     
+    cache_namespace: Optional[str] = None  # Predeterminado al nombre de la vista
+    max_cache_key_length = 200  # Parámetros más largos se reemplazan por su hash
+    cache_versioned = True  # Incluir la versión de los datos de StockData en la clave
+    cache_ticker_params = ('ticker', 'tickers')  # Parámetros que identifican tickers
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Clave sin versión de cada clave versionada generada, para servir la última
+        # entrada calculada mientras se recalcula la versión nueva
+        self._latest_keys: Dict[str, str] = {}
+    
+    def get_cache_namespace(self) -> str:
+        """
+        Obtiene el espacio de nombres de caché de la vista.
+        
+        Returns:
+            str: El espacio de nombres configurado o el nombre de la clase.
+        """
+        return self.cache_namespace or self.__class__.__name__
+    
     def get_cache_key(self, **params) -> str:
         """
-        Genera una clave de caché basada en el nombre de la vista y los parámetros.
+        Genera una clave de caché basada en el espacio de nombres de la vista y los parámetros.
+        
+        Si la vista es versionada, la clave incluye la versión de datos de los tickers
+        presentes en los parámetros (o la versión global si no hay ninguno), de modo
+        que una nueva ingesta de esos tickers invalida la entrada.
         
         Args:
             **params: Parámetros a incluir en la clave de caché.
             
         Returns:
-            str: Una cadena de clave de caché.
+            str: Una cadena de clave de caché con la forma ``<namespace>:<parametros>``,
+                seguida de ``@v<version>`` en las vistas versionadas.
         """
-        view_name = self.__class__.__name__
+        namespace = self.get_cache_namespace()
         param_str = "_".join(f"{k}_{v}" for k, v in sorted(params.items()) if v is not None)
-        return f"{view_name}_{param_str}"
+        if not self.cache_versioned:
+            return f"{namespace}:{self._shorten(param_str)}"
+        
+        cache_key = f"{namespace}:{self._shorten(f'{param_str}@v{self.get_data_version(params)}')}"
+        self._latest_keys[cache_key] = f"{namespace}:{self._shorten(param_str)}@latest"
+        return cache_key
+    
+    def _shorten(self, param_str: str) -> str:
+        if len(param_str) > self.max_cache_key_length:
+            return hashlib.md5(param_str.encode()).hexdigest()
+        return param_str
+    
+    def get_data_version(self, params: Dict[str, Any]) -> str:
+        """
+        Obtiene la versión de datos que corresponde a los parámetros de una clave.
+        
+        Args:
+            params (Dict[str, Any]): Parámetros de la clave de caché.
+            
+        Returns:
+            str: La versión del único ticker, un hash de las versiones de varios
+                tickers o la versión global.
+        """
+        tickers = []
+        for name in self.cache_ticker_params:
+            value = params.get(name)
+            if isinstance(value, str):
+                value = value.split(",")
+            tickers.extend(t for t in value or () if t)
+        
+        versions = obtener_versiones(sorted(set(tickers)) or [VERSION_GLOBAL])
+        if len(versions) == 1:
+            return str(next(iter(versions.values())))
+        joined = ",".join(f"{t}={v}" for t, v in versions.items())
+        return hashlib.md5(joined.encode()).hexdigest()[:16]
     
     def get_from_cache(self, cache_key: str) -> Optional[Any]:
         """
-        Obtiene datos del caché.
+        Obtiene datos del caché y registra el acierto o fallo en los contadores.
         
         Args:
             cache_key (str): La clave de caché a buscar.
@@ -43,19 +110,43 @@ class BaseAPIView(APIView):
         Returns:
             Optional[Any]: Los datos en caché o None si no se encuentran.
         """
-        return cache.get(cache_key)
+        data = cache.get(cache_key)
+        if data is None:
+            registrar_fallo(self.get_cache_namespace())
+        else:
+            registrar_acierto(self.get_cache_namespace())
+        return data
     
-    def set_in_cache(self, cache_key: str, data: Any, timeout: int = 3600) -> None:
+    def set_in_cache(self, cache_key: str, data: Any, timeout: Optional[int] = 3600) -> None:
         """
         Almacena datos en caché.
         
         Args:
             cache_key (str): La clave de caché para almacenar los datos.
             data (Any): Los datos a almacenar en caché.
-            timeout (int, optional): Tiempo de expiración del caché en segundos. 
-                                    Predeterminado a 3600 (1 hora).
+            timeout (Optional[int], optional): Tiempo de expiración del caché en segundos,
+                                    o None para no expirar. Predeterminado a 3600 (1 hora).
+        """
+        cache.set(cache_key, data, timeout=self.get_cache_timeout(timeout))
+    
+    @staticmethod
+    def get_cache_timeout(timeout: Optional[int]) -> Optional[int]:
+        """
+        Ajusta un tiempo de expiración al backend de caché en uso.
+        
+        Sin expiración solo es seguro en una caché compartida (Redis), donde la clave
+        cambia con la versión que publica la ingesta. En la caché in-memory de cada
+        proceso esa versión no llega, así que se limita a LOCAL_CACHE_MAX_TIMEOUT.
+        
+        Args:
+            timeout (Optional[int]): Segundos de expiración, o None para no expirar.
+            
+        Returns:
+            Optional[int]: El tiempo de expiración a usar.
         """
-        cache.set(cache_key, data, timeout=timeout)
+        if timeout is None and isinstance(caches["default"], LocMemCache):
+            return settings.LOCAL_CACHE_MAX_TIMEOUT
+        return timeout
     
     def success_response(self, data: Any = None, status_code: int = status.HTTP_200_OK, 
                          message: str = "Éxito") -> Response:
@@ -108,10 +199,142 @@ class CachedAPIView(BaseAPIView):
     """
     Clase base para vistas API con soporte de caché integrado.
     
-    Proporciona métodos para implementar fácilmente caché para respuestas API.
+    Proporciona métodos para implementar fácilmente caché para respuestas API,
+    incluyendo cálculo de una sola vez por clave (``get_or_compute``) para
+    evitar estampidas cuando expira una entrada costosa.
     """
     
-    cache_timeout = 3600  # Tiempo de expiración predeterminado (1 hora)
+    # Tiempo de expiración predeterminado (1 hora); None = sin expiración
+    cache_timeout: Optional[int] = 3600
+    stale_timeout = 3600  # Tiempo extra en que un valor vencido se sirve mientras se recalcula
+    lock_timeout = 120  # Duración máxima del lock de recálculo entre workers
+    lock_wait = 30  # Tiempo máximo que una solicitud espera el resultado de otra
+    lock_poll_interval = 0.1
+    
+    # Cálculos en curso dentro de este proceso, por clave de caché
+    _inflight: Dict[str, threading.Event] = {}
+    _inflight_lock = threading.Lock()
+    
+    def get_or_compute(self, cache_key: str, compute: Callable[[], Any],
+                       timeout: Optional[int] = None,
+                       should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Obtiene un valor de caché o lo calcula una sola vez entre solicitudes concurrentes.
+        
+        Cuando la entrada no está vigente, solo una solicitud (por proceso, mediante un
+        evento, y entre workers, mediante un lock en la caché compartida) ejecuta
+        ``compute``. El resto recibe el valor vencido si existe (stale-while-revalidate)
+        o espera el resultado del cálculo en curso. En las claves versionadas, el valor
+        vencido incluye el de la versión de datos anterior: tras una ingesta, la clave
+        nueva no tiene entrada y se sirve el último valor calculado con esos parámetros.
+        
+        Args:
+            cache_key (str): La clave de caché.
+            compute (Callable[[], Any]): Función que calcula el valor.
+            timeout (Optional[int], optional): Segundos de vigencia del valor.
+                Predeterminado a self.cache_timeout (None = sin expiración
+                en caché compartida).
+            should_cache (Optional[Callable[[Any], bool]], optional): Indica si el valor
+                calculado debe guardarse (por ejemplo, para no cachear errores).
+                Predeterminado a guardar siempre.
+            
+        Returns:
+            Any: El valor vigente, vencido o recién calculado.
+        """
+        timeout = self.get_cache_timeout(timeout or self.cache_timeout)
+        entry = cache.get(cache_key)
+        if self._is_fresh(entry):
+            registrar_acierto(self.get_cache_namespace())
+            return entry["value"]
+        registrar_fallo(self.get_cache_namespace())
+        latest_key = self._latest_keys.get(cache_key)
+        if not self._is_entry(entry) and latest_key is not None:
+            entry = cache.get(latest_key)  # Valor de la versión de datos anterior
+        
+        leader, event = self._join_inflight(cache_key)
+        try:
+            if not leader:
+                # Otro hilo de este proceso ya está calculando
+                if self._is_entry(entry):
+                    return entry["value"]
+                event.wait(self.lock_wait)
+                entry = cache.get(cache_key)
+                if self._is_entry(entry):
+                    return entry["value"]
+            
+            lock_key = f"{cache_key}:lock"
+            acquired = cache.add(lock_key, 1, timeout=self.lock_timeout)
+            if not acquired:
+                # Otro worker está calculando: servir el valor vencido o esperar el nuevo
+                if self._is_entry(entry):
+                    return entry["value"]
+                found, value = self._wait_for_entry(cache_key, lock_key)
+                if found:
+                    return value
+            
+            try:
+                value = compute()
+                if should_cache is None or should_cache(value):
+                    if timeout is None:
+                        fresh_until, ttl = float("inf"), None
+                    else:
+                        fresh_until, ttl = time.time() + timeout, timeout + self.stale_timeout
+                    entry = {"value": value, "fresh_until": fresh_until}
+                    cache.set(cache_key, entry, timeout=ttl)
+                    if latest_key is not None:
+                        cache.set(latest_key, entry, timeout=ttl)
+                return value
+            finally:
+                if acquired:
+                    cache.delete(lock_key)
+        finally:
+            if leader:
+                self._leave_inflight(cache_key, event)
+    
+    @staticmethod
+    def _is_entry(entry: Any) -> bool:
+        return isinstance(entry, dict) and "fresh_until" in entry and "value" in entry
+    
+    @classmethod
+    def _is_fresh(cls, entry: Any) -> bool:
+        return cls._is_entry(entry) and entry["fresh_until"] > time.time()
+    
+    def _wait_for_entry(self, cache_key: str, lock_key: str) -> Tuple[bool, Any]:
+        """
+        Espera a que otro worker publique el valor o libere el lock.
+        
+        Args:
+            cache_key (str): La clave de caché esperada.
+            lock_key (str): La clave del lock de recálculo.
+            
+        Returns:
+            Tuple[bool, Any]: ``(True, valor)`` si apareció un valor, ``(False, None)``
+                si el lock se liberó sin valor o se agotó la espera.
+        """
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll_interval)
+            entry = cache.get(cache_key)
+            if self._is_entry(entry):
+                return True, entry["value"]
+            if cache.get(lock_key) is None:
+                break
+        return False, None
+    
+    @classmethod
+    def _join_inflight(cls, cache_key: str) -> Tuple[bool, threading.Event]:
+        with cls._inflight_lock:
+            event = cls._inflight.get(cache_key)
+            if event is None:
+                event = cls._inflight[cache_key] = threading.Event()
+                return True, event
+            return False, event
+    
+    @classmethod
+    def _leave_inflight(cls, cache_key: str, event: threading.Event) -> None:
+        with cls._inflight_lock:
+            cls._inflight.pop(cache_key, None)
+        event.set()
     
     def get_cached_response(self, cache_key: str, **kwargs) -> Optional[Response]:
         """
@@ -137,7 +360,8 @@ class CachedAPIView(BaseAPIView):
             cache_key (str): La clave de caché para almacenar los datos.
             data (Any): Los datos a almacenar en caché y a incluir en la respuesta.
             timeout (Optional[int], optional): Tiempo de expiración del caché en segundos. 
-                    Predeterminado a self.cache_timeout.
+                    Predeterminado a self.cache_timeout (None = sin expiración
+                    en caché compartida).
             
         Returns:
             Response: Un objeto Response de REST framework.
@@ -17,6 +17,7 @@ class CheckUserExistsView(CachedAPIView):
     Vista para comprobar si un usuario existe.
     """
     permission_classes = [AllowAny]
+    cache_versioned = False  # No depende de StockData
 
     def get(self, request, username, *args, **kwargs):
         """
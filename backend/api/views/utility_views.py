@@ -7,6 +7,7 @@ import os
 from django.http import JsonResponse
 from rest_framework.permissions import AllowAny
 
+from api.cache.stats import obtener_estadisticas
 from api.utils.cedear_scraper import obtener_tickers_cedears
 from api.views.base import CachedAPIView
 
@@ -75,6 +76,7 @@ class TickersView(CachedAPIView):
     """
     permission_classes = [AllowAny]
     cache_timeout = 86400  # 24 horas
+    cache_versioned = False  # Los tickers provienen del listado de CEDEARs
     
     def get(self, request):
         """
@@ -97,3 +99,39 @@ class TickersView(CachedAPIView):
         
         # Almacenar en caché y devolver respuesta
         return self.cache_response(cache_key, {"tickers": tickers}, timeout=self.cache_timeout)
+
+
+class CacheStatsView(CachedAPIView):
+    """
+    Vista para consultar los contadores de aciertos y fallos de caché por vista.
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        """
+        Obtener los contadores de caché de todas las vistas cacheadas.
+        
+        Args:
+            request: El objeto de solicitud HTTP.
+            
+        Returns:
+            Response: El objeto de respuesta HTTP con los contadores por espacio de nombres.
+        """
+        namespaces = sorted({view().get_cache_namespace() for view in self._cached_views()})
+        return self.success_response(data=obtener_estadisticas(namespaces))
+    
+    @staticmethod
+    def _cached_views():
+        """
+        Obtener recursivamente todas las subclases de CachedAPIView.
+        
+        Returns:
+            list: Las clases de vista con soporte de caché.
+        """
+        pendientes = list(CachedAPIView.__subclasses__())
+        vistas = []
+        while pendientes:
+            vista = pendientes.pop()
+            vistas.append(vista)
+            pendientes.extend(vista.__subclasses__())
+        return vistas
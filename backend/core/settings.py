@@ -120,14 +120,68 @@ TEMPLATES = [
 WSGI_APPLICATION = "core.wsgi.application"
 
 # --------------------------------------------------------------------
-# Caché in-memory (desarrollo)
+# Caché: Redis compartido entre workers si hay REDIS_URL, in-memory si no
 # --------------------------------------------------------------------
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-cache-location",
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "tesis")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 16 * 1024))
+CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", 6))
+# La caché in-memory no ve las versiones que publica la ingesta en otros procesos:
+# ahí las entradas "sin expiración" (cache_timeout None) expiran igual tras este tiempo
+LOCAL_CACHE_MAX_TIMEOUT = int(os.getenv("LOCAL_CACHE_MAX_TIMEOUT", 3600))
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": CACHE_KEY_PREFIX,
+            "OPTIONS": {
+                "serializer": "api.cache.serializers.CompressedRedisSerializer",
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-cache-location",
+            "KEY_PREFIX": CACHE_KEY_PREFIX,
+        }
     }
-}
+
+# --------------------------------------------------------------------
+# Almacén columnar de precios en memoria (por worker)
+# --------------------------------------------------------------------
+PRICE_STORE_MAX_BYTES = int(os.getenv("PRICE_STORE_MAX_BYTES", 256 * 1024 * 1024))
+PRICE_STORE_REFRESH_SECONDS = float(os.getenv("PRICE_STORE_REFRESH_SECONDS", 60))
+
+# --------------------------------------------------------------------
+# Descargas a Yahoo Finance en el camino de las solicitudes
+# --------------------------------------------------------------------
+YAHOO_FETCH_MAX_WORKERS = int(os.getenv("YAHOO_FETCH_MAX_WORKERS", 8))
+YAHOO_FETCH_TIMEOUT = float(os.getenv("YAHOO_FETCH_TIMEOUT", 15))
+YAHOO_FETCH_RETRIES = int(os.getenv("YAHOO_FETCH_RETRIES", 2))
+YAHOO_FETCH_BACKOFF = float(os.getenv("YAHOO_FETCH_BACKOFF", 0.5))
+YAHOO_RATE_LIMIT = float(os.getenv("YAHOO_RATE_LIMIT", 2))  # Pedidos por segundo y proceso
+YAHOO_RATE_BURST = int(os.getenv("YAHOO_RATE_BURST", 4))
+# Limitador propio de la ingesta, separado del de las solicitudes
+YAHOO_INGEST_RATE_LIMIT = float(os.getenv("YAHOO_INGEST_RATE_LIMIT", 2))
+YAHOO_INGEST_RATE_BURST = int(os.getenv("YAHOO_INGEST_RATE_BURST", 4))
+
+# --------------------------------------------------------------------
+# Planificador de ingesta del universo de CEDEARs
+# --------------------------------------------------------------------
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 4))
+INGESTION_BLOCK_SIZE = int(os.getenv("INGESTION_BLOCK_SIZE", 50))
+INGESTION_RETRIES = int(os.getenv("INGESTION_RETRIES", 3))
+INGESTION_BACKOFF = float(os.getenv("INGESTION_BACKOFF", 5))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", 12))  # Intentos por bloque entre ejecuciones
+
+# --------------------------------------------------------------------
+# Screener nocturno de soportes y resistencias
+# --------------------------------------------------------------------
+PIVOT_SCREENER_WORKERS = int(os.getenv("PIVOT_SCREENER_WORKERS", 2))
 
 # Base de datos – Maquina LOCAL
 #DATABASES = {
@@ -235,4 +289,9 @@ LOGGING = {
 # --------------------------------------------------------------------
 # Cron
 # --------------------------------------------------------------------
-CRON_CLASSES = ["api.cron.ImportStockDataCronJob"]
\ No newline at end of file
+CRON_CLASSES = [
+    "api.cron.ImportStockDataCronJob",
+    "api.cron.RefreshFundamentalsCronJob",
+    "api.cron.IngestUniverseCronJob",
+    "api.cron.ScanPivotLevelsCronJob",
+]
@@ -1,5 +1,8 @@
+CREATE EXTENSION IF NOT EXISTS timescaledb;
+
+-- Sin clave primaria sobre id: en una hypertable toda restriccion unica debe incluir la columna de particion
 CREATE TABLE IF NOT EXISTS api_stockdata (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     ticker TEXT NOT NULL,
     date DATE NOT NULL,
     open_price FLOAT8,
@@ -8,10 +11,8 @@ CREATE TABLE IF NOT EXISTS api_stockdata (
     close_price FLOAT8,
     volume FLOAT8
 );
--- Crear indice para acelerar consultas por ticker y fecha
-CREATE INDEX IF NOT EXISTS idx_ticker_date ON api_stockdata (ticker, date);
 
--- Agregar restriccion de unicidad si no existe aun
+-- Agregar restriccion de unicidad si no existe aun (su indice acelera las consultas por ticker y fecha)
 DO $$
 BEGIN
     IF NOT EXISTS (
@@ -24,3 +25,9 @@ BEGIN
         ADD CONSTRAINT unique_ticker_date UNIQUE (ticker, date);
     END IF;
 END$$;
+
+-- Hypertable particionada por fecha; la compresion y los agregados continuos
+-- los crea la migracion api.0008_stockdata_timescale
+SELECT create_hypertable('api_stockdata', 'date',
+                         chunk_time_interval => INTERVAL '1 year',
+                         if_not_exists => TRUE, migrate_data => TRUE);